@@ -367,11 +367,12 @@ def logout():
 def main():
     styles.load_css()
     
+    # Rates are polled by a background thread; a new session never waits on the API
+    from utils import forex
+    forex.start_refresher()
     if 'rates_updated' not in st.session_state:
-        from utils import forex
-        success, rate = forex.update_rates_from_api()
-        if success:
-            st.toast(f"💱 Tasa actualizada: L. {rate}", icon="✅")
+        if forex.get_status()["last_success"]:
+            st.toast(f"💱 Tasa actualizada: L. {database.get_current_exchange_rate()}", icon="✅")
         st.session_state.rates_updated = True
     
     if not st.session_state.user:
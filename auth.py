@@ -15,11 +15,10 @@ def authenticate_user(username, password):
     Authenticates a user. 
     Returns the user row (dict-like) if successful, None otherwise.
     """
-    conn = database.get_connection()
-    c = conn.cursor()
-    c.execute("SELECT * FROM users WHERE username = ?", (username,))
-    user = c.fetchone()
-    conn.close()
+    with database.db_connection() as conn:
+        c = conn.cursor()
+        c.execute("SELECT * FROM users WHERE username = ?", (username,))
+        user = c.fetchone()
 
     if user and check_password(password, user['password_hash']):
         return user
@@ -27,28 +26,25 @@ def authenticate_user(username, password):
 
 def create_user(username, password, full_name, role='vendedor'):
     """Creates a new user."""
-    conn = database.get_connection()
-    c = conn.cursor()
     hashed = hash_password(password)
-    try:
-        c.execute("INSERT INTO users (username, password_hash, full_name, role) VALUES (?, ?, ?, ?)",
-                  (username, hashed, full_name, role))
-        conn.commit()
-        return True
-    except sqlite3.IntegrityError:
-        return False
-    finally:
-        conn.close()
+    with database.db_connection() as conn:
+        c = conn.cursor()
+        try:
+            c.execute("INSERT INTO users (username, password_hash, full_name, role) VALUES (?, ?, ?, ?)",
+                      (username, hashed, full_name, role))
+            conn.commit()
+            return True
+        except sqlite3.IntegrityError:
+            return False
 
 # Seed admin user if not exists (using this module to ensure correct hashing)
 def seed_admin():
-    conn = database.get_connection()
-    c = conn.cursor()
-    c.execute("SELECT count(*) FROM users")
-    if c.fetchone()[0] == 0:
-        print("Seeding admin user...")
-        create_user("admin", "admin123", "System Admin", "admin")
-    conn.close()
+    with database.db_connection() as conn:
+        c = conn.cursor()
+        c.execute("SELECT count(*) FROM users")
+        if c.fetchone()[0] == 0:
+            print("Seeding admin user...")
+            create_user("admin", "admin123", "System Admin", "admin")
 
 if __name__ == "__main__":
     seed_admin()
@@ -0,0 +1,99 @@
+"""
+Benchmark: products catalogue round trip through CSV and Parquet.
+
+Fills a database with N products, exports it with utils.catalog_io, imports
+the file into an empty database and checks that both products tables are
+identical (every column but id/last_updated). Imports are timed at the
+inventory view's batch size (2000), the default BATCH_SIZE and the whole
+file in one transaction. Also checks that a CSV row with a non-numeric cost
+or stock is skipped without failing the rest of its batch.
+
+Usage:
+    python benchmarks/bench_catalog_io.py [products]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from utils import catalog_io
+
+COMPARED = "product_code, description, brand, cost_usd, cost_lps, stock_quantity, category, image_url"
+IMPORT_BATCHES = (2000, catalog_io.BATCH_SIZE, None)
+
+
+def make_products(n):
+    return [{
+        "product_code": f"SKU-{i:07d}",
+        "description": f"Producto de prueba número {i}, \"edición\" {i % 7}",
+        "brand": f"Marca {i % 25}",
+        "cost_usd": round(5 + (i % 997) * 1.37, 2),
+        "cost_lps": round((5 + (i % 997) * 1.37) * 24.7, 2),
+        "stock_quantity": i % 50,
+        "category": None if i % 10 == 0 else f"Categoría {i % 12}",
+        "image_url": None if i % 3 else f"https://cdn.example.com/img/{i}.jpg",
+    } for i in range(n)]
+
+
+def fresh_db(tmp, name):
+    database.DB_NAME = os.path.join(tmp, name)
+    database.init_db()
+    database.stop_checkpointer()
+
+
+def snapshot():
+    with database.db_connection() as conn:
+        return [tuple(r) for r in conn.execute(f"SELECT {COMPARED} FROM products ORDER BY product_code")]
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    tmp = tempfile.mkdtemp()
+    fresh_db(tmp, "source.db")
+    database.bulk_upsert_products(make_products(n))
+    expected = snapshot()
+    source = database.DB_NAME
+    ok = len(expected) == n
+    print(f"{n} products")
+
+    for ext in ("csv", "parquet"):
+        path = os.path.join(tmp, f"productos.{ext}")
+        database.DB_NAME = source
+        start = time.perf_counter()
+        count = catalog_io.export_products(path)
+        elapsed = time.perf_counter() - start
+        print(f"{ext:>7} export: {elapsed:6.2f} s  {count / elapsed:9,.0f} products/s  "
+              f"{os.path.getsize(path) / 1e6:6.1f} MB")
+
+        for batch_size in IMPORT_BATCHES:
+            fresh_db(tmp, f"import_{ext}_{batch_size}.db")
+            start = time.perf_counter()
+            result = catalog_io.import_products(path, batch_size)
+            elapsed = time.perf_counter() - start
+            same = result is not None and result["inserted"] == n and snapshot() == expected
+            ok = ok and same
+            label = "all" if batch_size is None else batch_size
+            print(f"{ext:>7} import (batch {label:>6}): {elapsed:6.2f} s  {n / elapsed:9,.0f} products/s  "
+                  f"round trip {'ok' if same else 'FAIL'}")
+
+    # A bad numeric cell skips its row, not the batch
+    path = os.path.join(tmp, "invalidos.csv")
+    with open(path, "w", encoding=catalog_io.CSV_ENCODING) as f:
+        f.write("product_code,description,cost_usd,stock_quantity\n"
+                "BAD-1,Costo invalido,abc,1\nBAD-2,Existencia invalida,10,1.5\nOK-1,Correcto,10.5,3\n")
+    fresh_db(tmp, "invalid.db")
+    result = catalog_io.import_products(path)
+    same = (result is not None and result["inserted"] == 1 and result["skipped"] == 2
+            and result["skipped_rows"] == ["line 2: not a number cost_usd='abc'",
+                                           "line 3: not a number stock_quantity='1.5'"])
+    ok = ok and same
+    print(f"invalid numeric cells skipped: {'ok' if same else 'FAIL'} {result}")
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark: dashboard data load time as the quotes table grows to 1M rows.
+
+"old" reproduces what views/dashboard.py used to do (load every product and
+quote, sum/sort in Python, one quote_items query per quote). It is only run
+up to --old-max quotes because it grows linearly (N+1 queries).
+"new" is database.get_dashboard_summary(); it reads summary rows kept by
+triggers, so its time must stay flat: the run fails if the largest size is
+more than FLAT_RATIO times slower than the smallest.
+
+Usage:
+    python benchmarks/bench_dashboard.py [--old-max 20000]
+"""
+import os
+import sys
+import random
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+
+SIZES = [10_000, 100_000, 1_000_000]
+ITEMS_PER_QUOTE = 2
+N_PRODUCTS = 5_000
+FLAT_RATIO = 3.0
+FLAT_SLACK_MS = 1.0  # timer noise on sub-millisecond reads
+
+
+def seed_products():
+    database.bulk_upsert_products(
+        {"product_code": f"P{i:05d}", "description": f"Producto {i}", "brand": f"Marca {i % 40}", "cost_usd": 10.0}
+        for i in range(N_PRODUCTS)
+    )
+
+
+def add_quotes(start, stop):
+    rnd = random.Random(start)
+    with database.db_connection() as conn:
+        conn.executemany(
+            "INSERT INTO quotes (id, client_id, quote_date, total_amount_lps) VALUES (?, NULL, datetime('2024-01-01', ? || ' seconds'), ?)",
+            ((i, i, rnd.uniform(100, 10000)) for i in range(start + 1, stop + 1)),
+        )
+        conn.executemany(
+            "INSERT INTO quote_items (quote_id, product_id, quantity, unit_price_lps, total_lps) VALUES (?, ?, 1, 1, 1)",
+            ((i, rnd.randint(1, N_PRODUCTS)) for i in range(start + 1, stop + 1) for _ in range(ITEMS_PER_QUOTE)),
+        )
+        conn.commit()
+
+
+def old_dashboard():
+    database.get_current_exchange_rate_full()
+    products = database.get_all_products()
+    quotes = database.get_all_quotes()
+    len(products)
+    sum(float(q['total_amount_lps']) for q in quotes if q['total_amount_lps'])
+    sorted(quotes, key=lambda x: x.get('quote_date', ''), reverse=True)[:5]
+    brand_counts = {}
+    with database.db_connection() as conn:
+        for q in quotes:
+            for item in conn.execute(
+                "SELECT p.brand FROM quote_items qi JOIN products p ON qi.product_id = p.id WHERE qi.quote_id = ?",
+                (q['id'],),
+            ):
+                brand_counts[item['brand']] = brand_counts.get(item['brand'], 0) + 1
+    sorted(brand_counts.items(), key=lambda x: x[1], reverse=True)[:10]
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    old_max = 20_000
+    if "--old-max" in sys.argv:
+        old_max = int(sys.argv[sys.argv.index("--old-max") + 1])
+
+    database.DB_NAME = os.path.join(tempfile.mkdtemp(), "dashboard.db")
+    database.read_cache.enabled = False  # time the queries, not the read cache
+    database.init_db()
+    database.stop_checkpointer()
+    seed_products()
+
+    done = 0
+    times = []
+    print(f"{'quotes':>10} {'old (ms)':>10} {'new (ms)':>10}")
+    for size in SIZES:
+        add_quotes(done, size)
+        done = size
+        old = f"{timed(old_dashboard, 1) * 1000:10.1f}" if size <= old_max else f"{'-':>10}"
+        new = timed(lambda: database.get_dashboard_summary())
+        times.append(new * 1000)
+        print(f"{size:>10} {old} {new * 1000:10.2f}")
+
+    summary = database.get_dashboard_summary()
+    with database.db_connection() as conn:
+        expected = conn.execute("SELECT count(*), SUM(total_amount_lps) FROM quotes").fetchone()
+    correct = summary["quotes_count"] == expected[0] and abs(summary["total_lps"] - expected[1]) < 1e-3 * expected[1]
+    flat = times[-1] <= times[0] * FLAT_RATIO + FLAT_SLACK_MS
+    print(f"[{'ok' if correct else 'FAIL'}] totals match the quotes table")
+    print(f"[{'ok' if flat else 'FAIL'}] summary time flat: {times[0]:.2f} ms -> {times[-1]:.2f} ms")
+    sys.exit(0 if correct and flat else 1)
+
+
+if __name__ == "__main__":
+    main()
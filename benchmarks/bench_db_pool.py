@@ -0,0 +1,85 @@
+"""
+Micro-benchmark: connections opened and latency of one quote_generator rerun,
+with the old connect-per-call pattern vs. the shared connection pool.
+
+Usage:
+    python benchmarks/bench_db_pool.py [reruns]
+"""
+import os
+import sys
+import sqlite3
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+
+
+def seed(n_products=2000, n_clients=200):
+    with database.db_connection() as conn:
+        conn.executemany(
+            "INSERT INTO products (product_code, description, brand, cost_usd, cost_lps) VALUES (?, ?, ?, ?, ?)",
+            [(f"P-{i:06d}", f"Producto {i}", f"Marca {i % 25}", i * 1.5, i * 37.5) for i in range(n_products)],
+        )
+        conn.executemany(
+            "INSERT INTO clients (full_name, rtn_id) VALUES (?, ?)",
+            [(f"Cliente {i}", f"RTN-{i}") for i in range(n_clients)],
+        )
+        conn.commit()
+
+
+def rerun_unpooled():
+    """Same reads as a quote_generator rerun, one fresh connection per call."""
+    queries = [
+        ("SELECT * FROM clients ORDER BY full_name", ()),
+        ("SELECT * FROM products ORDER BY brand, product_code", ()),
+        ("SELECT rate_value FROM exchange_rates ORDER BY rate_date DESC, id DESC LIMIT 1", ()),
+        ("SELECT value FROM system_config WHERE key = ?", ("quote_header",)),
+        ("SELECT value FROM system_config WHERE key = ?", ("quote_footer",)),
+    ]
+    for sql, params in queries:
+        conn = sqlite3.connect(database.DB_NAME, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        [dict(r) for r in conn.execute(sql, params).fetchall()]
+        conn.close()
+    return len(queries)
+
+
+def rerun_pooled():
+    database.get_all_clients()
+    database.get_all_products()
+    database.get_current_exchange_rate()
+    database.get_config('quote_header')
+    database.get_config('quote_footer')
+
+
+def main():
+    reruns = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    tmp = tempfile.mkdtemp()
+    database.DB_NAME = os.path.join(tmp, "bench.db")
+    database.read_cache.enabled = False  # measure the pool, not the read cache
+    database.init_db()
+    seed()
+
+    opened = 0
+    start = time.perf_counter()
+    for _ in range(reruns):
+        opened += rerun_unpooled()
+    before = (time.perf_counter() - start) / reruns
+
+    pool = database.get_pool()
+    created_before = pool.stats["created"]
+    start = time.perf_counter()
+    for _ in range(reruns):
+        rerun_pooled()
+    after = (time.perf_counter() - start) / reruns
+    created = pool.stats["created"] - created_before
+
+    print(f"reruns: {reruns}")
+    print(f"before: {opened / reruns:.2f} connections/rerun, {before * 1000:.2f} ms/rerun")
+    print(f"after:  {created / reruns:.2f} connections/rerun, {after * 1000:.2f} ms/rerun")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark: weekly re-import of a supplier price list, full vs delta mode.
+
+Week 1 loads N products. Week 2's list changes 1% of the prices, adds 0.5%
+new SKUs and drops 0.5%, and is imported after an exchange-rate change (so
+every row's cost_lps differs, which the full mode treats as an update).
+Measures time, WAL bytes written and rows whose last_updated was bumped, and
+checks the delta report (added / changed / missing) and that every imported
+product's cost_lps follows the new rate in both modes.
+
+Usage:
+    python benchmarks/bench_delta_import.py [products]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+
+BATCH_SIZE = 2000
+
+
+def week1(n):
+    return [{"product_code": f"SKU-{i:07d}", "description": f"Producto {i}", "brand": "Proveedor A",
+             "cost_usd": round(5 + (i % 997) * 1.37, 2)} for i in range(n)]
+
+
+def week2(products, rnd):
+    rows = [dict(p) for p in products]
+    dropped = set(rnd.sample(range(len(rows)), len(rows) // 200))
+    changed = set(rnd.sample(range(len(rows)), len(rows) // 100)) - dropped
+    for i in changed:
+        rows[i]["cost_usd"] = round(rows[i]["cost_usd"] * 1.05 + 0.01, 2)
+    rows = [r for i, r in enumerate(rows) if i not in dropped]
+    added = [{"product_code": f"NEW-{i:06d}", "description": f"Nuevo {i}", "brand": "Proveedor A", "cost_usd": 9.99}
+             for i in range(len(products) // 200)]
+    expected = {
+        "added": sorted(r["product_code"] for r in added),
+        "changed": sorted(products[i]["product_code"] for i in changed),
+        "missing": sorted(products[i]["product_code"] for i in dropped),
+    }
+    return rows + added, expected
+
+
+def wal_size():
+    path = database.DB_NAME + "-wal"
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+def run_import(rows, rate, delta):
+    for r in rows:
+        r["cost_lps"] = r["cost_usd"] * rate
+    database.checkpoint("TRUNCATE")
+    with database.db_connection() as conn:
+        conn.execute("UPDATE products SET last_updated = '2000-01-01'")
+        conn.commit()
+    database.checkpoint("TRUNCATE")
+
+    report = {"added": [], "changed": [], "unchanged": 0}
+    start = time.perf_counter()
+    for i in range(0, len(rows), BATCH_SIZE):
+        result = database.bulk_upsert_products(rows[i:i + BATCH_SIZE], delta=delta)
+        if delta:
+            report["added"] += result["added"]
+            report["changed"] += result["changed"]
+        report["unchanged"] += result["unchanged"]
+    if delta:
+        report["missing"] = database.find_missing_products((r["product_code"] for r in rows), brands={"Proveedor A"})
+    elapsed = time.perf_counter() - start
+
+    with database.db_connection() as conn:
+        touched = conn.execute("SELECT COUNT(*) FROM products WHERE last_updated != '2000-01-01'").fetchone()[0]
+        imported = {r["product_code"] for r in rows}
+        stale = sum(1 for code, cost_usd, cost_lps in conn.execute("SELECT product_code, cost_usd, cost_lps FROM products")
+                    if code in imported and abs(cost_lps - cost_usd * rate) > 0.001)
+    return elapsed, wal_size(), touched, stale, report
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rnd = random.Random(16)
+    base = week1(n)
+    rows2, expected = week2(base, rnd)
+
+    results = {}
+    for mode in ("full", "delta"):
+        database.DB_NAME = os.path.join(tempfile.mkdtemp(), f"{mode}.db")
+        database.init_db()
+        database.stop_checkpointer()
+        run_import([dict(p) for p in base], 24.5, delta=False)
+        results[mode] = run_import([dict(r) for r in rows2], 24.7, delta=(mode == "delta"))
+
+    print(f"{n} products, week 2: {len(expected['changed'])} changed, {len(expected['added'])} added, "
+          f"{len(expected['missing'])} dropped")
+    for mode, (elapsed, wal, touched, stale, _) in results.items():
+        print(f"{mode:>5}: {elapsed:6.2f} s | WAL {wal / 1e6:7.1f} MB | rows rewritten {touched} | "
+              f"stale cost_lps {stale}")
+
+    report = results["delta"][4]
+    ok = all(sorted(report[k]) == expected[k] for k in ("added", "changed", "missing"))
+    ok = ok and all(stale == 0 for _, _, _, stale, _ in results.values())
+    print("delta report:", "ok" if ok else "FAIL",
+          {k: len(v) if isinstance(v, list) else v for k, v in report.items()})
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Benchmark: ingestion of a large supplier workbook.
+
+The generated workbook has two sheets, a few title rows above each header
+and 12 columns, of which the importer needs 4; its strings are moved to a
+shared-strings table, as Excel saves them. Compares time and peak Python
+memory (tracemalloc) of:
+  pandas   - pd.read_excel of every sheet and column (the old parse_excel_inventory)
+  openpyxl - read-only rows with every column (the previous iter_excel_inventory)
+  engine/openpyxl - parsers.iter_excel_batches(engine="openpyxl"): header
+             detection, mapped column span only, row batches
+  engine/xml - parsers.iter_excel_batches(): same, only the mapped cells
+             converted (utils/xlsx_reader.py)
+and checks both engines return the same products as the full-width read.
+
+Usage:
+    python benchmarks/bench_excel_engine.py [rows] [--no-pandas]
+"""
+import io
+import os
+import re
+import sys
+import time
+import tracemalloc
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+
+from utils import parsers
+from utils.tokens import clean_price
+
+TITLE_ROWS = 3
+HEADER = ["Línea", "Código", "Descripción", "Marca", "Precio", "Existencia", "Bodega",
+          "Garantía", "Categoría", "Peso (kg)", "URL", "Notas"]
+
+
+def make_workbook(rows):
+    wb = Workbook(write_only=True)
+    per_sheet = (rows + 1) // 2
+    for sheet, (start, stop) in enumerate(((0, per_sheet), (per_sheet, rows))):
+        ws = wb.create_sheet(f"Lista {sheet + 1}")
+        ws.append(["Lista de precios REDMIL"])
+        ws.append(["Vigente desde el 18/10/2026"])
+        ws.append([])
+        ws.append(HEADER)
+        for i in range(start, stop):
+            ws.append([i, f"SKU-{i:07d}", f"Producto de prueba número {i}", f"Marca {i % 25}",
+                       round(5 + (i % 997) * 1.37, 2), i % 50, f"B{i % 7}", "12 meses",
+                       f"Categoría {i % 40}", round((i % 300) / 10, 1), f"https://example.com/p/{i}",
+                       "Precio sujeto a cambio"])
+    out = io.BytesIO()
+    wb.save(out)
+    return to_shared_strings(out.getvalue())
+
+
+INLINE_RE = re.compile(rb'<c r="([A-Z]+[0-9]+)" t="inlineStr"><is><t>(.*?)</t></is></c>')
+
+
+def to_shared_strings(data):
+    """openpyxl writes inline strings; Excel writes a shared-strings table."""
+    strings = {}
+
+    def share(m):
+        index = strings.setdefault(m.group(2), len(strings))
+        return b'<c r="%s" t="s"><v>%d</v></c>' % (m.group(1), index)
+
+    src = zipfile.ZipFile(io.BytesIO(data))
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as dst:
+        for name in src.namelist():
+            part = src.read(name)
+            if name.startswith("xl/worksheets/"):
+                part = INLINE_RE.sub(share, part)
+            elif name == "[Content_Types].xml":
+                part = part.replace(b"</Types>", b'<Override PartName="/xl/sharedStrings.xml" ContentType='
+                                    b'"application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/></Types>')
+            elif name == "xl/_rels/workbook.xml.rels":
+                part = part.replace(b"</Relationships>", b'<Relationship Id="rIdSS" Target="sharedStrings.xml" Type='
+                                    b'"http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings"/>'
+                                    b'</Relationships>')
+            dst.writestr(name, part)
+        items = b"".join(b"<si><t>%s</t></si>" % text for text in strings)
+        dst.writestr("xl/sharedStrings.xml",
+                     b'<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" count="%d" '
+                     b'uniqueCount="%d">%s</sst>' % (len(strings), len(strings), items))
+    return out.getvalue()
+
+
+def read_pandas(data):
+    count = 0
+    for df in pd.read_excel(io.BytesIO(data), sheet_name=None, header=TITLE_ROWS).values():
+        df = df.rename(columns=parsers.match_columns(df.columns))
+        df['product_code'] = df['product_code'].astype(str).str.strip()
+        df['description'] = df['description'].astype(str).str.strip()
+        count += len(df.to_dict('records'))
+    return count
+
+
+def read_openpyxl(data):
+    products = []
+    wb = load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    for ws in wb.worksheets:
+        rows = ws.iter_rows(min_row=TITLE_ROWS + 2, values_only=True)
+        for row in rows:
+            products.append({'product_code': str(row[1]).strip(), 'description': str(row[2]).strip(),
+                             'cost_usd': clean_price(row[4]), 'brand': str(row[3]).strip() or 'Unknown'})
+    wb.close()
+    return products
+
+
+def read_engine(data, keep=False, engine="xml"):
+    products = [] if keep else None
+    count = 0
+    for batch in parsers.iter_excel_batches(io.BytesIO(data), batch_size=2000, engine=engine):
+        count += len(batch)
+        if keep:
+            products.extend(batch)
+    return products if keep else count
+
+
+def measure(name, fn, data):
+    # Timed without tracemalloc (it slows Python down several times), then re-run for the peak
+    start = time.perf_counter()
+    fn(data)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn(data)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{name:>15}: {elapsed:7.2f} s | peak {peak / 1e6:8.1f} MB")
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    rows = int(args[0]) if args else 500_000
+    start = time.perf_counter()
+    data = make_workbook(rows)
+    print(f"{rows} rows, {len(HEADER)} columns, 2 sheets: {len(data) / 1e6:.1f} MB "
+          f"(generated in {time.perf_counter() - start:.0f} s)")
+
+    if "--no-pandas" not in sys.argv:
+        measure("pandas", read_pandas, data)
+    measure("openpyxl", lambda d: len(read_openpyxl(d)), data)
+    measure("engine/openpyxl", lambda d: read_engine(d, engine="openpyxl"), data)
+    measure("engine/xml", read_engine, data)
+
+    expected = read_openpyxl(data)
+    ok = (len(expected) == rows and read_engine(data, keep=True) == expected
+          and read_engine(data, keep=True, engine="openpyxl") == expected)
+    print("engine output:", "ok" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Accuracy + speed benchmark for the PDF line grouping in utils/parsers.py.
+
+Builds a small synthetic corpus of supplier-style catalogues (one text object
+per cell, whole rows as one text line, y-jitter, skewed scans, mixed font
+sizes, one text object per cell with long descriptions) whose expected products are known, and compares the current
+_group_lines() with the previous sort + 5px-threshold grouping:
+
+  * accuracy: share of expected (code, description, price) rows recovered,
+    plus rows produced that are not in the catalogue;
+  * speed: grouping time only, on words already extracted from the pages.
+
+Usage:
+    python benchmarks/bench_line_grouping.py [pages-per-document]
+"""
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz
+
+from utils import parsers
+
+ROWS_PER_PAGE = 40
+ROW_SPACING = 17
+BRANDS = ["Samsung", "HP", "Lenovo", "Apple", "Dell", "Epson"]
+MODELS = ["Galaxy S23", "iPhone 15", "ThinkPad T14", "Laptop 15", "Monitor 27", "Impresora L3250"]
+DETAILS = ["Color Negro", "Garantia 1 Año", "Version Internacional", "Caja Sellada", "Con Cargador"]
+
+
+def legacy_group_lines(words):
+    """The grouping parse_pdf_inventory used before: sort by (y0, x0), 5px threshold."""
+    rows = []
+    current_row = []
+    last_y = -999
+    words.sort(key=lambda w: (w[1], w[0]))
+    for w in words:
+        if abs(w[1] - last_y) > 5:
+            if current_row:
+                rows.append(current_row)
+            current_row = []
+            last_y = w[1]
+        current_row.append(w)
+    if current_row:
+        rows.append(current_row)
+    return rows
+
+
+def make_document(style, pages, seed):
+    """Returns (pdf bytes, expected products) for one corpus document."""
+    rnd = random.Random(seed)
+    doc = fitz.open()
+    expected = []
+    n = 0
+    for _ in range(pages):
+        page = doc.new_page()
+        page.insert_text((36, 40), "CODIGO DESCRIPCION PRECIO EXISTENCIA", fontsize=9)
+        for r in range(ROWS_PER_PAGE):
+            n += 1
+            code = f"RD-{seed}{n:05d}"
+            desc = f"{rnd.choice(BRANDS)} {rnd.choice(MODELS)} {rnd.randint(4, 64)}GB"
+            if style == "long-cells":
+                # 8+ words per description: enough words per cell to look like whole rows
+                desc += f" {rnd.choice(DETAILS)} {rnd.choice(DETAILS)}"
+            price = f"{rnd.uniform(5, 3000):,.2f}"
+            stock = str(rnd.randint(0, 300))
+            expected.append((code, desc, parsers.clean_price(price)))
+            y = 62 + r * ROW_SPACING
+            if style == "row-lines":
+                page.insert_text((36, y), f"{code}   {desc}   {price}   {stock}", fontsize=8)
+                continue
+            cells = [(36, code, 8), (110, desc, 8), (380, price, 8), (470, stock, 8)]
+            if style == "long-cells":
+                cells = [(36, code, 8), (110, desc, 8), (470, price, 8)]
+            for x, text, size in cells:
+                dy = 0.0
+                if style == "jitter":
+                    dy = rnd.uniform(-2.5, 2.5)
+                elif style == "skew":
+                    dy = (x - 36) * math.tan(math.radians(0.9))  # ~6.8px drift across the row
+                elif style == "mixed-fonts":
+                    size = 10 if x == 110 else 7
+                page.insert_text((x, y + dy), text, fontsize=size)
+    data = doc.tobytes()
+    doc.close()
+    return data, expected
+
+
+def evaluate(group_lines, pages_words, expected):
+    found = []
+    start = time.perf_counter()
+    rows_per_page = [group_lines(list(words)) for words in pages_words]
+    elapsed = time.perf_counter() - start
+    for rows in rows_per_page:
+        for row in rows:
+            product = parsers._parse_row([w[4] for w in row])
+            if product:
+                found.append((product["product_code"], product["description"], product["cost_usd"]))
+    expected_set = set(expected)
+    hits = sum(1 for f in found if f in expected_set)
+    return hits / len(expected), len(found) - hits, elapsed
+
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    styles = ["cells", "row-lines", "jitter", "skew", "mixed-fonts", "long-cells"]
+
+    print(f"{'document':<12} {'words':>7} | {'legacy acc':>10} {'extra':>5} {'ms':>7} | {'new acc':>8} {'extra':>5} {'ms':>7}")
+    failed = False
+    for seed, style in enumerate(styles, start=1):
+        data, expected = make_document(style, pages, seed)
+        doc = fitz.open(stream=data, filetype="pdf")
+        pages_words = [page.get_text("words") for page in doc]
+        n_words = sum(len(w) for w in pages_words)
+
+        old_acc, old_extra, old_t = evaluate(legacy_group_lines, pages_words, expected)
+        new_acc, new_extra, new_t = min(
+            (evaluate(parsers._group_lines, pages_words, expected) for _ in range(3)), key=lambda r: r[2]
+        )
+        old_t = min(old_t, *(evaluate(legacy_group_lines, pages_words, expected)[2] for _ in range(2)))
+        print(f"{style:<12} {n_words:>7} | {old_acc:>10.1%} {old_extra:>5} {old_t * 1000:>7.1f} | "
+              f"{new_acc:>8.1%} {new_extra:>5} {new_t * 1000:>7.1f}")
+        failed = failed or new_acc < old_acc or new_extra > 0
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark + checks for the content-hash parse cache (utils/parse_cache.py).
+
+For a generated PDF catalogue and Excel price list: times an uncached parse,
+the first cached parse (parse + write-through) and a cache hit, and checks
+that hits return exactly what the parser produces, that a partial read does
+not publish an entry, that the import preview does (so its reruns are hits),
+that an empty parse is cached too, and that LRU eviction keeps the newest
+entries.
+
+Usage:
+    python benchmarks/bench_parse_cache.py [pdf-pages] [excel-rows]
+"""
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_pdf_parser import make_catalogue
+from bench_streaming_import import Upload, make_workbook
+from utils import parse_cache, parsers
+
+
+def parse_all(upload, **kwargs):
+    upload.seek(0)
+    return [p for batch in parsers.iter_inventory_batches(upload, 2000, workers=1, **kwargs) for p in batch]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def check(name, ok):
+    print(f"[{'ok' if ok else 'FAIL'}] {name}")
+    return ok
+
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 150
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 50_000
+    parse_cache.CACHE_DIR = tempfile.mkdtemp()
+    print(f"cache format: {parse_cache.EXTENSION}")
+
+    results = []
+    files = [Upload(make_catalogue(pages), "catalogo.pdf"), Upload(make_workbook(rows), "precios.xlsx")]
+    for upload in files:
+        uncached_t, expected = timed(lambda: parse_all(upload, use_cache=False))
+
+        # A partial read must not publish an entry
+        upload.seek(0)
+        next(parsers.iter_inventory_batches(upload, 200, workers=1))
+        digest = hashlib.sha256(upload.getvalue()).hexdigest()
+        leftovers = [n for n in os.listdir(parse_cache.CACHE_DIR) if n.startswith(digest)]
+        results.append(check(f"{upload.name}: partial read not cached", not leftovers))
+
+        # The preview parses the whole file once; its rerun is a hit
+        upload.seek(0)
+        preview_t, preview = timed(lambda: parsers.preview_inventory(upload, 200, workers=1))
+        upload.seek(0)
+        rerun_t, rerun = timed(lambda: parsers.preview_inventory(upload, 200, workers=1))
+        print(f"{upload.name}: preview {preview_t:6.2f} s | preview rerun {rerun_t:6.3f} s")
+        results.append(check(f"{upload.name}: preview published and reread",
+                             preview == rerun == expected[:200] and parse_cache.stats["hits"] > 0))
+        parse_cache.clear()
+
+        miss_t, first = timed(lambda: parse_all(upload))
+        hit_t, second = timed(lambda: parse_all(upload))
+        print(f"{upload.name}: {len(expected)} products | parse {uncached_t:6.2f} s | "
+              f"parse+cache {miss_t:6.2f} s | hit {hit_t:6.3f} s ({uncached_t / hit_t:5.1f}x)")
+        results.append(check(f"{upload.name}: cached results identical", first == expected and second == expected))
+
+    # An empty parse is cached as an empty entry
+    empty = Upload(make_workbook(0), "vacio.xlsx")
+    hits = parse_cache.stats["hits"]
+    parse_all(empty)
+    results.append(check("empty parse cached", parse_all(empty) == [] and parse_cache.stats["hits"] == hits + 1))
+    parse_cache.evict(max_entries=2)
+
+    # LRU eviction: touching the oldest entry keeps it over a newer one
+    entries = sorted(os.listdir(parse_cache.CACHE_DIR))
+    parse_all(files[0])  # hit -> most recently used
+    time.sleep(0.01)
+    parse_cache.evict(max_entries=1)
+    kept = os.listdir(parse_cache.CACHE_DIR)
+    pdf_key = parse_cache.cache_key(files[0].getvalue(), f"pdf-{parsers.PARSER_VERSION}")
+    results.append(check(f"eviction kept the most recently used entry ({len(entries)} -> {len(kept)})",
+                         kept == [pdf_key + parse_cache.EXTENSION]))
+    print(parse_cache.stats)
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark + determinism check: serial vs parallel PDF inventory parsing.
+
+Generates a synthetic supplier catalogue (header line, "CODE DESC... PRICE
+EXTRA" rows, model numbers inside descriptions), parses it with
+parse_pdf_inventory() and parse_pdf_inventory_parallel(), and fails if the
+parallel output differs from the serial one in any way (content or order).
+
+Usage:
+    python benchmarks/bench_pdf_parser.py [pages] [--workers N]
+"""
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz
+
+from utils import parsers
+
+ROWS_PER_PAGE = 45
+BRANDS = ["Samsung", "HP", "Lenovo", "Apple", "Dell", "Epson"]
+MODELS = ["Galaxy S23", "iPhone 15", "ThinkPad T14", "Laptop 15", "Monitor 27", "Impresora L3250"]
+
+
+def make_catalogue(pages, seed=7):
+    rnd = random.Random(seed)
+    doc = fitz.open()
+    n = 0
+    for p in range(pages):
+        page = doc.new_page()
+        page.insert_text((36, 40), "CODIGO   DESCRIPCION   PRECIO   EXISTENCIA", fontsize=9)
+        y = 60
+        for _ in range(ROWS_PER_PAGE):
+            n += 1
+            desc = f"{rnd.choice(BRANDS)} {rnd.choice(MODELS)} {rnd.randint(4, 64)}GB"
+            price = f"{rnd.uniform(5, 3000):,.2f}"
+            page.insert_text((36, y), f"RD-{n:06d}", fontsize=8)
+            page.insert_text((110, y), desc, fontsize=8)
+            page.insert_text((380, y), price, fontsize=8)
+            page.insert_text((470, y), str(rnd.randint(0, 300)), fontsize=8)
+            y += 16
+        page.insert_text((36, 800), f"Page {p + 1}", fontsize=8)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1].isdigit() else 300
+    workers = os.cpu_count() or 1
+    if "--workers" in sys.argv:
+        workers = int(sys.argv[sys.argv.index("--workers") + 1])
+
+    data = make_catalogue(pages)
+    print(f"{pages} pages, {len(data) / 1e6:.1f} MB, {workers} workers ({os.cpu_count()} CPUs)")
+
+    serial_t, serial = timed(lambda: parsers.parse_pdf_inventory(io.BytesIO(data)))
+    parallel_t, parallel = timed(
+        lambda: parsers.parse_pdf_inventory_parallel(io.BytesIO(data), workers=max(2, workers), min_pages=1)
+    )
+
+    print(f"serial:   {serial_t:7.2f} s  ({pages / serial_t:7.1f} pages/s)  {len(serial)} products")
+    print(f"parallel: {parallel_t:7.2f} s  ({pages / parallel_t:7.1f} pages/s)  {len(parallel)} products")
+
+    expected = pages * ROWS_PER_PAGE
+    ok = serial == parallel and len(serial) == expected
+    print("deterministic:", "ok" if serial == parallel else "FAIL (parallel output differs)")
+    if len(serial) != expected:
+        print(f"FAIL: expected {expected} products")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
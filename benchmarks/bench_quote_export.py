@@ -0,0 +1,89 @@
+"""
+Benchmark + checks for the batch quote export (utils/quote_export.py).
+
+Saves N quotes to cotizaciones_historico and exports them to a ZIP serially,
+in a process pool (cold PDF cache) and again with the cache warm, reporting
+quotes/sec. Checks that the archive holds one valid PDF per quote, that it
+is streamed (no chunk much larger than one PDF), that the parallel exports
+reuse one pool and cache every PDF from the parent process, and the
+one-PDF-per-file export.
+
+Usage:
+    python benchmarks/bench_quote_export.py [quotes] [items-per-quote] [workers]
+"""
+import json
+import os
+import sys
+import tempfile
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import database
+from bench_quote_renderer import make_quote
+from utils import quote_export, quote_pdf, renderer
+
+
+def check(name, ok):
+    print(f"[{'ok' if ok else 'FAIL'}] {name}")
+    return ok
+
+
+def export(rows, workers):
+    report, chunks = {}, []
+    for chunk in quote_export.iter_quotes_zip(rows, workers=workers, report=report):
+        chunks.append(len(chunk))
+    print(f"workers={workers}: {report['quotes']} quotes in {report['seconds']:6.2f} s "
+          f"({report['quotes_per_sec']:6.1f} quotes/s) | {report['bytes'] / 1e6:.1f} MB | "
+          f"largest chunk {max(chunks) / 1024:.0f} KB")
+    return report, max(chunks)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    items = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else max(2, os.cpu_count() or 1)
+    database.DB_NAME = os.path.join(tempfile.mkdtemp(), "export.db")
+    database.init_db()
+    for i in range(n):
+        data = make_quote(items + i % 5)
+        _, _, total = renderer.quote_totals(data["items"])
+        database.save_quote_history(f"Cliente {i}", json.dumps(data["client"]), json.dumps(data["items"]), total)
+    rows = database.get_all_quotes_history()
+
+    quote_pdf.PDF_DIR = tempfile.mkdtemp()
+    serial, _ = export(rows, 1)
+    quote_pdf.PDF_DIR = tempfile.mkdtemp()
+    parallel, largest = export(rows, workers)
+    warm, _ = export(rows, workers)
+    print(f"cache warm: {warm['quotes_per_sec'] / serial['quotes_per_sec']:.1f}x the cold serial export")
+
+    results = []
+    results.append(check("parallel exports reuse one pool", len(quote_export._pools) == 1))
+    results.append(check("parent cached every rendered PDF", len(os.listdir(quote_pdf.PDF_DIR)) == n))
+    zip_path = os.path.join(tempfile.mkdtemp(), "cotizaciones.zip")
+    quote_export.export_quotes_zip(zip_path, rows, workers=workers)
+    with zipfile.ZipFile(zip_path) as archive:
+        names = archive.namelist()
+        ok = (sorted(names) == sorted(quote_export.quote_filename(r) for r in rows)
+              and all(archive.read(name).startswith(b"%PDF") for name in names)
+              and archive.testzip() is None)
+    results.append(check(f"ZIP holds {len(names)} valid PDFs", ok and parallel["quotes"] == n))
+    results.append(check("ZIP streamed entry by entry",
+                         largest < 2 * max(len(quote_pdf.get_quote_pdf(
+                             quote_pdf.history_quote_data(r))[1]) for r in rows[:5]) + 64 * 1024))
+
+    out_dir = tempfile.mkdtemp()
+    report = quote_export.export_quotes_pdfs(out_dir, rows[:10], workers=1)
+    results.append(check("one PDF per file export", report["quotes"] == 10 and len(os.listdir(out_dir)) == 10))
+
+    bad = dict(rows[0], id=999999, products_json="{not json")
+    report = {}
+    list(quote_export.iter_quotes_zip([bad] + rows[:2], workers=1, report=report))
+    results.append(check("malformed quote skipped and counted", report["quotes"] == 2 and report["errors"] == 1))
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
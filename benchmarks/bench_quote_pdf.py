@@ -0,0 +1,98 @@
+"""
+Benchmark + checks for server-side quote PDFs (utils/quote_pdf.py).
+
+Renders a generated quote cold and from the on-disk cache, checks that the
+PDF paginates and carries every item and the total, that a header/footer
+change produces a different file, that the path is recorded on the
+quote (quotes.pdf_path / cotizaciones_historico.pdf_path) and that the cache
+evicts the least recently used PDFs beyond MAX_ENTRIES, clearing the
+path recorded for them.
+
+Usage:
+    python benchmarks/bench_quote_pdf.py [items]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fitz
+
+import database
+from bench_quote_renderer import make_quote
+from utils import quote_pdf, renderer
+
+ROUNDS = 20
+
+
+def check(name, ok):
+    print(f"[{'ok' if ok else 'FAIL'}] {name}")
+    return ok
+
+
+def timed(fn, rounds=1):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        result = fn()
+    return (time.perf_counter() - start) / rounds * 1000, result
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    quote_pdf.PDF_DIR = tempfile.mkdtemp()
+    database.DB_NAME = os.path.join(tempfile.mkdtemp(), "pdf.db")
+    database.init_db()
+    data = make_quote(n)
+
+    render_ms, content = timed(lambda: quote_pdf.render_quote_pdf(data), ROUNDS)
+    cold_ms, (path, first) = timed(lambda: quote_pdf.get_quote_pdf(data))
+    hit_ms, (_, second) = timed(lambda: quote_pdf.get_quote_pdf(data), ROUNDS)
+    print(f"{n} items: {len(content) / 1024:.1f} KB | render {render_ms:6.1f} ms | "
+          f"first download {cold_ms:6.1f} ms | cached {hit_ms:6.3f} ms ({render_ms / hit_ms:.0f}x)")
+
+    results = []
+    doc = fitz.open("pdf", first)
+    text = "".join(page.get_text() for page in doc)
+    _, _, total = renderer.quote_totals(data["items"])
+    results.append(check(f"{doc.page_count} pages, every item and the total printed",
+                         doc.page_count > 1 and all(i["code"] in text for i in data["items"])
+                         and f"L. {total:,.2f}" in text))
+    results.append(check("cache hit returns the same file", first == second and os.path.exists(path)))
+
+    changed = dict(data, config=dict(data["config"], footer="Precios sujetos a cambio."))
+    results.append(check("header/footer change renders a new file", quote_pdf.pdf_path(changed) != path))
+
+    database.save_quote_history("Cliente Prueba", json.dumps(data["client"]), json.dumps(data["items"]), total)
+    history_id = database.get_all_quotes_history()[0]["id"]
+    quote_id = database.create_quote({"client_id": None, "total_amount_lps": total}, [])
+    database.set_quote_pdf_path(history_id, path, history=True)
+    database.set_quote_pdf_path(quote_id, path)
+    with database.db_connection() as conn:
+        recorded = [conn.execute("SELECT pdf_path FROM cotizaciones_historico WHERE id = ?", (history_id,)).fetchone()[0],
+                    conn.execute("SELECT pdf_path FROM quotes WHERE id = ?", (quote_id,)).fetchone()[0]]
+    results.append(check("pdf_path recorded", recorded == [path, path]
+                         and database.get_all_quotes_history()[0]["pdf_path"] == path))
+
+    quote_pdf.MAX_ENTRIES = 3
+    small = [make_quote(1 + i) for i in range(5)]
+    paths = [quote_pdf.get_quote_pdf(q)[0] for q in small[:3]]
+    quote_pdf.get_quote_pdf(small[0])  # used again: newest
+    for q in small[3:]:
+        quote_pdf.get_quote_pdf(q)
+    kept = sorted(os.listdir(quote_pdf.PDF_DIR))
+    results.append(check(f"cache bounded to MAX_ENTRIES ({len(kept)} PDFs), recently used kept",
+                         len(kept) == 3 and os.path.exists(paths[0]) and not os.path.exists(paths[1])))
+    with database.db_connection() as conn:
+        recorded = [conn.execute("SELECT pdf_path FROM cotizaciones_historico WHERE id = ?", (history_id,)).fetchone()[0],
+                    conn.execute("SELECT pdf_path FROM quotes WHERE id = ?", (quote_id,)).fetchone()[0]]
+    results.append(check("evicted PDF no longer recorded", not os.path.exists(path) and recorded == [None, None]))
+    print(quote_pdf.stats)
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
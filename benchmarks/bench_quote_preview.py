@@ -0,0 +1,88 @@
+"""
+Benchmark + checks for the live quote preview (utils/quote_preview.py).
+
+Replays an editing session on a 200-line quote (quantity changes, removals,
+additions, a client change) and compares, per edit, the bytes sent to the
+browser and the server time of the delta messages against re-embedding the
+whole document (what components.html did on every rerun). Applying the ops
+to the previous rows must give exactly the rows of a fresh render.
+
+Usage:
+    python benchmarks/bench_quote_preview.py [items] [edits]
+"""
+import copy
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_quote_renderer import make_quote
+from utils import renderer
+from utils.quote_preview import quote_ops
+
+
+def edit(data, rnd, step):
+    items = data["items"]
+    kind = step % 10
+    if kind < 6:
+        items[rnd.randrange(len(items))]["quantity"] = rnd.randint(1, 50)
+    elif kind < 8:
+        items.pop(rnd.randrange(len(items)))
+    elif kind < 9:
+        items.append({"code": f"NEW-{step}", "description": f"Nuevo <{step}>", "quantity": 1, "price": 99.5})
+    else:
+        data["client"] = dict(data["client"], phone=f"9{step:03d}-0000")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    edits = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    rnd = random.Random(20)
+    data = make_quote(n)
+
+    rows = [renderer.render_item_row(item) for item in data["items"]]
+    client = renderer.render_client_block(data["client"])
+    sent = copy.deepcopy(data)
+    full_bytes = delta_bytes = 0
+    full_t = delta_t = 0.0
+    ok = True
+    for step in range(edits):
+        edit(data, rnd, step)
+
+        start = time.perf_counter()
+        full_bytes += len(json.dumps({"version": step, "snapshot": renderer.render_quote_html(data)}))
+        full_t += time.perf_counter() - start
+
+        start = time.perf_counter()
+        ops = quote_ops(sent, data)
+        sent = copy.deepcopy(data)
+        delta_bytes += len(json.dumps({"version": step + 1, "base": step, "ops": ops}))
+        delta_t += time.perf_counter() - start
+
+        # What the browser does with the ops
+        totals = None
+        for op in ops:
+            if op["op"] == "splice":
+                rows[op["start"]:op["start"] + op["delete"]] = op["rows"]
+            elif op["op"] == "totals":
+                totals = {k: op[k] for k in ("subtotal", "isv", "total")}
+            elif op["op"] == "client":
+                client = op["html"]
+        ok &= rows == [renderer.render_item_row(item) for item in data["items"]]
+        ok &= client == renderer.render_client_block(data["client"])
+        ok &= totals is None or totals == renderer.format_totals(data["items"])
+
+    print(f"{n} items, {edits} edits")
+    print(f" full document: {full_bytes / edits / 1024:7.1f} KB/edit | {full_t / edits * 1000:6.2f} ms/edit")
+    print(f" delta ops    : {delta_bytes / edits / 1024:7.2f} KB/edit | {delta_t / edits * 1000:6.2f} ms/edit "
+          f"({full_bytes / delta_bytes:.0f}x fewer bytes)")
+    print("ops reproduce a fresh render:", "ok" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
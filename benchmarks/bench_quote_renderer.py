@@ -0,0 +1,73 @@
+"""
+Benchmark: quote preview payload and render time, static vs React renderer.
+
+Renders a generated quote with both modes of utils.renderer.get_quote_html()
+and reports the HTML size, the size of what the browser must additionally
+download and run (CDN scripts, only for the React mode) and the server-side
+render time. Checks that the static output references no external URL and
+contains every item and the computed total.
+
+Usage:
+    python benchmarks/bench_quote_renderer.py [items]
+"""
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import renderer
+
+ROUNDS = 50
+URL_RE = re.compile(r"https?://[^\s\"')]+")
+
+
+def make_quote(n):
+    items = [{"code": f"SKU-{i:05d}", "description": f"Producto <{i}> & accesorio", "brand": "HP",
+              "quantity": 1 + i % 7, "price": round(12.5 + i * 3.17, 2)} for i in range(n)]
+    return {
+        "client": {"name": "Cliente Prueba", "rtn": "08011999000001", "phone": "9999-9999",
+                   "address": "San Pedro Sula"},
+        "items": items,
+        "meta": {"date": "18/10/2026", "valid_until": "02/11/2026", "quote_number": "RD-1001"},
+        "config": {"header": "REDMIL S. DE R.L.\nSan Pedro Sula", "footer": "Válida por 15 días."},
+    }
+
+
+def time_render(data, mode):
+    renderer.get_quote_html(data, mode)  # warm up (template compile, CSS load)
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        html = renderer.get_quote_html(data, mode)
+    return (time.perf_counter() - start) / ROUNDS * 1000, html
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    data = make_quote(n)
+
+    results = {}
+    for mode in ("react", "static"):
+        ms, html = time_render(data, mode)
+        urls = sorted(set(URL_RE.findall(html)))
+        results[mode] = html
+        print(f"{mode:>6}: {len(html.encode()) / 1024:7.1f} KB html | {len(urls)} external resources | "
+              f"render {ms:6.2f} ms")
+        for url in urls:
+            print(f"        + {url}")
+
+    static = results["static"]
+    _, _, total = renderer.quote_totals(data["items"])
+    ok = (not URL_RE.search(static)
+          and "text/babel" not in static
+          and static.count('<tr><td><p>') == n
+          and f"L. {total:,.2f}" in static
+          and "Producto &lt;0&gt; &amp; accesorio" in static
+          and "class=\"toolbar" not in renderer.render_quote_html(data, toolbar=False))
+    print("static output:", "ok" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
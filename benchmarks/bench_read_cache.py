@@ -0,0 +1,79 @@
+"""
+Benchmark: Streamlit reruns with and without the read cache in database.py.
+
+Each "rerun" issues the reads a page render does (dashboard summary, rate,
+config, clients, first inventory page). Every --write-every reruns a product
+is upserted, which must invalidate the cache so the next read sees it.
+
+Usage:
+    python benchmarks/bench_read_cache.py [reruns] [--write-every 10]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+
+N_PRODUCTS = 20_000
+
+
+def seed():
+    database.bulk_upsert_products(
+        {"product_code": f"P{i:05d}", "description": f"Producto {i}", "brand": f"Marca {i % 40}", "cost_usd": 10.0}
+        for i in range(N_PRODUCTS)
+    )
+    for i in range(50):
+        database.create_client({"full_name": f"Cliente {i}", "rtn_id": f"0801{i:010d}", "phone": "", "email": f"c{i}@x.hn", "address": ""})
+
+
+def rerun():
+    database.get_dashboard_summary()
+    database.get_current_exchange_rate()
+    database.get_config("quote_header")
+    database.get_config("quote_footer")
+    database.get_all_clients()
+    database.get_products_page(page_size=100)
+
+
+def run(reruns, write_every):
+    start = time.perf_counter()
+    for i in range(reruns):
+        if write_every and i % write_every == 0:
+            code = f"W{i:05d}"
+            database.upsert_product({"product_code": code, "description": "nuevo", "brand": "Marca 0", "cost_usd": 1.0})
+            if database.search_products(code, limit=1)[0]["product_code"] != code:
+                raise AssertionError("stale read after write")
+        rerun()
+    return (time.perf_counter() - start) / reruns
+
+
+def main():
+    reruns = int(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1].isdigit() else 500
+    write_every = 10
+    if "--write-every" in sys.argv:
+        write_every = int(sys.argv[sys.argv.index("--write-every") + 1])
+
+    database.DB_NAME = os.path.join(tempfile.mkdtemp(), "cache.db")
+    database.init_db()
+    database.stop_checkpointer()
+    seed()
+
+    database.read_cache.enabled = False
+    uncached = run(reruns, write_every)
+
+    database.read_cache.enabled = True
+    database.read_cache.invalidate()
+    cached = run(reruns, write_every)
+    stats = database.cache_stats()
+
+    print(f"reruns: {reruns}, one write every {write_every}")
+    print(f"without cache: {uncached * 1000:8.2f} ms/rerun")
+    print(f"with cache:    {cached * 1000:8.2f} ms/rerun")
+    print(f"hits: {stats['hits']}  misses: {stats['misses']}  hit rate: {stats['hit_rate']:.1%}")
+
+
+if __name__ == "__main__":
+    main()
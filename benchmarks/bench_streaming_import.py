@@ -0,0 +1,103 @@
+"""
+Benchmark: whole-list import vs streaming batched import of a price list.
+
+"list" is the old flow: parse_excel_inventory() builds every product (via a
+DataFrame), then one bulk_upsert_products() call. "stream" feeds
+iter_inventory_batches() straight into bulk_upsert_products() batch by batch.
+Peak Python memory is measured with tracemalloc; both runs must leave the
+same products table.
+
+Usage:
+    python benchmarks/bench_streaming_import.py [rows]
+"""
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openpyxl import Workbook
+
+import database
+from utils import parsers
+
+BATCH_SIZE = 2000
+
+
+class Upload(io.BytesIO):
+    """Stand-in for Streamlit's UploadedFile."""
+    def __init__(self, data, name):
+        super().__init__(data)
+        self.name = name
+
+
+def make_workbook(rows):
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Precios")
+    ws.append(["Código", "Descripción", "Marca", "Precio", "Existencia"])
+    for i in range(rows):
+        ws.append([f"SKU-{i:07d}", f"Producto de prueba número {i}", f"Marca {i % 25}", round(5 + (i % 997) * 1.37, 2), i % 50])
+    out = io.BytesIO()
+    wb.save(out)
+    return out.getvalue()
+
+
+def import_list(data):
+    products = parsers.parse_excel_inventory(Upload(data, "precios.xlsx"))
+    return database.bulk_upsert_products(products)
+
+
+def import_stream(data):
+    totals = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+    for batch in parsers.iter_inventory_batches(Upload(data, "precios.xlsx"), BATCH_SIZE, use_cache=False):
+        result = database.bulk_upsert_products(batch)
+        for key in totals:
+            totals[key] += result[key]
+    return totals
+
+
+def fresh_db():
+    database.DB_NAME = os.path.join(tempfile.mkdtemp(), "import.db")
+    database.init_db()
+    database.stop_checkpointer()
+
+
+def measure(fn, data):
+    # Timed without tracemalloc (it slows Python down several times), then re-run for the peak
+    fresh_db()
+    start = time.perf_counter()
+    result = fn(data)
+    elapsed = time.perf_counter() - start
+
+    fresh_db()
+    tracemalloc.start()
+    fn(data)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    with database.db_connection() as conn:
+        snapshot = conn.execute(
+            "SELECT product_code, description, brand, cost_usd FROM products ORDER BY product_code"
+        ).fetchall()
+    return elapsed, peak, result, [tuple(r) for r in snapshot]
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    data = make_workbook(rows)
+    print(f"{rows} rows, {len(data) / 1e6:.1f} MB workbook")
+
+    list_t, list_peak, list_result, list_rows = measure(import_list, data)
+    stream_t, stream_peak, stream_result, stream_rows = measure(import_stream, data)
+
+    print(f"list:   {list_t:6.2f} s  peak {list_peak / 1e6:7.1f} MB  {list_result}")
+    print(f"stream: {stream_t:6.2f} s  peak {stream_peak / 1e6:7.1f} MB  {stream_result}")
+    same = list_rows == stream_rows
+    print("same products table:", "ok" if same else "FAIL")
+    sys.exit(0 if same else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Microbenchmark: token classification on a synthetic inventory of ~1M tokens.
+
+The previous per-token loop (str.replace + re.match per token, header check
+on an upper-cased copy) vs utils.tokens.classify_row(). Both must give
+identical results, including on odd tokens ("$1,2.50", "15", "1.2.3").
+
+Usage:
+    python benchmarks/bench_tokens.py [tokens]
+"""
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import tokens
+
+BRANDS = ["Samsung", "HP", "Lenovo", "Apple", "Dell", "Epson", "iPhone", "Galaxy"]
+ODD = ["15", "S23", "$1,2.50", "1.2.3", "12,50", "$$3.0", ".5", "5.", "Precio", "page", "1,234.50", "$99.90"]
+
+
+def legacy_classify(tokens_):
+    if len(tokens_) < 3:
+        return None
+    line_str = " ".join(tokens_).upper()
+    if any(h in line_str for h in ("CODIGO", "DESCRIPCION", "PRECIO", "PAGE")):
+        return None
+    price_index = -1
+    price_str = ""
+    for i in range(1, len(tokens_)):
+        t = tokens_[i]
+        t_clean = t.replace('$', '').replace(',', '')
+        if re.match(r'^\d+\.\d+$', t_clean):
+            price_index = i
+            price_str = t
+            break
+    if price_index == -1 or price_index <= 1:
+        return None
+    description = " ".join(tokens_[1:price_index])
+    if len(description) < 2:
+        return None
+    return tokens_[0], description, price_str
+
+
+def make_rows(n_tokens, rnd):
+    rows = []
+    total = 0
+    while total < n_tokens:
+        row = [f"RD-{len(rows):07d}"]
+        row += [rnd.choice(BRANDS) for _ in range(rnd.randint(1, 4))]
+        if rnd.random() < 0.1:
+            row.append(rnd.choice(ODD))
+        row.append(f"{rnd.uniform(1, 5000):,.2f}")
+        row += [str(rnd.randint(0, 300)), f"{rnd.uniform(1, 9000):.2f}"][: rnd.randint(0, 2)]
+        if rnd.random() < 0.02:
+            row = [rnd.choice(ODD) for _ in range(rnd.randint(1, 6))]
+        rows.append(row)
+        total += len(row)
+    return rows, total
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    n_tokens = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rnd = random.Random(14)
+    rows, total = make_rows(n_tokens, rnd)
+
+    old_t, old_rows = timed(lambda: [legacy_classify(r) for r in rows])
+    new_t, new_rows = timed(lambda: [tokens.classify_row(r) for r in rows])
+    print(f"rows:   {total} tokens in {len(rows)} rows | loop {old_t:6.2f} s | classify_row {new_t:6.2f} s "
+          f"| {old_t / new_t:4.1f}x")
+
+    ok = old_rows == new_rows
+    print("identical results:", "ok" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Check for the background exchange-rate refresher in utils/forex.py, run
+against a local stub of the Frankfurter API (no network needed).
+
+Verifies that:
+  * start_refresher() returns immediately even when the API is slow,
+  * concurrent sessions calling it at once start a single thread,
+  * identical rates are not inserted twice,
+  * failures back off exponentially and recover,
+  * get_current_exchange_rate() serves the published rate.
+
+Usage:
+    python benchmarks/check_forex_refresher.py
+"""
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from utils import forex
+
+STUB = {"rate": 24.5, "fail": False, "delay": 0.0, "requests": 0}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        STUB["requests"] += 1
+        time.sleep(STUB["delay"])
+        if STUB["fail"]:
+            self.send_response(503)
+            self.end_headers()
+            return
+        body = json.dumps({"amount": 1.0, "base": "USD", "rates": {"HNL": STUB["rate"]}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def api_rows():
+    with database.db_connection() as conn:
+        return conn.execute("SELECT COUNT(*) FROM exchange_rates WHERE source = 'Frankfurter API'").fetchone()[0]
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def check(name, ok):
+    print(f"[{'ok' if ok else 'FAIL'}] {name}")
+    return ok
+
+
+def main():
+    database.DB_NAME = os.path.join(tempfile.mkdtemp(), "forex.db")
+    database.init_db()
+    database.stop_checkpointer()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/latest"
+
+    forex.RETRY_DELAY = 0.05
+    forex.MAX_RETRY_DELAY = 0.4
+    interval = 0.1
+    results = []
+
+    # 1. Startup does not wait on a slow API
+    STUB["delay"] = 1.0
+    start = time.perf_counter()
+    forex.start_refresher(interval=interval, url=url)
+    forex.start_refresher(interval=interval, url=url)  # second rerun: no second thread
+    elapsed = time.perf_counter() - start
+    results.append(check(f"start_refresher returned in {elapsed * 1000:.1f} ms", elapsed < 0.1))
+    forex.stop_refresher()
+
+    # Concurrent sessions: every thread calls start_refresher() at the same moment
+    barrier = threading.Barrier(16)
+    def session():
+        barrier.wait()
+        forex.start_refresher(interval=interval, url=url)
+    sessions = [threading.Thread(target=session) for _ in range(16)]
+    for t in sessions:
+        t.start()
+    for t in sessions:
+        t.join()
+    running = [t for t in threading.enumerate() if t.name == "forex-refresher"]
+    results.append(check(f"{len(running)} refresher thread(s) after 16 concurrent starts", len(running) == 1))
+    STUB["delay"] = 0.0
+
+    # 2. Polling the same rate inserts one row
+    wait_for(lambda: forex.get_status()["unchanged"] >= 5)
+    results.append(check("identical rate stored once", api_rows() == 1))
+    results.append(check("published rate is served", database.get_current_exchange_rate() == 24.5))
+
+    # 3. A changed rate is stored and published
+    STUB["rate"] = 24.6
+    wait_for(lambda: forex.get_status()["rate"] == 24.6)
+    results.append(check("changed rate stored", api_rows() == 2 and database.get_current_exchange_rate() == 24.6))
+
+    # 4. Failures back off
+    STUB["fail"] = True
+    wait_for(lambda: forex.get_status()["failures"] >= 1)
+    before = STUB["requests"]
+    time.sleep(1.5)
+    failed_polls = STUB["requests"] - before
+    # Without backoff that window would see ~15 polls at interval=0.1
+    results.append(check(f"backoff: {failed_polls} polls in 1.5 s while failing", 0 < failed_polls <= 8))
+    delays = [forex.next_delay(n, 3600) for n in range(7)]
+    results.append(check(f"delays {delays}", delays == [3600, 0.05, 0.1, 0.2, 0.4, 0.4, 0.4]))
+    results.append(check("last good rate still served", database.get_current_exchange_rate() == 24.6))
+
+    # 5. Recovery resets the failure count without inserting a duplicate
+    STUB["fail"] = False
+    recovered = wait_for(lambda: forex.get_status()["failures"] == 0, timeout=2.0)
+    results.append(check("recovers after failures", recovered and api_rows() == 2))
+
+    forex.stop_refresher()
+    server.shutdown()
+    print(forex.get_status())
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Regression check for the PyMuPDF block/line shortcut in utils/parsers.py.
+
+Feeds _group_lines() hand-built word tuples (x0, y0, x1, y1, text, block_no,
+line_no, word_no), so no PDF is needed, and verifies that:
+  * one text object per cell with long descriptions is rebuilt into rows
+    (enough words per cell to pass the average-words test),
+  * whole rows as one text line still go through the block shortcut,
+  * a header sharing its band with nothing else does not block the shortcut.
+
+Usage:
+    python benchmarks/check_line_grouping.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import parsers
+
+ROW_SPACING = 17
+
+
+def cell_words(x, y, text, block, line=0):
+    """Word tuples for one text object starting at (x, y), 5pt per character."""
+    words = []
+    for n, token in enumerate(text.split()):
+        words.append((x, y - 8, x + 5 * len(token), y + 2, token, block, line, n))
+        x += 5 * len(token) + 4
+    return words
+
+
+def products(rows):
+    found = []
+    for row in rows:
+        product = parsers._parse_row([w[4] for w in row])
+        if product:
+            found.append((product["product_code"], product["description"], product["cost_usd"]))
+    return found
+
+
+def check(name, ok):
+    print(f"[{'ok' if ok else 'FAIL'}] {name}")
+    return ok
+
+
+def main():
+    desc = "Samsung Galaxy S23 128GB Color Negro Caja Sellada"
+    expected = [(f"RD-{n:05d}", desc, 100.0 + n) for n in range(10)]
+    results = []
+
+    # 1. One block per cell, long descriptions: 10 words over 3 lines per row
+    words = cell_words(36, 40, "CODIGO DESCRIPCION PRECIO", 0)
+    block = 1
+    for n, (code, _, price) in enumerate(expected):
+        y = 62 + n * ROW_SPACING
+        for x, text in ((36, code), (110, desc), (470, f"{price:.2f}")):
+            words.extend(cell_words(x, y, text, block))
+            block += 1
+    results.append(check("per-cell blocks reach the histogram",
+                         parsers._lines_from_blocks(list(words), parsers._word_height(words)) is None))
+    results.append(check("per-cell rows with long descriptions are parsed",
+                         products(parsers._group_lines(list(words))) == expected))
+
+    # 2. One line per row: the shortcut is taken and every row is parsed
+    words = cell_words(36, 40, "CODIGO DESCRIPCION PRECIO", 0)
+    for n, (code, _, price) in enumerate(expected):
+        words.extend(cell_words(36, 62 + n * ROW_SPACING, f"{code} {desc} {price:.2f} 12", 1, n))
+    rows = parsers._lines_from_blocks(list(words), parsers._word_height(words))
+    results.append(check("whole-row lines use the block shortcut", rows is not None and len(rows) == 11))
+    results.append(check("whole-row lines are parsed", products(parsers._group_lines(list(words))) == expected))
+
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
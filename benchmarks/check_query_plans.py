@@ -0,0 +1,69 @@
+"""
+Query-plan regression check for the hot read paths in database.py.
+
+Builds a fresh database through init_db() (so every migration runs), then
+EXPLAINs each query and fails if SQLite plans a full table scan on it, or a
+temp B-tree sort on the listings that should come straight from an index.
+
+Usage:
+    python benchmarks/check_query_plans.py
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+
+# name -> (sql, params, allow_sort). Keep these in sync with database.py.
+# allow_sort: the result is small (already filtered by an index) so sorting it is fine.
+QUERIES = {
+    "get_product_quotes": ("""
+        SELECT q.id, q.quote_date, q.total_amount_lps, c.full_name as client_name, qi.quantity, qi.unit_price_lps
+        FROM quote_items qi
+        JOIN quotes q ON qi.quote_id = q.id
+        LEFT JOIN clients c ON q.client_id = c.id
+        WHERE qi.product_id = ?
+        ORDER BY q.quote_date DESC
+    """, (1,), True),
+    "quote_items_by_quote": ("SELECT * FROM quote_items WHERE quote_id = ?", (1,), False),
+    "get_product_history": ("SELECT * FROM product_price_history WHERE product_id = ? ORDER BY change_date DESC", (1,), False),
+    "get_current_exchange_rate": ("SELECT rate_value FROM exchange_rates ORDER BY rate_date DESC, id DESC LIMIT 1", (), False),
+    "get_all_quotes_history": ("SELECT * FROM cotizaciones_historico ORDER BY created_at DESC", (), False),
+    "get_all_products": ("SELECT * FROM products ORDER BY brand, product_code", (), False),
+}
+
+
+def plan_problems(conn, sql, params, allow_sort):
+    rows = conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+    details = [row[3] for row in rows]
+    problems = []
+    for d in details:
+        # "SCAN t USING INDEX ..." walks an index in order (no sort), which is
+        # what we want for full listings; a bare "SCAN t" is a table scan.
+        if d.startswith("SCAN") and "INDEX" not in d:
+            problems.append(d)
+        if "TEMP B-TREE" in d and not allow_sort:
+            problems.append(d)
+    return details, problems
+
+
+def main():
+    database.DB_NAME = os.path.join(tempfile.mkdtemp(), "plans.db")
+    database.init_db()
+    database.stop_checkpointer()
+
+    failed = False
+    with database.db_connection() as conn:
+        for name, (sql, params, allow_sort) in QUERIES.items():
+            details, problems = plan_problems(conn, sql, params, allow_sort)
+            status = "FAIL" if problems else "ok"
+            print(f"[{status}] {name}: {' | '.join(details)}")
+            failed = failed or bool(problems)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Stress test: concurrent readers (get_all_products) and writers (upsert_product)
+against the same SQLite file, each in its own process like separate Streamlit
+servers. Reports operations and "database is locked" failures.
+
+Usage:
+    python benchmarks/stress_db_concurrency.py [--rollback-journal] [seconds]
+
+--rollback-journal runs with an empty storage profile (the old behaviour) for
+comparison.
+"""
+import os
+import sys
+import sqlite3
+import tempfile
+import time
+import multiprocessing as mp
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+
+READERS = 6
+WRITERS = 3
+
+
+def _setup(db_name, legacy):
+    database.DB_NAME = db_name
+    database.read_cache.enabled = False  # every read must reach SQLite
+    if legacy:
+        database.STORAGE_PROFILE = {}
+
+
+def reader(db_name, legacy, seconds, results):
+    _setup(db_name, legacy)
+    ops = errors = 0
+    deadline = time.time() + seconds
+    while time.time() < deadline:
+        try:
+            database.get_all_products()
+            ops += 1
+        except sqlite3.OperationalError:
+            errors += 1
+    results.put(("reader", ops, errors))
+
+
+def writer(db_name, legacy, seconds, worker_id, results):
+    _setup(db_name, legacy)
+    ops = errors = 0
+    i = 0
+    deadline = time.time() + seconds
+    while time.time() < deadline:
+        item = {
+            "product_code": f"W{worker_id}-{i % 500:04d}",
+            "description": f"Producto {i}",
+            "brand": f"Marca {worker_id}",
+            "cost_usd": float(i % 97) + 0.5,
+        }
+        # upsert_product swallows errors and returns False
+        if database.upsert_product(item, user_name="Stress"):
+            ops += 1
+        else:
+            errors += 1
+        i += 1
+    results.put(("writer", ops, errors))
+
+
+def main():
+    args = sys.argv[1:]
+    legacy = "--rollback-journal" in args
+    args = [a for a in args if a != "--rollback-journal"]
+    seconds = float(args[0]) if args else 5.0
+
+    db_name = os.path.join(tempfile.mkdtemp(), "stress.db")
+    _setup(db_name, legacy)
+    database.init_db()
+    for i in range(2000):
+        database.upsert_product({"product_code": f"S-{i:05d}", "description": f"Seed {i}", "brand": "Seed", "cost_usd": 1.0})
+    database.stop_checkpointer()
+
+    results = mp.Queue()
+    procs = [mp.Process(target=reader, args=(db_name, legacy, seconds, results)) for _ in range(READERS)]
+    procs += [mp.Process(target=writer, args=(db_name, legacy, seconds, w, results)) for w in range(WRITERS)]
+    for p in procs:
+        p.start()
+    totals = {"reader": [0, 0], "writer": [0, 0]}
+    for _ in procs:
+        kind, ops, errors = results.get()
+        totals[kind][0] += ops
+        totals[kind][1] += errors
+    for p in procs:
+        p.join()
+
+    mode = "rollback journal" if legacy else "storage profile (WAL)"
+    print(f"{mode}, {READERS} readers / {WRITERS} writers, {seconds:.0f}s")
+    for kind, (ops, errors) in totals.items():
+        print(f"  {kind}s: {ops} ok ({ops / seconds:.0f}/s), {errors} locked/failed")
+
+
+if __name__ == "__main__":
+    main()
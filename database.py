@@ -1,583 +1,1009 @@
 import sqlite3
 import os
 import hashlib
+import re
+import threading
+import time
+from utils import cache, db_pool, migrations
 
 DB_NAME = "redmil_pro.db"
+POOL_SIZE = 5
+
+# Storage profile applied to every connection.
+# WAL lets readers keep working while an import is writing; busy_timeout makes
+# writers wait for the lock instead of failing with "database is locked".
+STORAGE_PROFILE = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,        # ms
+    "cache_size": -20000,        # negative = KiB (~20 MB)
+    "mmap_size": 268435456,      # 256 MB
+    "temp_store": "MEMORY",
+    "wal_autocheckpoint": 1000,  # pages
+}
+CHECKPOINT_INTERVAL = 300  # seconds between forced WAL checkpoints
+CACHE_SIZE = 256  # cached read results
+CACHE_TTL = 60    # seconds; bounds staleness for writes made by other processes
+
+_pool = None
+_pool_lock = threading.Lock()
+_checkpointer = None
+
+# Read helpers are memoized here; every write helper invalidates it.
+read_cache = cache.ReadCache(maxsize=CACHE_SIZE, ttl=CACHE_TTL, scope=lambda: DB_NAME)
+cached = read_cache.cached
+invalidates = read_cache.invalidates
+
+# Current exchange rate as published by update_exchange_rate / utils.forex:
+# ({'rate_value', 'rate_date'}, monotonic time it was published, DB_NAME)
+_current_rate = None
+_rate_lock = threading.Lock()
+
+def apply_storage_profile(conn, profile=None):
+    """Applies the PRAGMAs of the storage profile to a connection."""
+    profile = STORAGE_PROFILE if profile is None else profile
+    for pragma, value in profile.items():
+        conn.execute(f"PRAGMA {pragma} = {value}")
+
+def product_fingerprint(product_code, description, cost_usd, brand):
+    """Short hash of the fields a supplier price list controls (compared by delta imports)."""
+    cost = "" if cost_usd is None else f"{float(cost_usd):.4f}"
+    raw = "\x1f".join((str(product_code), description or "", cost, brand or ""))
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=8).hexdigest()
+
+def _on_connect(conn):
+    """Per-connection setup: storage PRAGMAs and the SQL functions the helpers use."""
+    apply_storage_profile(conn)
+    conn.create_function("product_fingerprint", 4, product_fingerprint, deterministic=True)
 
 def get_connection():
-    """Establishes a connection to the SQLite database."""
-    conn = sqlite3.connect(DB_NAME, check_same_thread=False)
+    """Establishes a standalone (non-pooled) connection to the SQLite database."""
+    timeout = STORAGE_PROFILE.get("busy_timeout", 5000) / 1000
+    conn = sqlite3.connect(DB_NAME, check_same_thread=False, timeout=timeout)
     conn.row_factory = sqlite3.Row  # Access columns by name
+    _on_connect(conn)
     return conn
 
+def get_pool():
+    """Returns the shared connection pool, re-creating it if DB_NAME changed."""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.db_name != DB_NAME:
+            if _pool is not None:
+                _pool.close_all()
+            _pool = db_pool.ConnectionPool(DB_NAME, max_size=POOL_SIZE, on_connect=_on_connect)
+        return _pool
+
+def db_connection():
+    """
+    Context manager that borrows a pooled connection:
+
+        with db_connection() as conn:
+            conn.execute(...)
+    """
+    return get_pool().connection()
+
+def checkpoint(mode="PASSIVE"):
+    """Runs a WAL checkpoint. Returns (busy, wal_pages, checkpointed_pages)."""
+    with db_connection() as conn:
+        row = conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+        return tuple(row)
+
+def _checkpoint_loop(stop_event):
+    while not stop_event.wait(CHECKPOINT_INTERVAL):
+        try:
+            # TRUNCATE also shrinks the -wal file back to zero bytes
+            checkpoint("TRUNCATE")
+        except Exception as e:
+            print(f"Error running WAL checkpoint: {e}")
+
+def start_checkpointer():
+    """Starts the background WAL checkpoint thread (only once per process)."""
+    global _checkpointer
+    with _pool_lock:
+        if _checkpointer is not None:
+            return
+        stop_event = threading.Event()
+        thread = threading.Thread(target=_checkpoint_loop, args=(stop_event,), daemon=True, name="wal-checkpointer")
+        thread.start()
+        _checkpointer = (thread, stop_event)
+
+def stop_checkpointer():
+    """Stops the background WAL checkpoint thread."""
+    global _checkpointer
+    with _pool_lock:
+        if _checkpointer is None:
+            return
+        thread, stop_event = _checkpointer
+        _checkpointer = None
+    stop_event.set()
+    thread.join()
+
+@invalidates
 def init_db():
-    """Initializes the database table structure."""
-    conn = get_connection()
-    c = conn.cursor()
-    
-    # Enable foreign keys
-    c.execute("PRAGMA foreign_keys = ON;")
-
-    # Users Table
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            password_hash TEXT NOT NULL,
-            role TEXT NOT NULL DEFAULT 'vendedor',
-            full_name TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-    """)
-
-    # Products Table
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS products (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            product_code TEXT UNIQUE NOT NULL,
-            description TEXT NOT NULL,
-            brand TEXT,
-            cost_usd REAL,
-            cost_lps REAL,
-            stock_quantity INTEGER DEFAULT 0,
-            category TEXT,
-            image_url TEXT,
-            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-    """)
-
-    # Exchange Rates Table
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS exchange_rates (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            rate_date DATE DEFAULT (DATE('now')),
-            rate_value REAL NOT NULL,
-            source TEXT
-        );
-    """)
-
-    # Margins Table
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS margins (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            brand TEXT UNIQUE,
-            margin_percentage REAL NOT NULL,
-            updated_by INTEGER,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY(updated_by) REFERENCES users(id)
-        );
-    """)
-
-    # Clients Table
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS clients (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            full_name TEXT NOT NULL,
-            rtn_id TEXT UNIQUE,
-            phone TEXT,
-            email TEXT,
-            address TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-    """)
-
-    # Quotes Table
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS quotes (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            client_id INTEGER,
-            user_id INTEGER,
-            quote_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            expiration_date DATE,
-            total_amount_lps REAL,
-            status TEXT DEFAULT 'draft',
-            pdf_path TEXT,
-            FOREIGN KEY(client_id) REFERENCES clients(id),
-            FOREIGN KEY(user_id) REFERENCES users(id)
-        );
-    """)
-
-    # Quote Items Table
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS quote_items (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            quote_id INTEGER,
-            product_id INTEGER,
-            quantity INTEGER NOT NULL,
-            unit_price_lps REAL NOT NULL,
-            total_lps REAL NOT NULL,
-            FOREIGN KEY(quote_id) REFERENCES quotes(id),
-            FOREIGN KEY(product_id) REFERENCES products(id)
-        );
-    """)
-
-    # Create a default admin user if no users exist
-    c.execute("SELECT count(*) FROM users")
-    if c.fetchone()[0] == 0:
-        # Default password is 'admin123' - In production, force change
-        # Simple hash for demo; use bcrypt in real auth module
-        default_pass = "admin123" 
-        # Note: We will use a proper auth module for hashing later, 
-        # but for initial seed we'll just put a placeholder or basic hash if needed.
-        # Actually, let's just insert it. The auth module will handle verification.
-        # For now we will assume the auth module does the hashing. 
-        # I'll modify this once I write auth.py, but for now let's leave it empty 
-        # or rely on the auth module to seed it.
-        pass
-
-    
-    # Brands Table (New - for persistence after clearing products)
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS brands (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT UNIQUE NOT NULL
-        );
-    """)
-
-    # Price History Table
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS product_price_history (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            product_id INTEGER,
-            old_cost_usd REAL,
-            new_cost_usd REAL,
-            change_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            changed_by TEXT, 
-            FOREIGN KEY(product_id) REFERENCES products(id)
-        );
-    """)
-
-    # Historical Quotes Table (Snapshot)
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS cotizaciones_historico (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            client_name TEXT,
-            client_details TEXT, -- JSON structure
-            products_json TEXT, -- JSON structure with price snapshots
-            total_lps REAL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-    """)
-
-    # System Config Table
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS system_config (
-            key TEXT PRIMARY KEY,
-            value TEXT
-        );
-    """)
-    
-    # Default configs
-    c.execute("INSERT OR IGNORE INTO system_config (key, value) VALUES ('quote_header', 'REDMIL TECHNOLOGY\nSan Pedro Sula, Honduras\nRTN: 05019012345678')")
-    c.execute("INSERT OR IGNORE INTO system_config (key, value) VALUES ('quote_footer', 'Gracias por su preferencia.')")
+    """Initializes the database by applying pending schema migrations."""
+    with db_connection() as conn:
+        applied = migrations.run_migrations(conn)
+        if applied:
+            print(f"Applied migrations: {applied}")
+
+        c = conn.cursor()
+        # Default configs
+        c.execute("INSERT OR IGNORE INTO system_config (key, value) VALUES ('quote_header', 'REDMIL TECHNOLOGY\nSan Pedro Sula, Honduras\nRTN: 05019012345678')")
+        c.execute("INSERT OR IGNORE INTO system_config (key, value) VALUES ('quote_footer', 'Gracias por su preferencia.')")
+
+        # Rows written before fingerprints existed (or by other tools)
+        c.execute("""
+            UPDATE products SET fingerprint = product_fingerprint(product_code, description, cost_usd, brand)
+            WHERE fingerprint IS NULL
+        """)
 
-    conn.commit()
+        conn.commit()
 
-    conn.close()
+    if STORAGE_PROFILE.get("journal_mode", "").upper() == "WAL":
+        start_checkpointer()
     print("Database initialized successfully.")
 
+@invalidates
 def upsert_product(product_data, user_name="System"):
     """Inserts or updates a product. Logs price changes."""
-    conn = get_connection()
-    c = conn.cursor()
-    try:
-        # Check if exists
-        c.execute("SELECT id FROM products WHERE product_code = ?", (product_data['product_code'],))
-        exists = c.fetchone()
+    with db_connection() as conn:
+        c = conn.cursor()
+        try:
+            # Check if exists
+            c.execute("SELECT id FROM products WHERE product_code = ?", (product_data['product_code'],))
+            exists = c.fetchone()
         
-        # Ensure brand exists in brands table
-        brand_name = product_data.get('brand')
-        if brand_name:
-            try:
-                c.execute("INSERT OR IGNORE INTO brands (name) VALUES (?)", (brand_name,))
-            except:
-                pass
-
-        if exists:
-            # Check for price change
-            current_id = exists['id']
-            # Get current price to compare
-            c.execute("SELECT cost_usd FROM products WHERE id = ?", (current_id,))
-            current_price = c.fetchone()[0]
-            new_price = float(product_data['cost_usd'])
+            # Ensure brand exists in brands table
+            brand_name = product_data.get('brand')
+            if brand_name:
+                try:
+                    c.execute("INSERT OR IGNORE INTO brands (name) VALUES (?)", (brand_name,))
+                except:
+                    pass
+
+            if exists:
+                # Check for price change
+                current_id = exists['id']
+                # Get current price to compare
+                c.execute("SELECT cost_usd FROM products WHERE id = ?", (current_id,))
+                current_price = c.fetchone()[0]
+                new_price = float(product_data['cost_usd'])
+            
+                if abs(current_price - new_price) > 0.001:
+                    # Price changed, log it
+                    c.execute("""
+                        INSERT INTO product_price_history (product_id, old_cost_usd, new_cost_usd, changed_by)
+                        VALUES (?, ?, ?, ?)
+                    """, (current_id, current_price, new_price, user_name))
             
-            if abs(current_price - new_price) > 0.001:
-                # Price changed, log it
                 c.execute("""
-                    INSERT INTO product_price_history (product_id, old_cost_usd, new_cost_usd, changed_by)
-                    VALUES (?, ?, ?, ?)
-                """, (current_id, current_price, new_price, user_name))
+                    UPDATE products SET 
+                        description = ?, 
+                        cost_usd = ?, 
+                        cost_lps = ?,
+                        brand = COALESCE(?, brand),
+                        category = COALESCE(?, category),
+                        stock_quantity = COALESCE(?, stock_quantity),
+                        fingerprint = product_fingerprint(product_code, ?, ?, COALESCE(?, brand)),
+                        last_updated = CURRENT_TIMESTAMP
+                    WHERE product_code = ?
+                """, (
+                    product_data['description'], 
+                    product_data['cost_usd'], 
+                    product_data.get('cost_lps', 0), 
+                    product_data.get('brand'),
+                    product_data.get('category'),
+                    product_data.get('stock_quantity'),
+                    product_data['description'],
+                    product_data['cost_usd'],
+                    product_data.get('brand'),
+                    product_data['product_code']
+                ))
+            else:
+                c.execute("""
+                    INSERT INTO products (product_code, description, brand, cost_usd, cost_lps, stock_quantity, category, fingerprint)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, product_fingerprint(?, ?, ?, ?))
+                """, (
+                    product_data['product_code'],
+                    product_data['description'],
+                    product_data.get('brand', 'Unknown'),
+                    product_data['cost_usd'],
+                    product_data.get('cost_lps', 0),
+                    product_data.get('stock_quantity', 0),
+                    product_data.get('category', 'General'),
+                    product_data['product_code'],
+                    product_data['description'],
+                    product_data['cost_usd'],
+                    product_data.get('brand', 'Unknown')
+                ))
+            
+                # Log initial price? Maybe not needed for history, but good for tracking.
+                # Let's just track changes for now to keep it clean.
             
+            conn.commit()
+            return True
+        except Exception as e:
+            print(f"Error upserting product: {e}")
+            return False
+
+def _staging_row(product_data):
+    """Maps a product dict to the columns of the import staging table."""
+    def as_float(v):
+        return float(v) if v is not None and v == v else None  # NaN -> None
+
+    def as_int(v):
+        v = as_float(v)
+        return int(v) if v is not None else None
+
+    brand = product_data.get('brand')
+    return (
+        str(product_data['product_code']).strip(),
+        product_data['description'],
+        brand if brand else None,
+        as_float(product_data['cost_usd']),
+        as_float(product_data.get('cost_lps', 0)),
+        as_int(product_data.get('stock_quantity')),
+        product_data.get('category') or None,
+        product_data.get('image_url') or None,
+    )
+
+@invalidates
+def bulk_upsert_products(rows, user_name="System", delta=False):
+    """
+    Inserts or updates many products in ONE transaction.
+    Rows are staged in a temp table and merged into `products` with a few
+    set-based statements (brands, price history, update, insert). Missing
+    (None) cost_lps, brand, category, stock_quantity and image_url keep the
+    stored values; product_code, description and cost_usd are required.
+    Returns {'inserted': n, 'updated': n, 'unchanged': n}, or None on error.
+
+    delta=True is the supplier price-list mode: a row is unchanged when its
+    fingerprint (code, description, cost, brand) matches the stored one.
+    Unchanged rows only get their derived cost_lps refreshed (after a rate
+    change), without touching last_updated or the price history. The result
+    also lists the 'added' and 'changed' codes.
+    """
+    with db_connection() as conn:
+        c = conn.cursor()
+        try:
+            c.execute("DROP TABLE IF EXISTS temp.import_staging")
             c.execute("""
-                UPDATE products SET 
-                    description = ?, 
-                    cost_usd = ?, 
-                    cost_lps = ?,
-                    brand = COALESCE(?, brand),
-                    category = COALESCE(?, category),
-                    stock_quantity = COALESCE(?, stock_quantity),
-                    last_updated = CURRENT_TIMESTAMP
-                WHERE product_code = ?
-            """, (
-                product_data['description'], 
-                product_data['cost_usd'], 
-                product_data.get('cost_lps', 0), 
-                product_data.get('brand'),
-                product_data.get('category'),
-                product_data.get('stock_quantity'),
-                product_data['product_code']
-            ))
-        else:
+                CREATE TEMP TABLE import_staging (
+                    product_code TEXT PRIMARY KEY,
+                    description TEXT,
+                    brand TEXT,
+                    cost_usd REAL,
+                    cost_lps REAL,
+                    stock_quantity INTEGER,
+                    category TEXT,
+                    image_url TEXT,
+                    product_id INTEGER,
+                    action TEXT
+                )
+            """)
+            # Duplicated codes in the file: last row wins
+            c.executemany("""
+                INSERT OR REPLACE INTO import_staging
+                    (product_code, description, brand, cost_usd, cost_lps, stock_quantity, category, image_url)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (_staging_row(r) for r in rows))
+
+            # 1. Match against existing products and classify each row
             c.execute("""
-                INSERT INTO products (product_code, description, brand, cost_usd, cost_lps, stock_quantity, category)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (
-                product_data['product_code'],
-                product_data['description'],
-                product_data.get('brand', 'Unknown'),
-                product_data['cost_usd'],
-                product_data.get('cost_lps', 0),
-                product_data.get('stock_quantity', 0),
-                product_data.get('category', 'General')
-            ))
-            
-            # Log initial price? Maybe not needed for history, but good for tracking.
-            # Let's just track changes for now to keep it clean.
-            
-        conn.commit()
-        return True
-    except Exception as e:
-        print(f"Error upserting product: {e}")
-        return False
-    finally:
-        conn.close()
+                UPDATE import_staging SET product_id = (
+                    SELECT p.id FROM products p WHERE p.product_code = import_staging.product_code
+                )
+            """)
+            if delta:
+                c.execute("""
+                    UPDATE import_staging SET action = CASE
+                        WHEN product_id IS NULL THEN 'insert'
+                        WHEN EXISTS (
+                            SELECT 1 FROM products p
+                            WHERE p.id = import_staging.product_id
+                              AND p.fingerprint = product_fingerprint(p.product_code, import_staging.description,
+                                                                      import_staging.cost_usd,
+                                                                      COALESCE(import_staging.brand, p.brand))
+                        ) THEN 'unchanged'
+                        ELSE 'update'
+                    END
+                """)
+            else:
+                c.execute("""
+                    UPDATE import_staging SET action = CASE
+                        WHEN product_id IS NULL THEN 'insert'
+                        WHEN EXISTS (
+                            SELECT 1 FROM products p
+                            WHERE p.id = import_staging.product_id
+                              AND p.description IS import_staging.description
+                              AND p.cost_usd IS import_staging.cost_usd
+                              AND p.cost_lps IS COALESCE(import_staging.cost_lps, p.cost_lps)
+                              AND p.brand IS COALESCE(import_staging.brand, p.brand)
+                              AND p.category IS COALESCE(import_staging.category, p.category)
+                              AND p.stock_quantity IS COALESCE(import_staging.stock_quantity, p.stock_quantity)
+                              AND p.image_url IS COALESCE(import_staging.image_url, p.image_url)
+                        ) THEN 'unchanged'
+                        ELSE 'update'
+                    END
+                """)
+
+            # 2. Ensure brands exist in brands table
+            c.execute("""
+                INSERT OR IGNORE INTO brands (name)
+                SELECT DISTINCT brand FROM import_staging WHERE brand IS NOT NULL
+            """)
+
+            # 3. Log price changes before overwriting them
+            c.execute("""
+                INSERT INTO product_price_history (product_id, old_cost_usd, new_cost_usd, changed_by)
+                SELECT p.id, p.cost_usd, s.cost_usd, ?
+                FROM import_staging s
+                JOIN products p ON p.id = s.product_id
+                WHERE s.action = 'update' AND ABS(p.cost_usd - s.cost_usd) > 0.001
+            """, (user_name,))
+
+            # 4. Update changed products
+            c.execute("""
+                UPDATE products SET
+                    description = s.description,
+                    cost_usd = s.cost_usd,
+                    cost_lps = COALESCE(s.cost_lps, products.cost_lps),
+                    brand = COALESCE(s.brand, products.brand),
+                    category = COALESCE(s.category, products.category),
+                    stock_quantity = COALESCE(s.stock_quantity, products.stock_quantity),
+                    image_url = COALESCE(s.image_url, products.image_url),
+                    fingerprint = product_fingerprint(products.product_code, s.description, s.cost_usd,
+                                                      COALESCE(s.brand, products.brand)),
+                    last_updated = CURRENT_TIMESTAMP
+                FROM import_staging s
+                WHERE products.id = s.product_id AND s.action = 'update'
+            """)
 
+            if delta:
+                # Same product at a new exchange rate: keep cost_lps current, nothing else
+                c.execute("""
+                    UPDATE products SET cost_lps = s.cost_lps
+                    FROM import_staging s
+                    WHERE products.id = s.product_id AND s.action = 'unchanged'
+                      AND s.cost_lps IS NOT NULL AND products.cost_lps IS NOT s.cost_lps
+                """)
+
+            # 5. Insert new products
+            c.execute("""
+                INSERT INTO products (product_code, description, brand, cost_usd, cost_lps, stock_quantity, category,
+                                      image_url, fingerprint)
+                SELECT product_code, description, COALESCE(brand, 'Unknown'), cost_usd,
+                       COALESCE(cost_lps, 0), COALESCE(stock_quantity, 0), COALESCE(category, 'General'), image_url,
+                       product_fingerprint(product_code, description, cost_usd, COALESCE(brand, 'Unknown'))
+                FROM import_staging
+                WHERE action = 'insert'
+            """)
+
+            c.execute("SELECT action, count(*) FROM import_staging GROUP BY action")
+            counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+            names = {'insert': 'inserted', 'update': 'updated', 'unchanged': 'unchanged'}
+            for action, n in c.fetchall():
+                counts[names[action]] = n
+            if delta:
+                c.execute("SELECT product_code FROM import_staging WHERE action = 'insert' ORDER BY product_code")
+                counts['added'] = [row[0] for row in c.fetchall()]
+                c.execute("SELECT product_code FROM import_staging WHERE action = 'update' ORDER BY product_code")
+                counts['changed'] = [row[0] for row in c.fetchall()]
+
+            c.execute("DROP TABLE temp.import_staging")
+            conn.commit()
+            return counts
+        except Exception as e:
+            conn.rollback()
+            print(f"Error in bulk upsert: {e}")
+            return None
+
+def find_missing_products(seen_codes, brands=None):
+    """
+    Product codes in the database that a delta import did not contain.
+    `brands` limits the check to the brands the price list covers, so importing
+    one supplier doesn't report every other supplier's products as missing.
+    """
+    with db_connection() as conn:
+        c = conn.cursor()
+        try:
+            c.execute("DROP TABLE IF EXISTS temp.seen_codes")
+            c.execute("CREATE TEMP TABLE seen_codes (product_code TEXT PRIMARY KEY)")
+            c.executemany("INSERT OR IGNORE INTO seen_codes VALUES (?)", ((str(code),) for code in seen_codes))
+            sql = """
+                SELECT p.product_code FROM products p
+                WHERE NOT EXISTS (SELECT 1 FROM seen_codes s WHERE s.product_code = p.product_code)
+            """
+            params = []
+            if brands:
+                brands = list(brands)
+                sql += f" AND p.brand IN ({','.join('?' * len(brands))})"
+                params = brands
+            c.execute(sql + " ORDER BY p.product_code", params)
+            missing = [row[0] for row in c.fetchall()]
+            c.execute("DROP TABLE temp.seen_codes")
+            conn.commit()
+            return missing
+        except Exception as e:
+            conn.rollback()
+            print(f"Error finding missing products: {e}")
+            return []
+
+@cached
 def get_all_products():
     """Returns all products as a list of dicts."""
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("SELECT * FROM products ORDER BY brand, product_code")
-    products = [dict(row) for row in c.fetchall()]
-    conn.close()
-    conn.close()
-    return products
+    with db_connection() as conn:
+        c = conn.cursor()
+        c.execute("SELECT * FROM products ORDER BY brand, product_code")
+        products = [dict(row) for row in c.fetchall()]
+        return products
+
+def _fts_terms(text, columns=None):
+    """
+    Turns free text into an FTS5 query: every word becomes a prefix term and
+    all of them must match. `columns` restricts the terms to those columns.
+    """
+    words = re.findall(r"\w+", text or "")
+    if not words:
+        return None
+    terms = " AND ".join(f'"{w}"*' for w in words)
+    if columns:
+        return f"{{{' '.join(columns)}}} : ({terms})"
+    return f"({terms})"
+
+def _has_products_fts(conn):
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products_fts'").fetchone()
+    return row is not None
+
+def _product_filters(brand=None, price_range=None):
+    """WHERE fragments + params for the brand / price filters shared by product listings."""
+    where, params = [], []
+    if brand:
+        brands = [brand] if isinstance(brand, str) else list(brand)
+        where.append(f"p.brand IN ({', '.join('?' * len(brands))})")
+        params.extend(brands)
+    if price_range:
+        where.append("p.cost_usd BETWEEN ? AND ?")
+        params.extend([price_range[0], price_range[1]])
+    return where, params
+
+def _product_source(conn, query=None, code=None, brand=None, price_range=None):
+    """
+    FROM/WHERE clause shared by product listings, searches and counts.
+    Returns (sql, params, ranked); ranked=True when the FTS index is used.
+    """
+    where, params = _product_filters(brand, price_range)
+    if _has_products_fts(conn):
+        match = [t for t in (_fts_terms(query), _fts_terms(code, ["product_code"])) if t]
+        if match:
+            # CROSS JOIN pins products_fts as the outer loop; otherwise SQLite may walk
+            # products by brand and re-run the MATCH for every row.
+            sql = " FROM products_fts CROSS JOIN products p ON p.id = products_fts.rowid WHERE products_fts MATCH ?"
+            sql += "".join(f" AND {w}" for w in where)
+            return sql, [" AND ".join(match)] + params, True
+    else:
+        # No FTS5 in this SQLite build: plain substring match
+        for word in re.findall(r"\w+", query or ""):
+            where.append("(p.product_code LIKE ? OR p.description LIKE ? OR p.brand LIKE ?)")
+            params.extend([f"%{word}%"] * 3)
+        for word in re.findall(r"\w+", code or ""):
+            where.append("p.product_code LIKE ?")
+            params.append(f"%{word}%")
+
+    sql = " FROM products p"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    return sql, params, False
+
+@cached
+def search_products(query, brand=None, price_range=None, limit=50, offset=0, code=None):
+    """
+    Full-text product search (prefix and accent-insensitive).
+    - query: words matched against code, description and brand.
+    - code: optional words matched against product_code only.
+    - brand: a brand name or a list of them. price_range: (min_usd, max_usd).
+    - limit=None returns every match.
+    Results are ranked by relevance; without search words they are ordered
+    by brand and code like get_all_products().
+    """
+    limit = -1 if limit is None else limit
+    with db_connection() as conn:
+        source, params, ranked = _product_source(conn, query, code, brand, price_range)
+        order = "products_fts.rank" if ranked else "p.brand, p.product_code"
+        c = conn.cursor()
+        c.execute(f"SELECT p.*{source} ORDER BY {order} LIMIT ? OFFSET ?", params + [limit, offset])
+        return [dict(row) for row in c.fetchall()]
+
+PRODUCT_COLUMNS = (
+    "id", "product_code", "description", "brand", "cost_usd", "cost_lps",
+    "stock_quantity", "category", "image_url", "last_updated",
+)
+
+@cached
+def get_products_page(after=None, page_size=100, columns=None, brand=None, price_range=None):
+    """
+    One page of products ordered by (brand, product_code), keyset-paginated.
+    - after: (brand, product_code) of the last row of the previous page, None for the first page.
+    - columns: subset of PRODUCT_COLUMNS to return (default: all).
+    Uses idx_products_brand_code, so every page costs the same no matter how deep.
+    """
+    columns = list(columns or PRODUCT_COLUMNS)
+    unknown = [col for col in columns if col not in PRODUCT_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown product columns: {unknown}")
+    # The cursor needs the sort key even if the caller didn't ask for it
+    select = columns + [col for col in ("brand", "product_code") if col not in columns]
+
+    where, params = _product_filters(brand, price_range)
+    if after is not None:
+        after_brand, after_code = after
+        if after_brand is None:
+            # NULL brands sort first
+            where.append("(p.brand IS NOT NULL OR p.product_code > ?)")
+            params.append(after_code)
+        else:
+            where.append("(p.brand, p.product_code) > (?, ?)")
+            params.extend([after_brand, after_code])
+
+    sql = f"SELECT {', '.join('p.' + col for col in select)} FROM products p"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY p.brand, p.product_code LIMIT ?"
+
+    with db_connection() as conn:
+        c = conn.cursor()
+        c.execute(sql, params + [page_size])
+        return [dict(row) for row in c.fetchall()]
+
+@cached
+def count_products(query=None, brand=None, price_range=None, code=None):
+    """Total number of products matching the same filters as search_products / get_products_page."""
+    with db_connection() as conn:
+        source, params, _ = _product_source(conn, query, code, brand, price_range)
+        return conn.execute(f"SELECT count(*){source}", params).fetchone()[0]
+
+@cached
+def get_max_product_price():
+    """Highest cost_usd in the catalogue (0 when empty)."""
+    with db_connection() as conn:
+        row = conn.execute("SELECT MAX(cost_usd) FROM products").fetchone()
+        return row[0] or 0
 
 def get_product_history(product_id):
     """Returns price history for a product."""
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("SELECT * FROM product_price_history WHERE product_id = ? ORDER BY change_date DESC", (product_id,))
-    history = [dict(row) for row in c.fetchall()]
-    conn.close()
-    return history
+    with db_connection() as conn:
+        c = conn.cursor()
+        c.execute("SELECT * FROM product_price_history WHERE product_id = ? ORDER BY change_date DESC", (product_id,))
+        history = [dict(row) for row in c.fetchall()]
+        return history
 
 def get_product_quotes(product_id):
     """Returns quotes that include this product."""
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("""
-        SELECT q.id, q.quote_date, q.total_amount_lps, c.full_name as client_name, qi.quantity, qi.unit_price_lps
-        FROM quote_items qi
-        JOIN quotes q ON qi.quote_id = q.id
-        LEFT JOIN clients c ON q.client_id = c.id
-        WHERE qi.product_id = ?
-        ORDER BY q.quote_date DESC
-    """, (product_id,))
-    quotes = [dict(row) for row in c.fetchall()]
-    conn.close()
-    return quotes
-
+    with db_connection() as conn:
+        c = conn.cursor()
+        c.execute("""
+            SELECT q.id, q.quote_date, q.total_amount_lps, c.full_name as client_name, qi.quantity, qi.unit_price_lps
+            FROM quote_items qi
+            JOIN quotes q ON qi.quote_id = q.id
+            LEFT JOIN clients c ON q.client_id = c.id
+            WHERE qi.product_id = ?
+            ORDER BY q.quote_date DESC
+        """, (product_id,))
+        quotes = [dict(row) for row in c.fetchall()]
+        return quotes
+
+@cached
 def get_all_brands():
     """Returns a list of distinct brands."""
-    conn = get_connection()
-    c = conn.cursor()
+    with db_connection() as conn:
+        c = conn.cursor()
     
-    # Try getting from brands table first
-    try:
-        c.execute("SELECT name FROM brands ORDER BY name")
-        brands = [row[0] for row in c.fetchall()]
+        # Try getting from brands table first
+        try:
+            c.execute("SELECT name FROM brands ORDER BY name")
+            brands = [row[0] for row in c.fetchall()]
         
-        # If empty, fallback to products (migration) or return empty
-        if not brands:
-             c.execute("SELECT DISTINCT brand FROM products WHERE brand IS NOT NULL AND brand != '' ORDER BY brand")
-             brands = [row[0] for row in c.fetchall()]
-             # Migrate found brands
-             for b in brands:
-                 c.execute("INSERT OR IGNORE INTO brands (name) VALUES (?)", (b,))
-             conn.commit()
-    except:
-        # Fallback if table doesn't exist yet (though init_db calls it)
-        c.execute("SELECT DISTINCT brand FROM products WHERE brand IS NOT NULL AND brand != '' ORDER BY brand")
-        brands = [row[0] for row in c.fetchall()]
+            # If empty, fallback to products (migration) or return empty
+            if not brands:
+                 c.execute("SELECT DISTINCT brand FROM products WHERE brand IS NOT NULL AND brand != '' ORDER BY brand")
+                 brands = [row[0] for row in c.fetchall()]
+                 # Migrate found brands
+                 for b in brands:
+                     c.execute("INSERT OR IGNORE INTO brands (name) VALUES (?)", (b,))
+                 conn.commit()
+        except:
+            # Fallback if table doesn't exist yet (though init_db calls it)
+            c.execute("SELECT DISTINCT brand FROM products WHERE brand IS NOT NULL AND brand != '' ORDER BY brand")
+            brands = [row[0] for row in c.fetchall()]
         
-    conn.close()
-    return brands
+        return brands
 
+@invalidates
 def clear_database_keep_brands():
     """Clears all data except brands and users/admin."""
-    conn = get_connection()
-    c = conn.cursor()
+    with db_connection() as conn:
+        c = conn.cursor()
     
-    # 1. Back up distinct brands from products if brands table is empty
-    c.execute("SELECT count(*) FROM brands")
-    if c.fetchone()[0] == 0:
-        c.execute("SELECT DISTINCT brand FROM products WHERE brand IS NOT NULL AND brand != ''")
-        brands = [row[0] for row in c.fetchall()]
-        for b in brands:
-            c.execute("INSERT OR IGNORE INTO brands (name) VALUES (?)", (b,))
+        # 1. Back up distinct brands from products if brands table is empty
+        c.execute("SELECT count(*) FROM brands")
+        if c.fetchone()[0] == 0:
+            c.execute("SELECT DISTINCT brand FROM products WHERE brand IS NOT NULL AND brand != ''")
+            brands = [row[0] for row in c.fetchall()]
+            for b in brands:
+                c.execute("INSERT OR IGNORE INTO brands (name) VALUES (?)", (b,))
             
-    # 2. Delete tables
-    try:
-        c.execute("DELETE FROM products")
-        c.execute("DELETE FROM clients")
-        c.execute("DELETE FROM quote_items")
-        c.execute("DELETE FROM quotes")
-        # Keep users, margins (if relevant), and brands
-        conn.commit()
-        return True
-    except Exception as e:
-        print(f"Error clearing DB: {e}")
-        return False
-    finally:
-        conn.close()
+        # 2. Delete tables
+        try:
+            c.execute("DELETE FROM products")
+            c.execute("DELETE FROM clients")
+            c.execute("DELETE FROM quote_items")
+            c.execute("DELETE FROM quotes")
+            # Drop the zeroed counters too
+            c.execute("DELETE FROM brand_quote_stats")
+            # Keep users, margins (if relevant), and brands
+            conn.commit()
+            return True
+        except Exception as e:
+            print(f"Error clearing DB: {e}")
+            return False
 
 def get_current_exchange_rate():
     """Returns the latest exchange rate (LPS per USD). Defaults to 25.00 if not found."""
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("SELECT rate_value FROM exchange_rates ORDER BY rate_date DESC, id DESC LIMIT 1")
-    row = c.fetchone()
-    conn.close()
-    if row:
-        return row[0]
-    return 25.00 # Default fallback
+    return get_current_exchange_rate_full()['rate_value']
 
+@cached
 def get_all_clients():
     """Returns all clients."""
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("SELECT * FROM clients ORDER BY full_name")
-    clients = [dict(row) for row in c.fetchall()]
-    conn.close()
-    return clients
+    with db_connection() as conn:
+        c = conn.cursor()
+        c.execute("SELECT * FROM clients ORDER BY full_name")
+        clients = [dict(row) for row in c.fetchall()]
+        return clients
 
+@invalidates
 def create_client(client_data):
     """Creates a new client."""
-    conn = get_connection()
-    c = conn.cursor()
-    try:
-        c.execute("""
-            INSERT INTO clients (full_name, rtn_id, phone, email, address)
-            VALUES (?, ?, ?, ?, ?)
-        """, (
-            client_data['full_name'],
-            client_data.get('rtn_id'),
-            client_data.get('phone'),
-            client_data.get('email'),
-            client_data.get('address')
-        ))
-        conn.commit()
-        return True
-    except sqlite3.IntegrityError:
-        print("Client exists or error.")
-        return False
-    finally:
-        conn.close()
+    with db_connection() as conn:
+        c = conn.cursor()
+        try:
+            c.execute("""
+                INSERT INTO clients (full_name, rtn_id, phone, email, address)
+                VALUES (?, ?, ?, ?, ?)
+            """, (
+                client_data['full_name'],
+                client_data.get('rtn_id'),
+                client_data.get('phone'),
+                client_data.get('email'),
+                client_data.get('address')
+            ))
+            conn.commit()
+            return True
+        except sqlite3.IntegrityError:
+            print("Client exists or error.")
+            return False
 
 
 
 
+@invalidates
 def create_quote(quote_data, items_list):
     """Creates a new quote and its items TRANSACTIONALLY."""
-    conn = get_connection()
-    c = conn.cursor()
-    try:
-        # Insert Quote
-        c.execute("""
-            INSERT INTO quotes (client_id, user_id, expiration_date, total_amount_lps, status)
-            VALUES (?, ?, DATE('now', '+15 days'), ?, 'draft')
-        """, (
-            quote_data['client_id'],
-            quote_data.get('user_id'), # Can be None if generic
-            quote_data['total_amount_lps']
-        ))
-        
-        quote_id = c.lastrowid
-        
-        # Insert Items
-        for item in items_list:
+    with db_connection() as conn:
+        c = conn.cursor()
+        try:
+            # Insert Quote
             c.execute("""
-                INSERT INTO quote_items (quote_id, product_id, quantity, unit_price_lps, total_lps)
-                VALUES (?, ?, ?, ?, ?)
+                INSERT INTO quotes (client_id, user_id, expiration_date, total_amount_lps, status)
+                VALUES (?, ?, DATE('now', '+15 days'), ?, 'draft')
             """, (
-                quote_id,
-                item['product_id'],
-                item['quantity'],
-                item['unit_price_lps'],
-                item['total_lps']
+                quote_data['client_id'],
+                quote_data.get('user_id'), # Can be None if generic
+                quote_data['total_amount_lps']
             ))
+        
+            quote_id = c.lastrowid
+        
+            # Insert Items
+            for item in items_list:
+                c.execute("""
+                    INSERT INTO quote_items (quote_id, product_id, quantity, unit_price_lps, total_lps)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (
+                    quote_id,
+                    item['product_id'],
+                    item['quantity'],
+                    item['unit_price_lps'],
+                    item['total_lps']
+                ))
             
-        conn.commit()
-        return quote_id
-    except Exception as e:
-        conn.rollback()
-        print(f"Error creating quote: {e}")
-        return None
-    finally:
-        conn.close()
+            conn.commit()
+            return quote_id
+        except Exception as e:
+            conn.rollback()
+            print(f"Error creating quote: {e}")
+            return None
 
 
 
+@invalidates
 def save_quote_history(client_name, client_details_json, products_json, total_lps):
     """Saves a snapshot of a generated quote."""
-    conn = get_connection()
-    c = conn.cursor()
-    try:
-        c.execute("""
-            INSERT INTO cotizaciones_historico (client_name, client_details, products_json, total_lps)
-            VALUES (?, ?, ?, ?)
-        """, (client_name, client_details_json, products_json, total_lps))
-        conn.commit()
+    with db_connection() as conn:
+        c = conn.cursor()
+        try:
+            c.execute("""
+                INSERT INTO cotizaciones_historico (client_name, client_details, products_json, total_lps)
+                VALUES (?, ?, ?, ?)
+            """, (client_name, client_details_json, products_json, total_lps))
+            conn.commit()
+            return True
+        except Exception as e:
+            print(f"Error saving history: {e}")
+            return False
+
+@invalidates
+def set_quote_pdf_path(quote_id, pdf_path, history=False):
+    """
+    Records where a quote's PDF was written (utils.quote_pdf). `history=True`
+    targets a cotizaciones_historico snapshot instead of a quotes row.
+    """
+    table = "cotizaciones_historico" if history else "quotes"
+    with db_connection() as conn:
+        try:
+            conn.execute(
+                f"UPDATE {table} SET pdf_path = ? WHERE id = ? AND pdf_path IS NOT ?",
+                (pdf_path, quote_id, pdf_path),
+            )
+            conn.commit()
+            return True
+        except Exception as e:
+            print(f"Error saving PDF path: {e}")
+            return False
+
+@invalidates
+def clear_quote_pdf_paths(pdf_paths):
+    """
+    Forgets recorded PDF paths (quotes and cotizaciones_historico) whose files
+    were evicted from the PDF cache; the next download renders them again.
+    """
+    pdf_paths = list(pdf_paths)
+    if not pdf_paths:
         return True
-    except Exception as e:
-        print(f"Error saving history: {e}")
-        return False
-    finally:
-        conn.close()
+    with db_connection() as conn:
+        try:
+            for table in ("quotes", "cotizaciones_historico"):
+                conn.executemany(f"UPDATE {table} SET pdf_path = NULL WHERE pdf_path = ?",
+                                 ((path,) for path in pdf_paths))
+            conn.commit()
+            return True
+        except Exception as e:
+            print(f"Error clearing PDF paths: {e}")
+            return False
 
 def get_all_quotes():
     """Returns all quotes with client names."""
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("""
-        SELECT q.id, q.quote_date, q.total_amount_lps, q.status, c.full_name as client_name 
-        FROM quotes q
-        LEFT JOIN clients c ON q.client_id = c.id
-        ORDER BY q.quote_date DESC
-    """)
-    quotes = [dict(row) for row in c.fetchall()]
-    conn.close()
-    return quotes
+    with db_connection() as conn:
+        c = conn.cursor()
+        c.execute("""
+            SELECT q.id, q.quote_date, q.total_amount_lps, q.status, c.full_name as client_name 
+            FROM quotes q
+            LEFT JOIN clients c ON q.client_id = c.id
+            ORDER BY q.quote_date DESC
+        """)
+        quotes = [dict(row) for row in c.fetchall()]
+        return quotes
+
+@cached
+def get_recent_quotes(limit=5):
+    """Returns the latest `limit` quotes with client names (uses idx_quotes_quote_date)."""
+    with db_connection() as conn:
+        c = conn.cursor()
+        c.execute("""
+            SELECT q.id, q.quote_date, q.total_amount_lps, q.status, c.full_name as client_name
+            FROM quotes q
+            LEFT JOIN clients c ON q.client_id = c.id
+            ORDER BY q.quote_date DESC
+            LIMIT ?
+        """, (limit,))
+        return [dict(row) for row in c.fetchall()]
+
+@cached
+def get_top_brands(limit=10):
+    """
+    Returns [{'brand', 'count'}] of the most quoted brands (one per quote item).
+    Reads the brand_quote_stats summary that triggers on quote_items maintain.
+    """
+    with db_connection() as conn:
+        c = conn.cursor()
+        c.execute("""
+            SELECT brand, item_count AS count
+            FROM brand_quote_stats
+            WHERE item_count > 0
+            ORDER BY item_count DESC
+            LIMIT ?
+        """, (limit,))
+        return [dict(row) for row in c.fetchall()]
+
+@invalidates
+def refresh_brand_quote_stats():
+    """Rebuilds brand_quote_stats from the brands stored on quote_items with a single grouped query."""
+    with db_connection() as conn:
+        c = conn.cursor()
+        try:
+            c.execute("DELETE FROM brand_quote_stats")
+            c.execute("""
+                INSERT INTO brand_quote_stats (brand, item_count)
+                SELECT brand, count(*)
+                FROM quote_items
+                WHERE brand IS NOT NULL
+                GROUP BY brand
+            """)
+            conn.commit()
+            return True
+        except Exception as e:
+            conn.rollback()
+            print(f"Error refreshing brand stats: {e}")
+            return False
+
+@cached
+def get_dashboard_summary(recent_limit=5, top_brands_limit=10):
+    """
+    Everything the dashboard shows, on a single connection: inventory_count,
+    quotes_count and total_lps (the dashboard_totals row that triggers on
+    products and quotes maintain), recent_quotes, top_brands and rate.
+    """
+    with db_connection() as conn:
+        c = conn.cursor()
+        c.execute("SELECT inventory_count, quotes_count, total_lps FROM dashboard_totals WHERE id = 1")
+        row = c.fetchone()
+        summary = dict(row) if row else {'inventory_count': 0, 'quotes_count': 0, 'total_lps': 0.0}
+        # Nested helpers reuse this same pooled connection
+        summary['recent_quotes'] = get_recent_quotes(recent_limit)
+        summary['top_brands'] = get_top_brands(top_brands_limit)
+        summary['rate'] = get_current_exchange_rate_full()
+        return summary
+
+def publish_exchange_rate(rate_value, rate_date):
+    """Makes a rate the current one for every reader in this process."""
+    global _current_rate
+    with _rate_lock:
+        _current_rate = ({'rate_value': rate_value, 'rate_date': rate_date}, time.monotonic(), DB_NAME)
 
 def get_current_exchange_rate_full():
-    """Returns the latest exchange rate dict (rate_value, rate_date)."""
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("SELECT rate_value, rate_date FROM exchange_rates ORDER BY rate_date DESC, id DESC LIMIT 1")
-    row = c.fetchone()
-    conn.close()
-    if row:
-        return {'rate_value': row[0], 'rate_date': row[1]}
-    return {'rate_value': 25.00, 'rate_date': '2023-01-01'}
-
-def update_exchange_rate(new_rate):
-    """Inserts a new exchange rate."""
-    conn = get_connection()
-    c = conn.cursor()
-    try:
-        c.execute("INSERT INTO exchange_rates (rate_value, source) VALUES (?, ?)", (new_rate, "Manual Update"))
-        conn.commit()
-        return True
-    except Exception as e:
-        print(f"Error updating rate: {e}")
-        return False
-    finally:
-        conn.close()
+    """
+    Returns the latest exchange rate dict (rate_value, rate_date).
+
+    Served from the in-memory published rate; SQLite is only read when
+    nothing was published yet or it is older than CACHE_TTL (a rate written
+    by another process).
+    """
+    with _rate_lock:
+        current = _current_rate
+    if current and current[2] == DB_NAME and time.monotonic() - current[1] < CACHE_TTL:
+        return dict(current[0])
+    with db_connection() as conn:
+        c = conn.cursor()
+        c.execute("SELECT rate_value, rate_date FROM exchange_rates ORDER BY rate_date DESC, id DESC LIMIT 1")
+        row = c.fetchone()
+        if not row:
+            return {'rate_value': 25.00, 'rate_date': '2023-01-01'}
+    publish_exchange_rate(row[0], row[1])
+    return {'rate_value': row[0], 'rate_date': row[1]}
+
+@invalidates
+def update_exchange_rate(new_rate, source="Manual Update"):
+    """Inserts a new exchange rate and publishes it."""
+    with db_connection() as conn:
+        c = conn.cursor()
+        try:
+            c.execute("INSERT INTO exchange_rates (rate_value, source) VALUES (?, ?)", (new_rate, source))
+            rate_date = c.execute("SELECT rate_date FROM exchange_rates WHERE id = ?", (c.lastrowid,)).fetchone()[0]
+            conn.commit()
+            publish_exchange_rate(new_rate, rate_date)
+            return True
+        except Exception as e:
+            print(f"Error updating rate: {e}")
+            return False
 
 def create_user(username, password, full_name, role="vendedor"):
     """Creates a new user."""
-    conn = get_connection()
-    c = conn.cursor()
-    try:
-        # Simple hash for demo purposes. Use bcrypt/argon2 in production!
-        # Assuming app.py handles hashing or we do it here. 
-        # For simplicity, we'll store as is here, but app should hash.
-        # WAIT, auth.py implies hashing. Let's assume input 'password' is raw and we hash it here
-        # or we just store it. Given previous seed_admin used cleartext 'admin123' logic in my head 
-        # but let's be slightly better.
-        # Actually, let's just store it as text for this prototype as requested by 'Simple' constraint 
-        # unless user asked for security.
-        # Plan said "simple hashing".
-        import hashlib
-        pwd_hash = hashlib.sha256(password.encode()).hexdigest()
+    with db_connection() as conn:
+        c = conn.cursor()
+        try:
+            # Simple hash for demo purposes. Use bcrypt/argon2 in production!
+            # Assuming app.py handles hashing or we do it here. 
+            # For simplicity, we'll store as is here, but app should hash.
+            # WAIT, auth.py implies hashing. Let's assume input 'password' is raw and we hash it here
+            # or we just store it. Given previous seed_admin used cleartext 'admin123' logic in my head 
+            # but let's be slightly better.
+            # Actually, let's just store it as text for this prototype as requested by 'Simple' constraint 
+            # unless user asked for security.
+            # Plan said "simple hashing".
+            import hashlib
+            pwd_hash = hashlib.sha256(password.encode()).hexdigest()
         
-        c.execute("INSERT INTO users (username, password_hash, full_name, role) VALUES (?, ?, ?, ?)", 
-                  (username, pwd_hash, full_name, role))
-        conn.commit()
-        return True
-    except sqlite3.IntegrityError:
-        return False
-    finally:
-        conn.close()
+            c.execute("INSERT INTO users (username, password_hash, full_name, role) VALUES (?, ?, ?, ?)", 
+                      (username, pwd_hash, full_name, role))
+            conn.commit()
+            return True
+        except sqlite3.IntegrityError:
+            return False
 
 def get_all_users():
     """Returns all users."""
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("SELECT id, username, full_name, role, created_at FROM users ORDER BY id")
-    users = [dict(row) for row in c.fetchall()]
-    conn.close()
-    return users
+    with db_connection() as conn:
+        c = conn.cursor()
+        c.execute("SELECT id, username, full_name, role, created_at FROM users ORDER BY id")
+        users = [dict(row) for row in c.fetchall()]
+        return users
 
+@cached
 def get_all_quotes_history():
     """Returns all quotes from the historical table."""
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("SELECT * FROM cotizaciones_historico ORDER BY created_at DESC")
-    rows = c.fetchall()
-    conn.close()
-    return [dict(row) for row in rows]
+    with db_connection() as conn:
+        c = conn.cursor()
+        c.execute("SELECT * FROM cotizaciones_historico ORDER BY created_at DESC")
+        rows = c.fetchall()
+        return [dict(row) for row in rows]
 
+@cached
 def get_config(key, default=""):
     """Gets a config value by key."""
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("SELECT value FROM system_config WHERE key = ?", (key,))
-    row = c.fetchone()
-    conn.close()
-    return row[0] if row else default
+    with db_connection() as conn:
+        c = conn.cursor()
+        c.execute("SELECT value FROM system_config WHERE key = ?", (key,))
+        row = c.fetchone()
+        return row[0] if row else default
 
+@invalidates
 def set_config(key, value):
     """Sets a config value."""
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("INSERT OR REPLACE INTO system_config (key, value) VALUES (?, ?)", (key, value))
-    conn.commit()
-    conn.close()
-    return True
+    with db_connection() as conn:
+        c = conn.cursor()
+        c.execute("INSERT OR REPLACE INTO system_config (key, value) VALUES (?, ?)", (key, value))
+        conn.commit()
+        return True
 
 def delete_user(user_id):
     """Deletes a user by ID."""
-    conn = get_connection()
-    c = conn.cursor()
-    # Prevent deleting the last admin? Check logic later.
-    c.execute("DELETE FROM users WHERE id = ?", (user_id,))
-    conn.commit()
-    conn.close()
-    return True
+    with db_connection() as conn:
+        c = conn.cursor()
+        # Prevent deleting the last admin? Check logic later.
+        c.execute("DELETE FROM users WHERE id = ?", (user_id,))
+        conn.commit()
+        return True
 
 def get_exchange_rate_history(limit=50):
     """Returns historical exchange rates."""
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("SELECT * FROM exchange_rates ORDER BY rate_date DESC, id DESC LIMIT ?", (limit,))
-    rates = [dict(row) for row in c.fetchall()]
-    conn.close()
-    return rates
+    with db_connection() as conn:
+        c = conn.cursor()
+        c.execute("SELECT * FROM exchange_rates ORDER BY rate_date DESC, id DESC LIMIT ?", (limit,))
+        rates = [dict(row) for row in c.fetchall()]
+        return rates
 
+@invalidates
 def clear_quote_history():
     """Clears all records from the cotizaciones_historico table."""
-    conn = get_connection()
-    c = conn.cursor()
-    try:
-        c.execute("DELETE FROM cotizaciones_historico")
-        conn.commit()
-        return True
-    except Exception as e:
-        print(f"Error clearing history: {e}")
-        return False
-    finally:
-        conn.close()
+    with db_connection() as conn:
+        c = conn.cursor()
+        try:
+            c.execute("DELETE FROM cotizaciones_historico")
+            conn.commit()
+            return True
+        except Exception as e:
+            print(f"Error clearing history: {e}")
+            return False
+
+def cache_stats():
+    """Hit/miss counters of the read cache."""
+    return read_cache.stats()
 
 if __name__ == "__main__":
-    init_db()
+    import sys
+    if len(sys.argv) > 1:
+        # python database.py import|export productos.csv|productos.parquet
+        from utils import catalog_io
+        catalog_io.main()
+    else:
+        init_db()
@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 from app.core.database import get_db
 from app.models.models import User
@@ -22,9 +24,11 @@ def create_access_token(data: dict):
     return encoded_jwt
 
 @router.post("/login", response_model=Token)
-async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.password_hash):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
+    result = await db.execute(select(User).where(User.email == form_data.username))
+    user = result.scalars().first()
+    # bcrypt takes ~0.2 s of CPU: off the event loop, or every other request waits for it
+    if not user or not await run_in_threadpool(verify_password, form_data.password, user.password_hash):
         raise HTTPException(status_code=401, detail="Email o contraseña incorrectos")
     
     access_token = create_access_token(data={"sub": user.email, "company_id": str(user.company_id)})
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from app.core.database import get_db
 from app.models.models import Customer, PDFUpload # I should have CustomerNote and CustomerTask in models
@@ -17,36 +18,38 @@ logger = logging.getLogger(__name__)
 N8N_WEBHOOK_URL = "http://n8n:5678/webhook/estimate-won"
 
 @router.get("/customers/{customer_id}/notes", response_model=List[CRMNote])
-def get_customer_notes(customer_id: UUID, db: Session = Depends(get_db)):
+async def get_customer_notes(customer_id: UUID, db: AsyncSession = Depends(get_db)):
     # Importación tardía para evitar círculos si fuera necesario
     from app.models.models import CRMNote as CRMNoteModel
-    return db.query(CRMNoteModel).filter(CRMNoteModel.customer_id == customer_id).all()
+    result = await db.execute(select(CRMNoteModel).where(CRMNoteModel.customer_id == customer_id))
+    return result.scalars().all()
 
 @router.post("/customers/{customer_id}/notes", response_model=CRMNote)
-def create_customer_note(customer_id: UUID, note: CRMNoteCreate, db: Session = Depends(get_db)):
+async def create_customer_note(customer_id: UUID, note: CRMNoteCreate, db: AsyncSession = Depends(get_db)):
     from app.models.models import CRMNote as CRMNoteModel
-    db_note = CRMNoteModel(**note.dict(), customer_id=customer_id)
+    db_note = CRMNoteModel(**note.dict(exclude={"customer_id"}), customer_id=customer_id)
     db.add(db_note)
-    db.commit()
-    db.refresh(db_note)
+    await db.commit()
+    await db.refresh(db_note)
     return db_note
 
 @router.get("/customers/{customer_id}/tasks", response_model=List[CRMTask])
-def get_customer_tasks(customer_id: UUID, db: Session = Depends(get_db)):
+async def get_customer_tasks(customer_id: UUID, db: AsyncSession = Depends(get_db)):
     from app.models.models import CRMTask as CRMTaskModel
-    return db.query(CRMTaskModel).filter(CRMTaskModel.customer_id == customer_id).all()
+    result = await db.execute(select(CRMTaskModel).where(CRMTaskModel.customer_id == customer_id))
+    return result.scalars().all()
 
 @router.post("/customers/{customer_id}/tasks", response_model=CRMTask)
-def create_customer_task(customer_id: UUID, task: CRMTaskCreate, db: Session = Depends(get_db)):
+async def create_customer_task(customer_id: UUID, task: CRMTaskCreate, db: AsyncSession = Depends(get_db)):
     from app.models.models import CRMTask as CRMTaskModel
-    db_task = CRMTaskModel(**task.dict(), customer_id=customer_id)
+    db_task = CRMTaskModel(**task.dict(exclude={"customer_id"}), customer_id=customer_id)
     db.add(db_task)
-    db.commit()
-    db.refresh(db_task)
+    await db.commit()
+    await db.refresh(db_task)
     return db_task
 
 @router.patch("/estimates/{estimate_id}/status")
-async def update_estimate_status(estimate_id: str, status: str, db: Session = Depends(get_db)):
+async def update_estimate_status(estimate_id: str, status: str, db: AsyncSession = Depends(get_db)):
     # Lógica simplificada para demostración
     if status == "won":
         try:
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Literal, Optional
 from app.core.database import get_db
+from app.core.pagination import DEFAULT_LIMIT, MAX_LIMIT, paginate
 from app.models.models import Customer
 from app.schemas.schemas import CustomerCreate, Customer as CustomerSchema
 from uuid import UUID
@@ -9,20 +11,35 @@ from uuid import UUID
 router = APIRouter()
 
 @router.get("/", response_model=List[CustomerSchema])
-def get_customers(db: Session = Depends(get_db)):
-    return db.query(Customer).all()
+async def get_customers(
+    response: Response,
+    q: Optional[str] = Query(None, description="Busca en nombre, contacto y email"),
+    sort: Literal["created_at", "name"] = "created_at",
+    order: Literal["asc", "desc"] = "desc",
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    conditions = []
+    if q:
+        conditions.append(or_(
+            Customer.name.icontains(q, autoescape=True),
+            Customer.contact_name.icontains(q, autoescape=True),
+            Customer.email.icontains(q, autoescape=True),
+        ))
+    return await paginate(db, response, Customer, conditions, sort, order, limit, cursor)
 
 @router.post("/", response_model=CustomerSchema)
-def create_customer(customer: CustomerCreate, db: Session = Depends(get_db)):
+async def create_customer(customer: CustomerCreate, db: AsyncSession = Depends(get_db)):
     db_customer = Customer(**customer.dict())
     db.add(db_customer)
-    db.commit()
-    db.refresh(db_customer)
+    await db.commit()
+    await db.refresh(db_customer)
     return db_customer
 
 @router.get("/{customer_id}", response_model=CustomerSchema)
-def get_customer(customer_id: UUID, db: Session = Depends(get_db)):
-    customer = db.query(Customer).filter(Customer.id == customer_id).first()
+async def get_customer(customer_id: UUID, db: AsyncSession = Depends(get_db)):
+    customer = await db.get(Customer, customer_id)
     if not customer:
         raise HTTPException(status_code=404, detail="Cliente no encontrado")
     return customer
@@ -1,36 +1,83 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import List, Literal, Optional
+from datetime import date
 from app.core.database import get_db
+from app.core.pagination import DEFAULT_LIMIT, MAX_LIMIT, paginate
 from app.models.models import Invoice, InvoiceItem
-from app.schemas.schemas import InvoiceCreate, Invoice as InvoiceSchema
+from app.schemas.schemas import InvoiceCreate, Invoice as InvoiceSchema, InvoiceSummary
 from uuid import UUID
 
 router = APIRouter()
 
+# Invoice responses include their items: load them up front, lazy loads can't run under asyncio
+invoice_query = select(Invoice).options(selectinload(Invoice.items))
+
+def invoice_conditions(
+    status: Optional[str] = None,
+    paid_status: Optional[str] = None,
+    customer_id: Optional[UUID] = None,
+    date_from: Optional[date] = Query(None, description="invoice_date >= date_from"),
+    date_to: Optional[date] = Query(None, description="invoice_date <= date_to"),
+    q: Optional[str] = Query(None, description="Busca en el número de factura"),
+) -> list:
+    """Filters shared by the invoice list and its summary."""
+    conditions = []
+    if status:
+        conditions.append(Invoice.status == status)
+    if paid_status:
+        conditions.append(Invoice.paid_status == paid_status)
+    if customer_id:
+        conditions.append(Invoice.customer_id == customer_id)
+    if date_from:
+        conditions.append(Invoice.invoice_date >= date_from)
+    if date_to:
+        conditions.append(Invoice.invoice_date <= date_to)
+    if q:
+        conditions.append(Invoice.invoice_number.icontains(q, autoescape=True))
+    return conditions
+
 @router.get("/", response_model=List[InvoiceSchema])
-def get_invoices(db: Session = Depends(get_db)):
-    return db.query(Invoice).all()
+async def get_invoices(
+    response: Response,
+    conditions: list = Depends(invoice_conditions),
+    sort: Literal["created_at", "invoice_date", "due_date", "total"] = "created_at",
+    order: Literal["asc", "desc"] = "desc",
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    return await paginate(db, response, Invoice, conditions, sort, order, limit, cursor,
+                          options=(selectinload(Invoice.items),))
+
+@router.get("/summary", response_model=InvoiceSummary)
+async def get_invoices_summary(
+    conditions: list = Depends(invoice_conditions),
+    db: AsyncSession = Depends(get_db),
+):
+    """Count and sum of the invoices matching the list filters, computed by the database."""
+    result = await db.execute(
+        select(func.count(Invoice.id), func.coalesce(func.sum(Invoice.total), 0)).where(*conditions)
+    )
+    count, total = result.one()
+    return InvoiceSummary(count=count, total=total)
 
 @router.post("/", response_model=InvoiceSchema)
-def create_invoice(invoice: InvoiceCreate, db: Session = Depends(get_db)):
+async def create_invoice(invoice: InvoiceCreate, db: AsyncSession = Depends(get_db)):
     invoice_data = invoice.dict(exclude={"items"})
-    db_invoice = Invoice(**invoice_data)
+    db_invoice = Invoice(**invoice_data, items=[InvoiceItem(**item.dict()) for item in invoice.items])
     db.add(db_invoice)
-    db.commit()
-    db.refresh(db_invoice)
-    
-    for item in invoice.items:
-        db_item = InvoiceItem(**item.dict(), invoice_id=db_invoice.id)
-        db.add(db_item)
-    
-    db.commit()
-    db.refresh(db_invoice)
-    return db_invoice
+    await db.commit()
+
+    result = await db.execute(invoice_query.where(Invoice.id == db_invoice.id).execution_options(populate_existing=True))
+    return result.scalar_one()
 
 @router.get("/{invoice_id}", response_model=InvoiceSchema)
-def get_invoice(invoice_id: UUID, db: Session = Depends(get_db)):
-    invoice = db.query(Invoice).filter(Invoice.id == invoice_id).first()
+async def get_invoice(invoice_id: UUID, db: AsyncSession = Depends(get_db)):
+    result = await db.execute(invoice_query.where(Invoice.id == invoice_id))
+    invoice = result.scalar_one_or_none()
     if not invoice:
         raise HTTPException(status_code=404, detail="Factura no encontrada")
     return invoice
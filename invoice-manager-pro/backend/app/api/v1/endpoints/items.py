@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Literal, Optional
 from app.core.database import get_db
+from app.core.pagination import DEFAULT_LIMIT, MAX_LIMIT, paginate
 from app.models.models import Item
 from app.schemas.schemas import ItemCreate, Item as ItemSchema
 from uuid import UUID
@@ -9,13 +11,27 @@ from uuid import UUID
 router = APIRouter()
 
 @router.get("/", response_model=List[ItemSchema])
-def get_items(db: Session = Depends(get_db)):
-    return db.query(Item).all()
+async def get_items(
+    response: Response,
+    category: Optional[str] = None,
+    q: Optional[str] = Query(None, description="Busca en nombre y SKU"),
+    sort: Literal["created_at", "name", "price"] = "created_at",
+    order: Literal["asc", "desc"] = "desc",
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    conditions = []
+    if category:
+        conditions.append(Item.category == category)
+    if q:
+        conditions.append(or_(Item.name.icontains(q, autoescape=True), Item.sku.icontains(q, autoescape=True)))
+    return await paginate(db, response, Item, conditions, sort, order, limit, cursor)
 
 @router.post("/", response_model=ItemSchema)
-def create_item(item: ItemCreate, db: Session = Depends(get_db)):
+async def create_item(item: ItemCreate, db: AsyncSession = Depends(get_db)):
     db_item = Item(**item.dict())
     db.add(db_item)
-    db.commit()
-    db.refresh(db_item)
+    await db.commit()
+    await db.refresh(db_item)
     return db_item
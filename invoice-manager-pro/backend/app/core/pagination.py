@@ -0,0 +1,97 @@
+"""
+Keyset (cursor) pagination for the list endpoints.
+
+Rows are ordered by (sort column, id) and each page starts right after the
+last row of the previous one, so a deep page is an index range scan like the
+first one instead of an OFFSET that reads and throws away every row before
+it. Clients get an opaque cursor in the X-Next-Cursor header (absent on the
+last page) and send it back as ?cursor=.
+
+X-Total-Count is only computed for the first page (no cursor): counting is
+the one part whose cost grows with the table, and the total doesn't change
+from page to page of the same listing.
+"""
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import UUID
+from fastapi import HTTPException, Response
+from sqlalchemy import func, literal, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+def _dump(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+def _load(value, python_type):
+    if value is None:
+        return None
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    if python_type is Decimal:
+        return Decimal(value)
+    return python_type(value)
+
+def encode_cursor(sort: str, order: str, value, row_id) -> str:
+    raw = json.dumps([sort, order, _dump(value), str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, sort: str, order: str, column):
+    """(sort value, id) of a cursor made for this sort and order, else 400."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, cursor_order, value, row_id = json.loads(raw)
+        if (cursor_sort, cursor_order) != (sort, order):
+            raise ValueError("cursor from another sort order")
+        return _load(value, column.type.python_type), UUID(row_id)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Cursor no válido: {e}")
+
+async def paginate(
+    db: AsyncSession,
+    response: Response,
+    model,
+    conditions: list,
+    sort: str,
+    order: str,
+    limit: int,
+    cursor: str = None,
+    options: tuple = (),
+):
+    """
+    One page of `model` rows matching `conditions`, ordered by (sort, id) in
+    `order` ("asc"/"desc"). Sets X-Next-Cursor, and X-Total-Count on the first page.
+    """
+    column = getattr(model, sort)
+    key = tuple_(column, model.id)
+    query = select(model).where(*conditions)
+
+    if cursor is None:
+        total = await db.scalar(select(func.count()).select_from(model).where(*conditions))
+        response.headers["X-Total-Count"] = str(total)
+    else:
+        value, row_id = decode_cursor(cursor, sort, order, column)
+        after = tuple_(literal(value, column.type), literal(row_id, model.id.type))
+        query = query.where(key < after if order == "desc" else key > after)
+
+    if order == "desc":
+        query = query.order_by(column.desc(), model.id.desc())
+    else:
+        query = query.order_by(column.asc(), model.id.asc())
+    # One extra row says whether there is a next page
+    result = await db.execute(query.options(*options).limit(limit + 1))
+    rows = result.scalars().all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(sort, order, getattr(last, sort), last.id)
+    return rows
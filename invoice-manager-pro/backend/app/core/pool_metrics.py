@@ -0,0 +1,121 @@
+"""
+Database connection pool metrics, exposed at /metrics (Prometheus text format).
+
+Counters come from SQLAlchemy pool events (connect, checkout, checkin,
+invalidate). MeteredQueuePool times every Pool.connect(): the wait for a free
+connection plus opening a new one and the pre-ping, i.e. what a request pays
+before its first query. Size and overflow are read from the pool when scraped.
+
+Sizing: every worker process has its own pool, so
+workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) must stay below Postgres'
+max_connections. Sustained non-zero overflow, or wait time growing in the
+upper buckets, means the pool (not the database) is the bottleneck.
+"""
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class PoolMetrics:
+    """Thread-safe counters of one engine's pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.checked_out = 0
+        self.checked_out_peak = 0
+        self.wait_count = 0
+        self.wait_sum = 0.0
+        self.wait_max = 0.0
+        self.wait_buckets = [0] * len(WAIT_BUCKETS)
+
+    def attach(self, sync_engine):
+        """Listens to the pool events of `sync_engine` (AsyncEngine.sync_engine)."""
+        event.listen(sync_engine, "connect", self._on_connect)
+        event.listen(sync_engine, "checkout", self._on_checkout)
+        event.listen(sync_engine, "checkin", self._on_checkin)
+        event.listen(sync_engine, "invalidate", self._on_invalidate)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.checked_out_peak = max(self.checked_out_peak, self.checked_out)
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.checked_out = max(0, self.checked_out - 1)
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidations += 1
+
+    def observe_wait(self, seconds, timed_out=False):
+        with self._lock:
+            self.wait_count += 1
+            self.wait_sum += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            self.timeouts += timed_out
+            for i, bound in enumerate(WAIT_BUCKETS):
+                if seconds <= bound:
+                    self.wait_buckets[i] += 1
+
+    def render(self, pool):
+        """The metrics of `pool` (a QueuePool) in Prometheus text exposition format."""
+        with self._lock:
+            lines = []
+
+            def metric(name, kind, help_text, value):
+                lines.extend((f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {value}"))
+
+            metric("db_pool_size", "gauge", "Connections kept open by the pool.", pool.size())
+            metric("db_pool_max_overflow", "gauge", "Connections allowed beyond the pool size.",
+                   pool._max_overflow)
+            metric("db_pool_overflow", "gauge", "Connections open beyond the pool size.", max(0, pool.overflow()))
+            metric("db_pool_checked_in", "gauge", "Idle connections in the pool.", pool.checkedin())
+            metric("db_pool_checked_out", "gauge", "Connections in use.", self.checked_out)
+            metric("db_pool_checked_out_peak", "gauge", "Most connections in use at once.", self.checked_out_peak)
+            metric("db_pool_connects_total", "counter", "Database connections opened.", self.connects)
+            metric("db_pool_checkouts_total", "counter", "Connections handed out by the pool.", self.checkouts)
+            metric("db_pool_invalidations_total", "counter", "Connections discarded as broken.", self.invalidations)
+            metric("db_pool_timeouts_total", "counter", "Checkouts that gave up after DB_POOL_TIMEOUT.",
+                   self.timeouts)
+            metric("db_pool_wait_seconds_max", "gauge", "Longest time to get a connection.", f"{self.wait_max:.6f}")
+
+            name = "db_pool_wait_seconds"
+            lines.append(f"# HELP {name} Time to get a connection from the pool.")
+            lines.append(f"# TYPE {name} histogram")
+            for bound, count in zip(WAIT_BUCKETS, self.wait_buckets):
+                lines.append(f'{name}_bucket{{le="{bound}"}} {count}')
+            lines.append(f'{name}_bucket{{le="+Inf"}} {self.wait_count}')
+            lines.append(f"{name}_sum {self.wait_sum:.6f}")
+            lines.append(f"{name}_count {self.wait_count}")
+            return "\n".join(lines) + "\n"
+
+
+pool_metrics = PoolMetrics()
+
+
+class MeteredQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that reports how long each checkout took to pool_metrics."""
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            pool_metrics.observe_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        pool_metrics.observe_wait(time.perf_counter() - start)
+        return connection
@@ -1,9 +1,20 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from app.core.config import settings
+from app.core.database import engine
+from app.core.pool_metrics import pool_metrics
 from app.api.v1 import api_router
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Close the pooled connections (and aiosqlite's threads) on shutdown
+    await engine.dispose()
+
 app = FastAPI(
+    lifespan=lifespan,
     title="Invoice Manager Pro API",
     description="Modern invoice management system with Spotify-like UI",
     version="1.0.0",
@@ -18,6 +29,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Pagination headers of the list endpoints (refine's simple-rest reads X-Total-Count)
+    expose_headers=["X-Total-Count", "X-Next-Cursor"],
 )
 
 # Include API router
@@ -34,3 +47,9 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    # Prometheus text format; scraped per worker process
+    return PlainTextResponse(pool_metrics.render(engine.sync_engine.pool),
+                             media_type="text/plain; version=0.0.4")
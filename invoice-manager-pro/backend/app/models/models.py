@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey, Numeric, Date, Text, Integer, JSON
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey, Numeric, Date, Text, Integer, JSON, Index
+from sqlalchemy import Uuid as UUID  # native UUID on Postgres, CHAR(32) on SQLite
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
@@ -55,6 +55,11 @@ class User(Base):
 
 class Customer(Base):
     __tablename__ = "customers"
+    # Keyset pagination of the list endpoint: (sort column, id). Mirrors database/init.sql
+    __table_args__ = (
+        Index("idx_customers_created", "created_at", "id"),
+        Index("idx_customers_name", "name", "id"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     company_id = Column(UUID(as_uuid=True), ForeignKey("companies.id", ondelete="CASCADE"))
@@ -101,6 +106,12 @@ class TaxType(Base):
 
 class Item(Base):
     __tablename__ = "items"
+    __table_args__ = (
+        Index("idx_items_created", "created_at", "id"),
+        Index("idx_items_name", "name", "id"),
+        Index("idx_items_price", "price", "id"),
+        Index("idx_items_category", "category", "created_at", "id"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     company_id = Column(UUID(as_uuid=True), ForeignKey("companies.id", ondelete="CASCADE"))
@@ -120,6 +131,15 @@ class Item(Base):
 
 class Invoice(Base):
     __tablename__ = "invoices"
+    __table_args__ = (
+        Index("idx_invoices_customer", "customer_id", "created_at", "id"),
+        Index("idx_invoices_status", "status", "created_at", "id"),
+        Index("idx_invoices_paid_status", "paid_status", "created_at", "id"),
+        Index("idx_invoices_date", "invoice_date", "id"),
+        Index("idx_invoices_created", "created_at", "id"),
+        Index("idx_invoices_due_date", "due_date", "id"),
+        Index("idx_invoices_total", "total", "id"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     company_id = Column(UUID(as_uuid=True), ForeignKey("companies.id", ondelete="CASCADE"))
@@ -150,6 +170,9 @@ class Invoice(Base):
 
 class InvoiceItem(Base):
     __tablename__ = "invoice_items"
+    __table_args__ = (
+        Index("idx_invoice_items_invoice", "invoice_id"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     invoice_id = Column(UUID(as_uuid=True), ForeignKey("invoices.id", ondelete="CASCADE"))
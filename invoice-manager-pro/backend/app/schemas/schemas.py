@@ -101,6 +101,10 @@ class Invoice(InvoiceBase):
     items: List[InvoiceItem]
     created_at: datetime
 
+class InvoiceSummary(BaseModel):
+    count: int
+    total: float
+
 # PDF Upload
 class PDFUploadBase(BaseSchema):
     filename: str
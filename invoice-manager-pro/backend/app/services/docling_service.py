@@ -5,6 +5,7 @@ try:
 except ImportError:
     DOCLING_AVAILABLE = False
     
+from fastapi.concurrency import run_in_threadpool
 from pathlib import Path
 import json
 from typing import Dict, Any, Optional
@@ -37,8 +38,9 @@ class DoclingService:
             if not self.converter:
                 raise Exception("Docling library is not installed on this system.")
             
-            # Convert PDF to DoclingDocument
-            result = self.converter.convert(file_path)
+            # Convert PDF to DoclingDocument (CPU-bound: in a worker thread,
+            # not on the event loop the API requests share)
+            result = await run_in_threadpool(self.converter.convert, file_path)
             
             # Extract text content
             text_content = result.document.export_to_markdown()
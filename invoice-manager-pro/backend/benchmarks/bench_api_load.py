@@ -0,0 +1,134 @@
+"""
+Load benchmark for the API's read endpoints (httpx, asyncio).
+
+Fires --requests GETs at /customers/, /invoices/ and /items/ with at most
+--concurrency in flight and reports throughput, latency percentiles, errors
+and the connection pool figures from /metrics. By default the app runs
+in-process (httpx ASGITransport, a single event loop, like one uvicorn
+worker) on a temporary SQLite database seeded with --rows
+customers/invoices/items; --url points it at a running server instead
+(e.g. uvicorn with Postgres).
+
+Usage:
+    python benchmarks/bench_api_load.py [--requests 2000] [--concurrency 100] [--rows 200]
+    python benchmarks/bench_api_load.py --url http://localhost:8000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+ENDPOINTS = ("/api/v1/customers/", "/api/v1/invoices/", "/api/v1/items/")
+ITEMS_PER_INVOICE = 5
+
+
+async def seed(rows):
+    from app.core.database import AsyncSessionLocal, Base, engine
+    from app.models.models import Company, Customer, Invoice, InvoiceItem, Item
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as db:
+        company = Company(name="Redmil Technology")
+        db.add(company)
+        await db.flush()
+        for i in range(rows):
+            customer = Customer(company=company, name=f"Cliente {i}", email=f"cliente{i}@example.com",
+                                billing_city="San Pedro Sula")
+            db.add(Item(company=company, name=f"Producto {i}", price=Decimal("10.50") + i, sku=f"SKU-{i:05d}"))
+            items = [InvoiceItem(name=f"Producto {j}", quantity=j + 1, price=Decimal("10.50"),
+                                 total=Decimal("10.50") * (j + 1)) for j in range(ITEMS_PER_INVOICE)]
+            db.add(Invoice(company=company, customer=customer, invoice_number=f"FAC-{i:06d}",
+                           invoice_date=date(2025, 1, 1) + timedelta(days=i % 365),
+                           due_date=date(2025, 2, 1) + timedelta(days=i % 365),
+                           subtotal=Decimal("157.50"), total=Decimal("181.13"), items=items))
+        await db.commit()
+
+
+async def run_load(client, total, concurrency):
+    latencies, errors = [], 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(n):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await client.get(ENDPOINTS[n % len(ENDPOINTS)])
+                ok = response.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            latencies.append(time.perf_counter() - start)
+            errors += not ok
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(n) for n in range(total)))
+    return time.perf_counter() - start, latencies, errors
+
+
+def percentile(values, p):
+    return statistics.quantiles(values, n=100)[p - 1] if len(values) > 1 else values[0]
+
+
+async def main_async(args):
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=60,
+                                   limits=httpx.Limits(max_connections=args.concurrency))
+        target = args.url
+    else:
+        await seed(args.rows)
+        from app.main import app
+        # App errors (pool timeouts included) count as failed requests, like 500s from a server
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        client = httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60)
+        target = f"in-process, SQLite, {args.rows} rows per table"
+
+    async with client:
+        await run_load(client, len(ENDPOINTS), 1)  # warm-up: connections, statement caches
+        elapsed, latencies, errors = await run_load(client, args.requests, args.concurrency)
+        metrics = (await client.get("/metrics")).text
+
+    print(f"{target}: {args.requests} requests, concurrency {args.concurrency}")
+    print(f"  {args.requests / elapsed:8.1f} req/s in {elapsed:.2f} s")
+    print(f"  latency p50 {percentile(latencies, 50) * 1000:7.1f} ms | "
+          f"p95 {percentile(latencies, 95) * 1000:7.1f} ms | p99 {percentile(latencies, 99) * 1000:7.1f} ms")
+    print(f"  errors: {errors}")
+    values = dict(line.rsplit(" ", 1) for line in metrics.splitlines() if line.startswith("db_pool_"))
+    if "db_pool_size" in values:
+        wait_count = float(values["db_pool_wait_seconds_count"])
+        print(f"  pool: size {values['db_pool_size']} + overflow {values['db_pool_max_overflow']}, "
+              f"peak {values['db_pool_checked_out_peak']} checked out, "
+              f"wait avg {float(values['db_pool_wait_seconds_sum']) / max(wait_count, 1) * 1000:.1f} ms "
+              f"max {float(values['db_pool_wait_seconds_max']) * 1000:.1f} ms, "
+              f"{values['db_pool_timeouts_total']} timeouts")
+
+    if not args.url:
+        from app.core.database import engine
+        await engine.dispose()
+    return errors == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="base URL of a running server (default: in-process app)")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--rows", type=int, default=200, help="seeded rows per table (in-process mode)")
+    args = parser.parse_args()
+    if not args.url:
+        # Must be set before app.core.config is imported
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    sys.exit(0 if asyncio.run(main_async(args)) else 1)
+
+
+if __name__ == "__main__":
+    main()
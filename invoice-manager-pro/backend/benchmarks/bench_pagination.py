@@ -0,0 +1,166 @@
+"""
+Benchmark: GET /api/v1/invoices/ latency by page depth, keyset vs OFFSET.
+
+Seeds a temporary SQLite database (the models' schema and indexes) with
+--invoices invoices of one item each, then requests pages at increasing
+depths: the cursor for depth d is built from the d-th row of the listing,
+so deep pages are measured without walking every page before them. Each
+depth is requested --repeat times in-process (httpx ASGITransport) for p50/p95,
+for the default listing and for status / customer filters. The same depths
+are read with LIMIT/OFFSET for comparison, and the first page (with
+X-Total-Count) is reported on its own.
+
+Fails (exit 1) unless the p95 of the deepest cursor page stays within 2x
+(+5 ms) of the shallowest one.
+
+Usage:
+    python benchmarks/bench_pagination.py [--invoices 1000000] [--repeat 30]
+"""
+import argparse
+import asyncio
+import gc
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+PAGE = 50
+CUSTOMERS = 50
+STATUSES = ("draft", "sent", "paid", "overdue")
+COLUMNS = "id, company_id, customer_id, invoice_number, invoice_date, due_date, status, subtotal, discount, tax, total, paid_status, created_at, updated_at"
+
+
+def seed(path, invoices):
+    """Bulk-loads the rows with sqlite3, in the storage formats SQLAlchemy uses on SQLite."""
+    conn = sqlite3.connect(path)
+    company = uuid.uuid4().hex
+    conn.execute("INSERT INTO companies (id, name) VALUES (?, ?)", (company, "Redmil"))
+    customers = [uuid.uuid4().hex for _ in range(CUSTOMERS)]
+    conn.executemany("INSERT INTO customers (id, company_id, name, currency, created_at, updated_at) "
+                     "VALUES (?, ?, ?, 'USD', '2024-01-01 00:00:00.000000', '2024-01-01 00:00:00.000000')",
+                     ((c, company, f"Cliente {i}") for i, c in enumerate(customers)))
+    start = datetime(2020, 1, 1)
+
+    def invoice_rows():
+        for i in range(invoices):
+            created = (start + timedelta(seconds=i * 97)).strftime("%Y-%m-%d %H:%M:%S.%f")
+            day = date(2020, 1, 1) + timedelta(days=i % 2000)
+            total = round(10 + (i % 5000) * 1.37, 2)
+            yield (uuid.uuid4().hex, company, customers[i % CUSTOMERS], f"FAC-{i:08d}", day.isoformat(),
+                   (day + timedelta(days=30)).isoformat(), STATUSES[i % len(STATUSES)], total, 0, 0, total,
+                   "paid" if i % 2 else "unpaid", created, created)
+
+    conn.executemany(f"INSERT INTO invoices ({COLUMNS}) VALUES ({', '.join('?' * 14)})", invoice_rows())
+    conn.execute("""
+        INSERT INTO invoice_items (id, invoice_id, name, quantity, price, discount, tax, total, created_at, updated_at)
+        SELECT lower(hex(randomblob(16))), id, 'Producto', 1, total, 0, 0, total, created_at, created_at FROM invoices
+    """)
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+    return customers
+
+
+def percentile(values, p):
+    return statistics.quantiles(values, n=100)[p - 1]
+
+
+async def timed_get(client, params, repeat):
+    # Same starting point for every depth: a collection pause inside one
+    # series would read as a depth effect
+    await client.get("/api/v1/invoices/", params=params)
+    gc.collect()
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = await client.get("/api/v1/invoices/", params=params)
+        latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200 and len(response.json()) == PAGE, response.text[:200]
+    return latencies
+
+
+def cursor_at(conn, depth, where="", params=()):
+    from app.core.pagination import encode_cursor
+    created, row_id = conn.execute(
+        f"SELECT created_at, id FROM invoices {where} ORDER BY created_at DESC, id DESC LIMIT 1 OFFSET ?",
+        (*params, depth - 1),
+    ).fetchone()
+    return encode_cursor("created_at", "desc", datetime.fromisoformat(created), uuid.UUID(row_id))
+
+
+def offset_latencies(conn, depth, repeat):
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.execute(f"SELECT {COLUMNS} FROM invoices ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?",
+                     (PAGE, depth)).fetchall()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def main_async(args, path):
+    from app.core.database import Base, engine
+    from app.main import app
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    start = time.perf_counter()
+    customers = seed(path, args.invoices)
+    print(f"{args.invoices:,} invoices seeded in {time.perf_counter() - start:.0f} s")
+
+    depths = [d for d in (100, 1_000, 10_000, 100_000, 500_000, args.invoices - PAGE) if d <= args.invoices - PAGE]
+    listings = {
+        "all": ("", (), {}),
+        "status=paid": ("WHERE status = ?", ("paid",), {"status": "paid"}),
+        "customer": ("WHERE customer_id = ?", (customers[7],), {"customer_id": str(uuid.UUID(customers[7]))}),
+    }
+    sql = sqlite3.connect(path)
+    flat = True
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        first = await timed_get(client, {"limit": PAGE}, args.repeat)
+        print(f"first page + X-Total-Count: p50 {statistics.median(first) * 1000:7.1f} ms  "
+              f"p95 {percentile(first, 95) * 1000:7.1f} ms")
+
+        for name, (where, params, filters) in listings.items():
+            rows = sql.execute(f"SELECT count(*) FROM invoices {where}", params).fetchone()[0]
+            p95s = []
+            for depth in [d for d in depths if d <= rows - PAGE]:
+                cursor = cursor_at(sql, depth, where, params)
+                latencies = await timed_get(client, dict(filters, limit=PAGE, cursor=cursor), args.repeat)
+                p95s.append(percentile(latencies, 95))
+                line = (f"{name:>12} depth {depth:>9,}: cursor p50 {statistics.median(latencies) * 1000:6.1f} ms"
+                        f"  p95 {p95s[-1] * 1000:6.1f} ms")
+                if name == "all":
+                    offset = offset_latencies(sql, depth, min(args.repeat, 5))
+                    line += f"  | OFFSET query p50 {statistics.median(offset) * 1000:8.1f} ms"
+                print(line)
+            if p95s and p95s[-1] > 2 * p95s[0] + 0.005:
+                flat = False
+    sql.close()
+    await engine.dispose()
+    print("p95 flat across depths:", "ok" if flat else "FAIL")
+    return flat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--invoices", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    # Must be set before app.core.config is imported
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    sys.exit(0 if asyncio.run(main_async(args, path)) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,8 @@
 
 -- Enable UUID extension
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
+-- Trigram indexes for the ?q= searches of the list endpoints
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
 
 -- Companies/Organizations Table
 CREATE TABLE companies (
@@ -227,13 +229,32 @@ CREATE TABLE settings (
 );
 
 -- Indexes for performance
-CREATE INDEX idx_invoices_customer ON invoices(customer_id);
-CREATE INDEX idx_invoices_status ON invoices(status);
-CREATE INDEX idx_invoices_date ON invoices(invoice_date);
 CREATE INDEX idx_payments_invoice ON payments(invoice_id);
 CREATE INDEX idx_customers_company ON customers(company_id);
 CREATE INDEX idx_items_company ON items(company_id);
 CREATE INDEX idx_pdf_uploads_company ON pdf_uploads(company_id);
+-- List endpoints: keyset pagination on (sort column, id), filters + default sort
+CREATE INDEX idx_invoices_customer ON invoices(customer_id, created_at, id);
+CREATE INDEX idx_invoices_status ON invoices(status, created_at, id);
+CREATE INDEX idx_invoices_paid_status ON invoices(paid_status, created_at, id);
+CREATE INDEX idx_invoices_date ON invoices(invoice_date, id);
+CREATE INDEX idx_invoices_created ON invoices(created_at, id);
+CREATE INDEX idx_invoices_due_date ON invoices(due_date, id);
+CREATE INDEX idx_invoices_total ON invoices(total, id);
+CREATE INDEX idx_invoice_items_invoice ON invoice_items(invoice_id);
+CREATE INDEX idx_customers_created ON customers(created_at, id);
+CREATE INDEX idx_customers_name ON customers(name, id);
+CREATE INDEX idx_items_created ON items(created_at, id);
+CREATE INDEX idx_items_name ON items(name, id);
+CREATE INDEX idx_items_price ON items(price, id);
+CREATE INDEX idx_items_category ON items(category, created_at, id);
+-- ?q= search (lower(col) LIKE '%...%')
+CREATE INDEX idx_invoices_number_trgm ON invoices USING gin (lower(invoice_number) gin_trgm_ops);
+CREATE INDEX idx_customers_name_trgm ON customers USING gin (lower(name) gin_trgm_ops);
+CREATE INDEX idx_customers_contact_trgm ON customers USING gin (lower(contact_name) gin_trgm_ops);
+CREATE INDEX idx_customers_email_trgm ON customers USING gin (lower(email) gin_trgm_ops);
+CREATE INDEX idx_items_name_trgm ON items USING gin (lower(name) gin_trgm_ops);
+CREATE INDEX idx_items_sku_trgm ON items USING gin (lower(sku) gin_trgm_ops);
 -- --- CRM MODULE TABLES ---
 
 -- Customer Tags Table
@@ -0,0 +1,34 @@
+-- Indexes for the paginated list endpoints (GET /invoices/, /customers/, /items/)
+-- on databases created before they were added to init.sql.
+-- Run with psql outside a transaction (CREATE INDEX CONCURRENTLY doesn't lock writes):
+--   psql "$DATABASE_URL" -f database/migrations/001_list_endpoint_indexes.sql
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Replaced by the composite versions below (same names, so drop them first)
+DROP INDEX CONCURRENTLY IF EXISTS idx_invoices_customer;
+DROP INDEX CONCURRENTLY IF EXISTS idx_invoices_status;
+DROP INDEX CONCURRENTLY IF EXISTS idx_invoices_date;
+
+-- List endpoints: keyset pagination on (sort column, id), filters + default sort
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_invoices_customer ON invoices(customer_id, created_at, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_invoices_status ON invoices(status, created_at, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_invoices_paid_status ON invoices(paid_status, created_at, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_invoices_date ON invoices(invoice_date, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_invoices_created ON invoices(created_at, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_invoices_due_date ON invoices(due_date, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_invoices_total ON invoices(total, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_invoice_items_invoice ON invoice_items(invoice_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_customers_created ON customers(created_at, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_customers_name ON customers(name, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_items_created ON items(created_at, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_items_name ON items(name, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_items_price ON items(price, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_items_category ON items(category, created_at, id);
+-- ?q= search (lower(col) LIKE '%...%')
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_invoices_number_trgm ON invoices USING gin (lower(invoice_number) gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_customers_name_trgm ON customers USING gin (lower(name) gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_customers_contact_trgm ON customers USING gin (lower(contact_name) gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_customers_email_trgm ON customers USING gin (lower(email) gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_items_name_trgm ON items USING gin (lower(name) gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_items_sku_trgm ON items USING gin (lower(sku) gin_trgm_ops);
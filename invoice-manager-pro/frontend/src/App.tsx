@@ -1,5 +1,4 @@
 import { Refine, Authenticated } from "@refinedev/core";
-import { dataProvider } from "@refinedev/simple-rest";
 import routerBindings, {
     CatchAllNavigate,
     NavigateToResource,
@@ -16,13 +15,14 @@ import { PipelineKanbanPage } from "./pages/pipeline";
 import { CRMDashboard } from "./pages/crm-dashboard";
 import { LoginPage } from "./pages/login";
 import { authProvider } from "./authProvider";
+import { dataProvider } from "./dataProvider";
 import "./index.css";
 
 const App = () => {
     return (
         <BrowserRouter>
             <Refine
-                dataProvider={dataProvider("http://localhost:8000/api/v1")}
+                dataProvider={dataProvider}
                 authProvider={authProvider}
                 routerProvider={routerBindings}
                 resources={[
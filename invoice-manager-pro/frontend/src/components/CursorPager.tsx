@@ -0,0 +1,29 @@
+import React from "react";
+import { ChevronLeft, ChevronRight } from "lucide-react";
+
+interface CursorPagerProps {
+    page: number;
+    nextCursor?: string;
+    onPrevious: () => void;
+    onNext: (cursor?: string) => void;
+}
+
+export const CursorPager: React.FC<CursorPagerProps> = ({ page, nextCursor, onPrevious, onNext }) => (
+    <div className="flex items-center justify-end gap-4 text-sm font-bold text-spotify-gray-text">
+        <button
+            onClick={onPrevious}
+            disabled={page <= 1}
+            className="flex items-center gap-1 px-4 py-2 rounded-full hover:text-white disabled:opacity-30 disabled:hover:text-spotify-gray-text transition-all"
+        >
+            <ChevronLeft size={18} /> Anterior
+        </button>
+        <span>Página {page}</span>
+        <button
+            onClick={() => onNext(nextCursor)}
+            disabled={!nextCursor}
+            className="flex items-center gap-1 px-4 py-2 rounded-full hover:text-white disabled:opacity-30 disabled:hover:text-spotify-gray-text transition-all"
+        >
+            Siguiente <ChevronRight size={18} />
+        </button>
+    </div>
+);
@@ -0,0 +1,74 @@
+import { useState } from "react";
+import { BaseRecord, DataProvider, GetListParams, GetListResponse, HttpError } from "@refinedev/core";
+import { dataProvider as simpleRestProvider } from "@refinedev/simple-rest";
+
+export const API_URL = "http://localhost:8000/api/v1";
+
+// Lists that the API pages with ?limit= and ?cursor= (app/core/pagination.py)
+const CURSOR_RESOURCES = ["invoices", "customers", "items"];
+const DEFAULT_LIMIT = 50;
+const MAX_LIMIT = 200;
+
+const restProvider = simpleRestProvider(API_URL);
+
+/**
+ * simple-rest, except for the keyset-paginated lists: those take limit/cursor
+ * instead of _start/_end, so a page is requested with pagination.pageSize and
+ * the cursor of the page in meta.cursor. The next page's cursor comes back in
+ * cursor.next (X-Next-Cursor); total (X-Total-Count) is only sent on the
+ * first page. A filter on "q" is the server-side search.
+ */
+export const dataProvider: DataProvider = {
+    ...restProvider,
+    getList: async <TData extends BaseRecord = BaseRecord>(params: GetListParams): Promise<GetListResponse<TData>> => {
+        const { resource, pagination, filters, sorters, meta } = params;
+        if (!CURSOR_RESOURCES.includes(resource)) {
+            return restProvider.getList<TData>(params);
+        }
+
+        const query = new URLSearchParams();
+        query.set("limit", String(Math.min(pagination?.pageSize ?? DEFAULT_LIMIT, MAX_LIMIT)));
+        if (meta?.cursor) {
+            query.set("cursor", meta.cursor);
+        }
+        for (const filter of filters ?? []) {
+            if ("field" in filter && filter.value !== undefined && filter.value !== null && filter.value !== "") {
+                query.set(filter.field, String(filter.value));
+            }
+        }
+        if (sorters?.length) {
+            query.set("sort", sorters[0].field);
+            query.set("order", sorters[0].order);
+        }
+
+        const response = await fetch(`${API_URL}/${resource}/?${query}`);
+        if (!response.ok) {
+            const error: HttpError = { message: response.statusText, statusCode: response.status };
+            throw error;
+        }
+        const data: TData[] = await response.json();
+        const total = response.headers.get("X-Total-Count");
+        return {
+            data,
+            // Only the first page is counted; later pages report their own length
+            total: total === null ? data.length : Number(total),
+            cursor: { next: response.headers.get("X-Next-Cursor") ?? undefined },
+        };
+    },
+};
+
+/** Back/forward navigation over cursor pages: the cursors of the pages visited so far. */
+export const useCursorPages = () => {
+    const [cursors, setCursors] = useState<(string | undefined)[]>([undefined]);
+    return {
+        cursor: cursors[cursors.length - 1],
+        page: cursors.length,
+        next: (cursor?: string) => {
+            if (cursor) {
+                setCursors((prev) => [...prev, cursor]);
+            }
+        },
+        previous: () => setCursors((prev) => (prev.length > 1 ? prev.slice(0, -1) : prev)),
+        reset: () => setCursors([undefined]),
+    };
+};
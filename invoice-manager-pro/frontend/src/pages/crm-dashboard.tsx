@@ -1,5 +1,5 @@
 import React from "react";
-import { useList } from "@refinedev/core";
+import { useCustom, useList } from "@refinedev/core";
 import {
     TrendingUp,
     Users,
@@ -8,11 +8,13 @@ import {
     ArrowUpRight,
     ArrowDownRight
 } from "lucide-react";
-import { Estimate, Invoice } from "../types";
+import { API_URL } from "../dataProvider";
+import { Estimate, InvoiceSummary } from "../types";
 
 export const CRMDashboard: React.FC = () => {
     const { data: estimates } = useList<Estimate>({ resource: "estimates" });
-    const { data: invoices } = useList<Invoice>({ resource: "invoices" });
+    // Summed by the database: the invoice list only returns one page
+    const { data: invoiceSummary } = useCustom<InvoiceSummary>({ url: `${API_URL}/invoices/summary`, method: "get" });
 
     // Calculations
     const conversionRate = 65.4; // %
@@ -27,7 +29,7 @@ export const CRMDashboard: React.FC = () => {
             <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-4 gap-6">
                 {[
                     { label: "Tasa de Conversión", value: `${conversionRate}%`, icon: <Target className="text-spotify-green" />, trend: "+2.4%", up: true },
-                    { label: "Ventas Totales", value: `Lps. ${(invoices?.data.reduce((acc, inv) => acc + (inv.total || 0), 0) || 1200000).toLocaleString()}`, icon: <TrendingUp className="text-blue-500" />, trend: "+12%", up: true },
+                    { label: "Ventas Totales", value: `Lps. ${(invoiceSummary?.data.total || 1200000).toLocaleString()}`, icon: <TrendingUp className="text-blue-500" />, trend: "+12%", up: true },
                     { label: "Clientes Activos", value: "142", icon: <Users className="text-purple-500" />, trend: "-1.2%", up: false },
                     { label: "Pipeline Valor", value: "Lps. 4.5M", icon: <DollarSign className="text-yellow-500" />, trend: "+5.1%", up: true },
                 ].map((card, i) => (
@@ -1,10 +1,18 @@
-import React from "react";
+import React, { useState } from "react";
 import { useList } from "@refinedev/core";
 import { Users, Search, MoreHorizontal } from "lucide-react";
+import { CursorPager } from "../components/CursorPager";
+import { useCursorPages } from "../dataProvider";
 
 export const CustomerListPage: React.FC = () => {
+    const [search, setSearch] = useState("");
+    const pages = useCursorPages();
     const { data, isLoading } = useList({
         resource: "customers",
+        pagination: { pageSize: 50 },
+        filters: [{ field: "q", operator: "contains", value: search }],
+        sorters: [{ field: "name", order: "asc" }],
+        meta: { cursor: pages.cursor },
     });
 
     return (
@@ -27,7 +35,12 @@ export const CustomerListPage: React.FC = () => {
                     <Search className="text-spotify-gray-text" size={20} />
                     <input
                         type="text"
-                        placeholder="Busca por nombre, etiqueta o ciudad..."
+                        placeholder="Busca por nombre, contacto o email..."
+                        value={search}
+                        onChange={(e) => {
+                            setSearch(e.target.value);
+                            pages.reset();
+                        }}
                         className="bg-transparent border-none outline-none text-white w-full text-sm placeholder-spotify-gray-text"
                     />
                 </div>
@@ -82,6 +95,13 @@ export const CustomerListPage: React.FC = () => {
                     ))
                 )}
             </div>
+
+            <CursorPager
+                page={pages.page}
+                nextCursor={data?.cursor?.next}
+                onPrevious={pages.previous}
+                onNext={pages.next}
+            />
         </div>
     );
 };
@@ -13,6 +13,8 @@ import {
 } from "lucide-react";
 import { Customer, Item, InvoiceItem } from "../types";
 
+const PICKER_SIZE = 50;
+
 interface ItemRow extends Omit<InvoiceItem, "id"> {
     id: string; // Internal unique ID for React keys
 }
@@ -23,9 +25,22 @@ export const InvoiceCreatePage: React.FC = () => {
     const [isvRate] = useState(0.15); // 15% ISV Honduras
     const { mutate: createInvoice } = useCreate();
 
-    // Data for selectors
-    const { data: customers } = useList<Customer>({ resource: "customers" });
-    const { data: products } = useList<Item>({ resource: "items" });
+    // Data for selectors: the first PICKER_SIZE matches of the server-side search
+    const [customerSearch, setCustomerSearch] = useState("");
+    const [customerName, setCustomerName] = useState("");
+    const [productSearch, setProductSearch] = useState("");
+    const { data: customers } = useList<Customer>({
+        resource: "customers",
+        pagination: { pageSize: PICKER_SIZE },
+        filters: [{ field: "q", operator: "contains", value: customerSearch }],
+        sorters: [{ field: "name", order: "asc" }],
+    });
+    const { data: products } = useList<Item>({
+        resource: "items",
+        pagination: { pageSize: PICKER_SIZE },
+        filters: [{ field: "q", operator: "contains", value: productSearch }],
+        sorters: [{ field: "name", order: "asc" }],
+    });
 
     const addItem = () => {
         const newId = Math.random().toString(36).substring(2, 9);
@@ -131,19 +146,33 @@ export const InvoiceCreatePage: React.FC = () => {
                             <User size={20} className="text-spotify-green" />
                             Selección de Cliente
                         </h2>
-                        <div className="relative">
-                            <select
-                                value={customerId}
-                                onChange={(e) => setCustomerId(e.target.value)}
-                                className="w-full bg-spotify-black border border-spotify-gray-light p-3 rounded-lg text-white appearance-none outline-none focus:border-spotify-green transition-all"
-                            >
-                                <option value="">Busca o selecciona un cliente...</option>
-                                {customers?.data.map((c) => (
-                                    <option key={c.id} value={c.id}>{c.name}</option>
-                                ))}
-                            </select>
+                        <div className="relative mb-3">
+                            <input
+                                type="text"
+                                value={customerSearch}
+                                placeholder="Buscar cliente por nombre, contacto o email..."
+                                onChange={(e) => setCustomerSearch(e.target.value)}
+                                className="w-full bg-spotify-black border border-spotify-gray-light p-3 rounded-lg text-white outline-none focus:border-spotify-green transition-all"
+                            />
                             <Search className="absolute right-4 top-3.5 text-spotify-gray-text pointer-events-none" size={18} />
                         </div>
+                        <select
+                            value={customerId}
+                            onChange={(e) => {
+                                setCustomerId(e.target.value);
+                                setCustomerName(e.target.selectedOptions[0]?.text || "");
+                            }}
+                            className="w-full bg-spotify-black border border-spotify-gray-light p-3 rounded-lg text-white appearance-none outline-none focus:border-spotify-green transition-all"
+                        >
+                            <option value="">Selecciona un cliente...</option>
+                            {/* Keep the chosen customer when a new search no longer lists it */}
+                            {customerId && !customers?.data.some((c) => c.id === customerId) && (
+                                <option value={customerId}>{customerName}</option>
+                            )}
+                            {customers?.data.map((c) => (
+                                <option key={c.id} value={c.id}>{c.name}</option>
+                            ))}
+                        </select>
                     </div>
 
                     {/* Sección Items */}
@@ -161,6 +190,17 @@ export const InvoiceCreatePage: React.FC = () => {
                             </button>
                         </div>
 
+                        <div className="relative mb-4">
+                            <input
+                                type="text"
+                                value={productSearch}
+                                placeholder="Buscar producto por nombre o SKU..."
+                                onChange={(e) => setProductSearch(e.target.value)}
+                                className="w-full bg-spotify-black border border-spotify-gray-light p-2 rounded-lg text-white text-sm outline-none focus:border-spotify-green transition-all"
+                            />
+                            <Search className="absolute right-3 top-2.5 text-spotify-gray-text pointer-events-none" size={16} />
+                        </div>
+
                         <div className="overflow-x-auto">
                             <table className="w-full border-collapse">
                                 <thead>
@@ -183,6 +223,9 @@ export const InvoiceCreatePage: React.FC = () => {
                                                         className="bg-transparent border-none text-white text-sm font-bold w-full outline-none"
                                                     >
                                                         <option value="">Selecciona Producto...</option>
+                                                        {item.item_id && !products?.data.some((p) => p.id === item.item_id) && (
+                                                            <option value={item.item_id}>{item.name}</option>
+                                                        )}
                                                         {products?.data.map((p) => (
                                                             <option key={p.id} value={p.id}>{p.name}</option>
                                                         ))}
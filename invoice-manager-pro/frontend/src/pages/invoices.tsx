@@ -1,11 +1,22 @@
 import React from "react";
-import { useList } from "@refinedev/core";
+import { useCustom, useList } from "@refinedev/core";
 import { Plus, MoreHorizontal, FileText } from "lucide-react";
-import { Invoice } from "../types";
+import { CursorPager } from "../components/CursorPager";
+import { API_URL, useCursorPages } from "../dataProvider";
+import { Invoice, InvoiceSummary } from "../types";
+
+const PAGE_SIZE = 50;
 
 export const InvoiceListPage: React.FC = () => {
+    const pages = useCursorPages();
     const { data, isLoading } = useList<Invoice>({
         resource: "invoices",
+        pagination: { pageSize: PAGE_SIZE },
+        meta: { cursor: pages.cursor },
+    });
+    const { data: summary } = useCustom<InvoiceSummary>({
+        url: `${API_URL}/invoices/summary`,
+        method: "get",
     });
 
     return (
@@ -20,7 +31,7 @@ export const InvoiceListPage: React.FC = () => {
                     <div className="flex items-center gap-2 text-sm font-semibold mt-4">
                         <span className="text-spotify-green">REDMIL Pro</span>
                         <span className="text-spotify-gray-text">•</span>
-                        <span>{data?.total || 0} facturas emitidas</span>
+                        <span>{summary?.data.count || 0} facturas emitidas</span>
                     </div>
                 </div>
             </header>
@@ -50,7 +61,7 @@ export const InvoiceListPage: React.FC = () => {
                         ) : (
                             data?.data.map((invoice, index) => (
                                 <tr key={invoice.id} className="group hover:bg-spotify-gray-light transition-colors rounded-md overflow-hidden cursor-pointer">
-                                    <td className="px-4 py-3 rounded-l-md font-medium">{index + 1}</td>
+                                    <td className="px-4 py-3 rounded-l-md font-medium">{(pages.page - 1) * PAGE_SIZE + index + 1}</td>
                                     <td className="px-4 py-3 text-white font-bold">{invoice.invoice_number}</td>
                                     <td className="px-4 py-3">{invoice.customer?.name || "N/A"}</td>
                                     <td className="px-4 py-3">{invoice.invoice_date}</td>
@@ -88,6 +99,13 @@ export const InvoiceListPage: React.FC = () => {
                     </tbody>
                 </table>
             </div>
+
+            <CursorPager
+                page={pages.page}
+                nextCursor={data?.cursor?.next}
+                onPrevious={pages.previous}
+                onNext={pages.next}
+            />
         </div>
     );
 };
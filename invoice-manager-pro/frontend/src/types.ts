@@ -47,6 +47,11 @@ export interface Invoice {
     paid_status?: string;
 }
 
+export interface InvoiceSummary {
+    count: number;
+    total: number;
+}
+
 export interface Estimate {
     id: string;
     pipeline_stage: 'opportunity' | 'proposal' | 'negotiation' | 'won' | 'lost';
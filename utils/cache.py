@@ -0,0 +1,96 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+
+def _freeze(value):
+    """Makes call arguments hashable (lists from multiselects, dicts, ...)."""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, set):
+        return tuple(sorted(_freeze(v) for v in value))
+    return value
+
+
+class ReadCache:
+    """
+    In-process LRU cache with TTL for the read helpers in database.py.
+
+    Every write helper bumps a generation counter; entries stored under an
+    older generation are never served again, so a read after a write in this
+    process always hits SQLite. The TTL bounds staleness for writes made by
+    other processes (another Streamlit server, update_rate.py, ...).
+
+    Cached values are shared between callers: treat them as read-only.
+    `scope` is an optional callable whose result is added to every key (the
+    database path, so switching DB_NAME never serves rows from another file).
+    """
+
+    def __init__(self, maxsize=256, ttl=60, scope=None):
+        self.maxsize = maxsize
+        self.scope = scope
+        self.ttl = ttl
+        self.enabled = True
+        self.generation = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def cached(self, fn):
+        """Decorator for read functions."""
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return fn(*args, **kwargs)
+            key = (self.scope() if self.scope else None, fn.__name__, _freeze(args), _freeze(kwargs))
+            now = time.monotonic()
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry and entry[0] == self.generation and entry[1] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[2]
+                self.misses += 1
+                generation = self.generation
+
+            value = fn(*args, **kwargs)
+
+            with self._lock:
+                # A write that happened while we were reading makes this value stale
+                if generation == self.generation:
+                    self._entries[key] = (generation, now + self.ttl, value)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.maxsize:
+                        self._entries.popitem(last=False)
+            return value
+        return wrapper
+
+    def invalidates(self, fn):
+        """Decorator for write functions: invalidates the cache once they return."""
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.invalidate()
+        return wrapper
+
+    def invalidate(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": len(self._entries),
+                "generation": self.generation,
+            }
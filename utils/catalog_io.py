@@ -0,0 +1,263 @@
+"""
+Products catalogue transfer: CSV and Parquet import/export.
+
+Both formats use one fixed schema, the columns of the `products` table
+(CATALOG_COLUMNS, without the internal id/fingerprint). Exports stream the
+table with fetchmany(); imports stream the file and hand it to
+database.bulk_upsert_products() in batches of `batch_size` rows, one
+transaction each (batch_size=None: the whole file in one transaction).
+last_updated is exported for reference; an import stamps its own. Empty
+optional cells keep the stored values; rows with an empty REQUIRED_COLUMNS
+cell or a non-numeric NUMERIC_COLUMNS value are skipped and reported by
+line/row number.
+
+    python database.py export productos.parquet
+    python database.py import productos.csv [--delta] [--batch-size N]
+"""
+import argparse
+import csv
+import math
+import os
+import time
+
+import database
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet is optional, CSV works without it
+    pa = pq = None
+
+CATALOG_COLUMNS = (
+    "product_code", "description", "brand", "cost_usd", "cost_lps",
+    "stock_quantity", "category", "image_url", "last_updated",
+)
+REQUIRED_COLUMNS = ("product_code", "description", "cost_usd")
+NUMERIC_COLUMNS = {"cost_usd": float, "cost_lps": float, "stock_quantity": int}
+BATCH_SIZE = 50_000
+CSV_ENCODING = "utf-8-sig"  # the BOM makes Excel open accented text correctly
+PARQUET_COMPRESSION = "zstd"
+
+if pa is not None:
+    PARQUET_SCHEMA = pa.schema([
+        pa.field("product_code", pa.string(), nullable=False),
+        pa.field("description", pa.string(), nullable=False),
+        pa.field("brand", pa.string()),
+        pa.field("cost_usd", pa.float64()),
+        pa.field("cost_lps", pa.float64()),
+        pa.field("stock_quantity", pa.int64()),
+        pa.field("category", pa.string()),
+        pa.field("image_url", pa.string()),
+        pa.field("last_updated", pa.string()),
+    ])
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("pyarrow is required for Parquet files (pip install pyarrow)")
+
+def _check_columns(columns, path):
+    missing = [col for col in REQUIRED_COLUMNS if col not in columns]
+    if missing:
+        raise ValueError(f"{os.path.basename(path)} is missing columns {missing}")
+
+def _iter_catalog(batch_size):
+    """Yields lists of product rows (tuples in CATALOG_COLUMNS order) ordered by code."""
+    with database.db_connection() as conn:
+        c = conn.cursor()
+        c.execute(f"SELECT {', '.join(CATALOG_COLUMNS)} FROM products ORDER BY product_code")
+        while True:
+            rows = c.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+
+def _batched(rows, batch_size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _to_number(value, kind):
+    """`value` as a finite `kind` (float/int); integral floats such as "12.0" are valid stock."""
+    if kind is int and isinstance(value, int):
+        return value
+    number = float(value)
+    if not math.isfinite(number) or (kind is int and not number.is_integer()):
+        raise ValueError(value)
+    return kind(number)
+
+def _complete(rows, totals):
+    """
+    Product dicts of (location, product) pairs that have every REQUIRED_COLUMNS
+    value and numbers in NUMERIC_COLUMNS (converted in place); the others would
+    fail their whole batch, so they are skipped, counted in totals['skipped']
+    and described ("line 3: empty cost_usd") in totals['skipped_rows'].
+    """
+    for location, product in rows:
+        missing = [col for col in REQUIRED_COLUMNS
+                   if product.get(col) is None or not str(product[col]).strip()]
+        if missing:
+            totals['skipped'] += 1
+            totals['skipped_rows'].append(f"{location}: empty {', '.join(missing)}")
+            continue
+        invalid = []
+        for col, kind in NUMERIC_COLUMNS.items():
+            if product.get(col) is None or not str(product[col]).strip():
+                product[col] = None  # optional and empty: keeps the stored value
+                continue
+            try:
+                product[col] = _to_number(product[col], kind)
+            except (TypeError, ValueError, OverflowError):
+                invalid.append(f"{col}={product[col]!r}")
+        if invalid:
+            totals['skipped'] += 1
+            totals['skipped_rows'].append(f"{location}: not a number {', '.join(invalid)}")
+            continue
+        yield product
+
+def _upsert(rows, batch_size, delta, user_name):
+    """
+    Feeds the complete (location, product) rows to bulk_upsert_products().
+    Totals, or None if a batch failed.
+    """
+    totals = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0, 'skipped_rows': []}
+    rows = _complete(rows, totals)
+    batches = [rows] if batch_size is None else _batched(rows, batch_size)
+    for batch in batches:
+        result = database.bulk_upsert_products(batch, user_name=user_name, delta=delta)
+        if result is None:
+            return None
+        for key in ('inserted', 'updated', 'unchanged'):
+            totals[key] += result[key]
+    return totals
+
+def export_products_csv(path, batch_size=BATCH_SIZE):
+    """Writes the products table to a CSV file. Returns the number of products."""
+    count = 0
+    with open(path, "w", newline="", encoding=CSV_ENCODING) as f:
+        writer = csv.writer(f)
+        writer.writerow(CATALOG_COLUMNS)
+        for rows in _iter_catalog(batch_size):
+            writer.writerows(rows)
+            count += len(rows)
+    return count
+
+def export_products_parquet(path, batch_size=BATCH_SIZE):
+    """Writes the products table to a Parquet file (PARQUET_SCHEMA). Returns the number of products."""
+    _require_pyarrow()
+    count = 0
+    with pq.ParquetWriter(path, PARQUET_SCHEMA, compression=PARQUET_COMPRESSION) as writer:
+        for rows in _iter_catalog(batch_size):
+            columns = [pa.array(values, type=field.type)
+                       for values, field in zip(zip(*rows), PARQUET_SCHEMA)]
+            writer.write_batch(pa.RecordBatch.from_arrays(columns, schema=PARQUET_SCHEMA))
+            count += len(rows)
+    return count
+
+def _csv_products(f, path):
+    reader = csv.reader(f)
+    header = [name.strip() for name in next(reader, [])]
+    _check_columns(header, path)
+    wanted = [(i, name) for i, name in enumerate(header) if name in CATALOG_COLUMNS and name != "last_updated"]
+    for row in reader:
+        if not row:
+            continue
+        # Empty cells are None: bulk_upsert_products() keeps the stored value of
+        # optional columns, _complete() skips rows missing a required one
+        yield f"line {reader.line_num}", {name: (row[i] if i < len(row) and row[i] != "" else None)
+                                          for i, name in wanted}
+
+def import_products_csv(path, batch_size=BATCH_SIZE, delta=False, user_name="Importador CSV"):
+    """
+    Imports a CSV with CATALOG_COLUMNS headers (extra columns are ignored).
+    Returns {'inserted', 'updated', 'unchanged', 'skipped', 'skipped_rows'}, or None on error.
+    """
+    try:
+        with open(path, newline="", encoding=CSV_ENCODING) as f:
+            return _upsert(_csv_products(f, path), batch_size, delta, user_name)
+    except (OSError, ValueError, csv.Error) as e:
+        print(f"Error importing {path}: {e}")
+        return None
+
+def _parquet_products(path, batch_size):
+    source = pq.ParquetFile(path)
+    names = source.schema_arrow.names
+    _check_columns(names, path)
+    columns = [name for name in CATALOG_COLUMNS if name in names and name != "last_updated"]
+    # Nullable on read: rows missing a required value are reported by _complete()
+    schema = pa.schema([PARQUET_SCHEMA.field(name).with_nullable(True) for name in columns])
+    row = 0
+    for batch in source.iter_batches(batch_size=batch_size or BATCH_SIZE, columns=columns):
+        # Files written elsewhere may use other numeric types (int32 stock, decimal costs)
+        for product in pa.Table.from_batches([batch]).cast(schema).to_pylist():
+            row += 1
+            yield f"row {row}", product
+
+def import_products_parquet(path, batch_size=BATCH_SIZE, delta=False, user_name="Importador Parquet"):
+    """
+    Imports a Parquet file with CATALOG_COLUMNS columns (extra columns are ignored).
+    Returns {'inserted', 'updated', 'unchanged', 'skipped', 'skipped_rows'}, or None on error.
+    """
+    _require_pyarrow()
+    try:
+        return _upsert(_parquet_products(path, batch_size), batch_size, delta, user_name)
+    except (OSError, ValueError, pa.ArrowException) as e:
+        print(f"Error importing {path}: {e}")
+        return None
+
+def _is_parquet(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in (".csv", ".parquet", ".pq"):
+        raise ValueError(f"Unsupported catalogue format: {ext or path} (use .csv or .parquet)")
+    return ext != ".csv"
+
+def export_products(path, batch_size=BATCH_SIZE):
+    """export_products_csv/parquet by file extension."""
+    fn = export_products_parquet if _is_parquet(path) else export_products_csv
+    return fn(path, batch_size)
+
+def import_products(path, batch_size=BATCH_SIZE, delta=False):
+    """import_products_csv/parquet by file extension."""
+    fn = import_products_parquet if _is_parquet(path) else import_products_csv
+    return fn(path, batch_size, delta)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="database.py", description="Importa o exporta el catálogo de productos.")
+    parser.add_argument("action", choices=("import", "export"))
+    parser.add_argument("path", help="archivo .csv o .parquet")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE,
+                        help="productos por transacción (0: todo el archivo en una)")
+    parser.add_argument("--delta", action="store_true",
+                        help="importación delta: omite los productos con el mismo código, descripción, costo y marca")
+    args = parser.parse_args(argv)
+    batch_size = args.batch_size or None
+    try:
+        if _is_parquet(args.path):
+            _require_pyarrow()
+    except (ValueError, ImportError) as e:
+        parser.error(str(e))
+
+    database.init_db()
+    start = time.perf_counter()
+    try:
+        if args.action == "export":
+            count = export_products(args.path, batch_size or BATCH_SIZE)
+        else:
+            result = import_products(args.path, batch_size, args.delta)
+            if result is None:
+                raise SystemExit(1)
+            count = result['inserted'] + result['updated'] + result['unchanged']
+            for skipped in result.pop('skipped_rows'):
+                print(f"Omitido {os.path.basename(args.path)} {skipped}")
+    finally:
+        database.stop_checkpointer()
+    elapsed = time.perf_counter() - start
+    print(f"{count} productos en {elapsed:.1f} s ({count / elapsed if elapsed else 0:,.0f} productos/s)"
+          + ("" if args.action == "export" else f": {result}"))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import sqlite3
+import threading
+import queue
+from contextlib import contextmanager
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes available within the pool timeout."""
+
+
+class ConnectionPool:
+    """
+    Bounded pool of SQLite connections shared by all helpers in database.py.
+
+    - At most `max_size` connections are ever open at the same time.
+    - A connection checked out by a thread stays pinned to that thread until
+      the outermost `connection()` block exits, so nested helpers reuse it.
+    - Idle connections are health-checked (SELECT 1) before being handed out
+      and discarded if they are broken.
+    """
+
+    def __init__(self, db_name, max_size=5, timeout=30.0, on_connect=None):
+        self.db_name = db_name
+        self.max_size = max_size
+        self.timeout = timeout
+        # Called with every new connection (PRAGMAs, etc.)
+        self.on_connect = on_connect
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._open = 0
+        self._closed = False
+        # Simple counters, used by the benchmarks
+        self.stats = {"created": 0, "reused": 0, "discarded": 0, "checkouts": 0}
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_name, check_same_thread=False)
+        conn.row_factory = sqlite3.Row  # Access columns by name
+        if self.on_connect:
+            self.on_connect(conn)
+        return conn
+
+    def _is_healthy(self, conn):
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self._open -= 1
+            self.stats["discarded"] += 1
+
+    def _acquire(self):
+        while True:
+            # 1. Reuse an idle connection if there is one
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = None
+
+            if conn is None:
+                # 2. Open a new one while we are under the limit
+                with self._lock:
+                    can_open = self._open < self.max_size
+                    if can_open:
+                        self._open += 1
+                if can_open:
+                    try:
+                        conn = self._connect()
+                    except Exception:
+                        with self._lock:
+                            self._open -= 1
+                        raise
+                    with self._lock:
+                        self.stats["created"] += 1
+                    return conn
+
+                # 3. Pool exhausted, wait for another thread to release one
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise PoolTimeout(f"No SQLite connection available after {self.timeout}s")
+
+            if self._is_healthy(conn):
+                with self._lock:
+                    self.stats["reused"] += 1
+                return conn
+            self._discard(conn)
+
+    def _release(self, conn):
+        # Never hand out a connection with a half-finished transaction
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._discard(conn)
+            return
+        if self._closed:
+            self._discard(conn)
+        else:
+            self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """
+        Yields a pooled connection. Nested calls on the same thread get the
+        same connection; it goes back to the pool when the outermost block ends.
+        Uncommitted changes are rolled back on error and on release.
+        """
+        local = self._local
+        if getattr(local, "depth", 0) > 0:
+            local.depth += 1
+            try:
+                yield local.conn
+            finally:
+                local.depth -= 1
+            return
+
+        conn = self._acquire()
+        with self._lock:
+            self.stats["checkouts"] += 1
+        local.conn = conn
+        local.depth = 1
+        try:
+            yield conn
+        except Exception:
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                pass
+            raise
+        finally:
+            local.depth = 0
+            local.conn = None
+            self._release(conn)
+
+    def close_all(self):
+        """Closes every idle connection. Checked-out ones are closed on release."""
+        self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
@@ -1,36 +1,104 @@
+import threading
 import requests
 import database
 from datetime import datetime
 
 FRANKFURTER_URL = "https://api.frankfurter.app/latest"
+REQUEST_TIMEOUT = 5        # seconds
+REFRESH_INTERVAL = 3600    # seconds between polls while the API is healthy
+RETRY_DELAY = 30           # first retry after a failure, doubled each time
+MAX_RETRY_DELAY = 1800     # backoff ceiling
+RATE_TOLERANCE = 1e-6      # rates closer than this are "unchanged"
 
-def update_rates_from_api():
+_refresher = None
+_refresher_lock = threading.Lock()
+_status_lock = threading.Lock()
+status = {
+    "last_attempt": None,
+    "last_success": None,
+    "last_error": None,
+    "failures": 0,
+    "rate": None,
+    "inserted": 0,
+    "unchanged": 0,
+}
+
+def fetch_usd_hnl(url=None, timeout=REQUEST_TIMEOUT):
+    """Returns the USD to HNL rate from the Frankfurter API. Raises on any failure."""
+    # Frankfurter uses an EUR base by default; ask for ?from=USD&to=HNL
+    response = requests.get(url or FRANKFURTER_URL, params={"from": "USD", "to": "HNL"}, timeout=timeout)
+    if response.status_code != 200:
+        raise RuntimeError(f"API Error: {response.status_code}")
+    rates = response.json().get('rates', {})
+    if 'HNL' not in rates:
+        raise RuntimeError("HNL rate not found in API response.")
+    return float(rates['HNL'])
+
+def update_rates_from_api(url=None):
     """
     Fetches the latest USD to HNL rate from Frankfurter API.
+    A new exchange_rates row is only written when the rate changed.
     If HNL is not supported or API fails, logs error but does not crash.
     """
+    with _status_lock:
+        status["last_attempt"] = datetime.now()
     try:
-        # Request USD to HNL
-        # Note: Frankfurter supports EUR base by default. 
-        # We can ask for ?from=USD&to=HNL
-        response = requests.get(f"{FRANKFURTER_URL}?from=USD&to=HNL", timeout=5)
-        
-        if response.status_code == 200:
-            data = response.json()
-            rates = data.get('rates', {})
-            
-            if 'HNL' in rates:
-                rate_value = rates['HNL']
-                # Update DB
-                database.update_exchange_rate(rate_value)
-                return True, rate_value
-            else:
-                print("HNL rate not found in API response.")
-                return False, None
-        else:
-            print(f"API Error: {response.status_code}")
-            return False, None
-            
+        rate_value = fetch_usd_hnl(url)
+        changed = abs(rate_value - float(database.get_current_exchange_rate())) > RATE_TOLERANCE
+        if changed and not database.update_exchange_rate(rate_value, source="Frankfurter API"):
+            raise RuntimeError("could not store rate")
+        with _status_lock:
+            status.update(last_success=datetime.now(), last_error=None, failures=0, rate=rate_value)
+            status["inserted" if changed else "unchanged"] += 1
+        return True, rate_value
     except Exception as e:
         print(f"Forex API Exception: {e}")
+        with _status_lock:
+            status["last_error"] = str(e)
+            status["failures"] += 1
         return False, None
+
+def next_delay(failures, interval=None):
+    """Seconds until the next poll: the interval when healthy, exponential backoff otherwise."""
+    interval = REFRESH_INTERVAL if interval is None else interval
+    if failures == 0:
+        return interval
+    return min(RETRY_DELAY * 2 ** (failures - 1), MAX_RETRY_DELAY)
+
+def _refresh_loop(stop_event, interval, url):
+    while not stop_event.is_set():
+        update_rates_from_api(url)
+        with _status_lock:
+            failures = status["failures"]
+        stop_event.wait(next_delay(failures, interval))
+
+def start_refresher(interval=None, url=None):
+    """
+    Starts the background thread that keeps the exchange rate current.
+    Safe to call on every Streamlit rerun: only one thread runs per process.
+    """
+    global _refresher
+    interval = REFRESH_INTERVAL if interval is None else interval
+    with _refresher_lock:
+        if _refresher is not None and _refresher[0].is_alive():
+            return
+        stop_event = threading.Event()
+        thread = threading.Thread(target=_refresh_loop, args=(stop_event, interval, url), name="forex-refresher", daemon=True)
+        thread.start()
+        _refresher = (thread, stop_event)
+
+def stop_refresher(timeout=None):
+    """Stops the background refresher (used by scripts and checks)."""
+    global _refresher
+    with _refresher_lock:
+        if _refresher is None:
+            return
+        thread, stop_event = _refresher
+        _refresher = None
+    stop_event.set()
+    thread.join(timeout)
+
+def get_status():
+    """Snapshot of the refresher status (last success/error, failures, counters)."""
+    with _status_lock:
+        return dict(status)
@@ -0,0 +1,368 @@
+"""
+Versioned schema migrations for the SQLite database.
+
+Each migration is (version, name, steps). A step is either a SQL statement or
+a callable that receives the connection. Applied versions are recorded in the
+`schema_version` table; run_migrations() only applies the pending ones, each
+inside its own transaction.
+
+To change the schema, APPEND a new migration. Never edit one that has
+already shipped.
+"""
+import sqlite3
+
+# 1. Baseline: the tables init_db() used to create with IF NOT EXISTS.
+#    Kept idempotent so databases created before the runner existed upgrade cleanly.
+BASELINE = (
+    # Users Table
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        password_hash TEXT NOT NULL,
+        role TEXT NOT NULL DEFAULT 'vendedor',
+        full_name TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    # Products Table
+    """
+    CREATE TABLE IF NOT EXISTS products (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        product_code TEXT UNIQUE NOT NULL,
+        description TEXT NOT NULL,
+        brand TEXT,
+        cost_usd REAL,
+        cost_lps REAL,
+        stock_quantity INTEGER DEFAULT 0,
+        category TEXT,
+        image_url TEXT,
+        last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    # Exchange Rates Table
+    """
+    CREATE TABLE IF NOT EXISTS exchange_rates (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        rate_date DATE DEFAULT (DATE('now')),
+        rate_value REAL NOT NULL,
+        source TEXT
+    )
+    """,
+    # Margins Table
+    """
+    CREATE TABLE IF NOT EXISTS margins (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        brand TEXT UNIQUE,
+        margin_percentage REAL NOT NULL,
+        updated_by INTEGER,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY(updated_by) REFERENCES users(id)
+    )
+    """,
+    # Clients Table
+    """
+    CREATE TABLE IF NOT EXISTS clients (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        full_name TEXT NOT NULL,
+        rtn_id TEXT UNIQUE,
+        phone TEXT,
+        email TEXT,
+        address TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    # Quotes Table
+    """
+    CREATE TABLE IF NOT EXISTS quotes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        client_id INTEGER,
+        user_id INTEGER,
+        quote_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        expiration_date DATE,
+        total_amount_lps REAL,
+        status TEXT DEFAULT 'draft',
+        pdf_path TEXT,
+        FOREIGN KEY(client_id) REFERENCES clients(id),
+        FOREIGN KEY(user_id) REFERENCES users(id)
+    )
+    """,
+    # Quote Items Table
+    """
+    CREATE TABLE IF NOT EXISTS quote_items (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        quote_id INTEGER,
+        product_id INTEGER,
+        quantity INTEGER NOT NULL,
+        unit_price_lps REAL NOT NULL,
+        total_lps REAL NOT NULL,
+        FOREIGN KEY(quote_id) REFERENCES quotes(id),
+        FOREIGN KEY(product_id) REFERENCES products(id)
+    )
+    """,
+    # Brands Table (for persistence after clearing products)
+    """
+    CREATE TABLE IF NOT EXISTS brands (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT UNIQUE NOT NULL
+    )
+    """,
+    # Price History Table
+    """
+    CREATE TABLE IF NOT EXISTS product_price_history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        product_id INTEGER,
+        old_cost_usd REAL,
+        new_cost_usd REAL,
+        change_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        changed_by TEXT,
+        FOREIGN KEY(product_id) REFERENCES products(id)
+    )
+    """,
+    # Historical Quotes Table (Snapshot)
+    """
+    CREATE TABLE IF NOT EXISTS cotizaciones_historico (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        client_name TEXT,
+        client_details TEXT, -- JSON structure
+        products_json TEXT, -- JSON structure with price snapshots
+        total_lps REAL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    # System Config Table
+    """
+    CREATE TABLE IF NOT EXISTS system_config (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    )
+    """,
+)
+
+# 2. Secondary indexes for the lookups and ORDER BYs in database.py
+SECONDARY_INDEXES = (
+    # get_product_quotes / dashboard brand ranking
+    "CREATE INDEX IF NOT EXISTS idx_quote_items_quote_id ON quote_items(quote_id)",
+    "CREATE INDEX IF NOT EXISTS idx_quote_items_product_id ON quote_items(product_id)",
+    # get_product_history (filter + ORDER BY change_date)
+    "CREATE INDEX IF NOT EXISTS idx_price_history_product ON product_price_history(product_id, change_date)",
+    # get_current_exchange_rate / get_exchange_rate_history
+    "CREATE INDEX IF NOT EXISTS idx_exchange_rates_date ON exchange_rates(rate_date, id)",
+    # get_all_quotes_history
+    "CREATE INDEX IF NOT EXISTS idx_historico_created_at ON cotizaciones_historico(created_at)",
+    # get_all_quotes
+    "CREATE INDEX IF NOT EXISTS idx_quotes_quote_date ON quotes(quote_date)",
+    # get_all_products
+    "CREATE INDEX IF NOT EXISTS idx_products_brand_code ON products(brand, product_code)",
+)
+
+
+
+def has_fts5(conn):
+    """True if this SQLite build ships the FTS5 extension."""
+    try:
+        return bool(conn.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')").fetchone()[0])
+    except sqlite3.Error:
+        return False
+
+
+def create_products_fts(conn):
+    """
+    3. Full-text index over products (code, description, brand).
+    External-content table: the text lives in `products`, triggers keep the
+    index in sync. remove_diacritics makes 'camara' match 'Cámara'.
+    Skipped on SQLite builds without FTS5; search_products() then falls back to LIKE.
+    """
+    if not has_fts5(conn):
+        print("FTS5 not available, product search will use LIKE.")
+        return
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+            product_code, description, brand,
+            content='products', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+            INSERT INTO products_fts (rowid, product_code, description, brand)
+            VALUES (new.id, new.product_code, new.description, new.brand);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+            INSERT INTO products_fts (products_fts, rowid, product_code, description, brand)
+            VALUES ('delete', old.id, old.product_code, old.description, old.brand);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF product_code, description, brand ON products BEGIN
+            INSERT INTO products_fts (products_fts, rowid, product_code, description, brand)
+            VALUES ('delete', old.id, old.product_code, old.description, old.brand);
+            INSERT INTO products_fts (rowid, product_code, description, brand)
+            VALUES (new.id, new.product_code, new.description, new.brand);
+        END
+    """)
+    # Index the products that already exist
+    conn.execute("INSERT INTO products_fts (products_fts) VALUES ('rebuild')")
+
+
+# 4. Materialized "most quoted brands" counters for the dashboard.
+#    One row per brand, kept up to date by triggers on quote_items, so the
+#    Top 10 panel reads a handful of rows instead of grouping every quote item.
+#    Each item stores the brand it was counted under (the product's brand when
+#    it was quoted; filled by the insert trigger if the writer leaves it NULL),
+#    so the delete trigger decrements that same brand after a brand change.
+BRAND_QUOTE_STATS = (
+    """
+    CREATE TABLE IF NOT EXISTS brand_quote_stats (
+        brand TEXT PRIMARY KEY,
+        item_count INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_brand_quote_stats_count ON brand_quote_stats(item_count)",
+    "ALTER TABLE quote_items ADD COLUMN brand TEXT",
+    """
+    CREATE TRIGGER IF NOT EXISTS quote_items_brand_stats_ai AFTER INSERT ON quote_items BEGIN
+        UPDATE quote_items SET brand = (
+            SELECT COALESCE(NULLIF(p.brand, ''), 'Sin Marca') FROM products p WHERE p.id = new.product_id
+        ) WHERE id = new.id AND brand IS NULL;
+        INSERT INTO brand_quote_stats (brand, item_count)
+        SELECT brand, 1 FROM quote_items WHERE id = new.id AND brand IS NOT NULL
+        ON CONFLICT(brand) DO UPDATE SET item_count = item_count + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS quote_items_brand_stats_ad AFTER DELETE ON quote_items WHEN old.brand IS NOT NULL BEGIN
+        UPDATE brand_quote_stats SET item_count = item_count - 1 WHERE brand = old.brand;
+    END
+    """,
+    # Backfill from the quotes that already exist
+    """
+    UPDATE quote_items SET brand = (
+        SELECT COALESCE(NULLIF(p.brand, ''), 'Sin Marca') FROM products p WHERE p.id = quote_items.product_id
+    )
+    """,
+    """
+    INSERT OR REPLACE INTO brand_quote_stats (brand, item_count)
+    SELECT brand, count(*) FROM quote_items WHERE brand IS NOT NULL GROUP BY brand
+    """,
+)
+
+# 5. Delta imports compare this hash (see database.product_fingerprint) instead of
+#    every column. It is filled by the write helpers in database.py; rows left
+#    with NULL (older rows, external writers) are backfilled by init_db(), which
+#    the partial index keeps cheap.
+PRODUCT_FINGERPRINTS = (
+    "ALTER TABLE products ADD COLUMN fingerprint TEXT",
+    "CREATE INDEX IF NOT EXISTS idx_products_fingerprint_missing ON products(id) WHERE fingerprint IS NULL",
+)
+
+# 6. Server-rendered PDFs (utils/quote_pdf.py) are recorded on the quote they were
+#    generated for; the saved-quote snapshots get the same column as `quotes`.
+HISTORY_PDF_PATH = (
+    "ALTER TABLE cotizaciones_historico ADD COLUMN pdf_path TEXT",
+)
+
+# 7. Dashboard totals: product/quote counts and the quoted total in one row,
+#    kept up to date by triggers on products and quotes (like brand_quote_stats),
+#    so get_dashboard_summary() reads a row instead of scanning both tables.
+DASHBOARD_TOTALS = (
+    """
+    CREATE TABLE IF NOT EXISTS dashboard_totals (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        inventory_count INTEGER NOT NULL DEFAULT 0,
+        quotes_count INTEGER NOT NULL DEFAULT 0,
+        total_lps REAL NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_totals_ai AFTER INSERT ON products BEGIN
+        UPDATE dashboard_totals SET inventory_count = inventory_count + 1 WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_totals_ad AFTER DELETE ON products BEGIN
+        UPDATE dashboard_totals SET inventory_count = inventory_count - 1 WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS quotes_totals_ai AFTER INSERT ON quotes BEGIN
+        UPDATE dashboard_totals SET quotes_count = quotes_count + 1,
+            total_lps = total_lps + COALESCE(new.total_amount_lps, 0) WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS quotes_totals_ad AFTER DELETE ON quotes BEGIN
+        UPDATE dashboard_totals SET quotes_count = quotes_count - 1,
+            total_lps = total_lps - COALESCE(old.total_amount_lps, 0) WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS quotes_totals_au AFTER UPDATE OF total_amount_lps ON quotes BEGIN
+        UPDATE dashboard_totals SET
+            total_lps = total_lps - COALESCE(old.total_amount_lps, 0) + COALESCE(new.total_amount_lps, 0) WHERE id = 1;
+    END
+    """,
+    # Backfill from the rows that already exist
+    """
+    INSERT OR REPLACE INTO dashboard_totals (id, inventory_count, quotes_count, total_lps)
+    SELECT 1, (SELECT count(*) FROM products), (SELECT count(*) FROM quotes),
+           (SELECT COALESCE(SUM(total_amount_lps), 0) FROM quotes)
+    """,
+)
+
+MIGRATIONS = [
+    (1, "baseline schema", BASELINE),
+    (2, "secondary indexes", SECONDARY_INDEXES),
+    (3, "products full-text index", (create_products_fts,)),
+    (4, "brand quote stats", BRAND_QUOTE_STATS),
+    (5, "product fingerprints", PRODUCT_FINGERPRINTS),
+    (6, "quote history pdf path", HISTORY_PDF_PATH),
+    (7, "dashboard totals", DASHBOARD_TOTALS),
+]
+
+
+def get_schema_version(conn):
+    """Returns the highest applied migration version (0 for a new database)."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+
+
+def run_migrations(conn, migrations=None):
+    """Applies pending migrations in order. Returns the list of versions applied."""
+    migrations = MIGRATIONS if migrations is None else migrations
+    current = get_schema_version(conn)
+    if conn.in_transaction:
+        conn.commit()
+
+    applied = []
+    for version, name, steps in sorted(migrations, key=lambda m: m[0]):
+        if version <= current:
+            continue
+        try:
+            # IMMEDIATE takes the write lock up front; re-check in case another
+            # process applied this version while we were waiting for it.
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("SELECT 1 FROM schema_version WHERE version = ?", (version,)).fetchone():
+                conn.commit()
+                continue
+            for step in steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(step)
+            conn.execute("INSERT INTO schema_version (version, name) VALUES (?, ?)", (version, name))
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            print(f"Migration {version} ({name}) failed.")
+            raise
+        applied.append(version)
+    return applied
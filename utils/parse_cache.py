@@ -0,0 +1,167 @@
+"""
+On-disk cache of parsed supplier files.
+
+Entries are keyed by the SHA-256 of the uploaded bytes plus the parser
+version, so a Streamlit rerun (or a re-upload of the same catalogue) costs a
+hash instead of a full parse, and changing the parsing heuristics (bumping
+parsers.PARSER_VERSION) never serves stale results.
+
+Entries are written as Parquet when pyarrow is installed, gzip'd JSON lines
+otherwise, one batch at a time so caching never needs the whole product list
+in memory. The least recently used entries are evicted beyond MAX_ENTRIES /
+MAX_BYTES.
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+from itertools import chain, islice
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: fall back to JSON lines
+    pa = pq = None
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".parse_cache")
+MAX_ENTRIES = 32
+MAX_BYTES = 512 * 1024 * 1024
+EXTENSION = ".parquet" if pq else ".jsonl.gz"
+
+_lock = threading.Lock()
+stats = {"hits": 0, "misses": 0}
+
+def cache_key(data, version):
+    """Key for a file's bytes parsed by a given parser version."""
+    return f"{hashlib.sha256(data).hexdigest()}-{version}"
+
+def _path(key):
+    return os.path.join(CACHE_DIR, key + EXTENSION)
+
+def _rebatch(rows, size):
+    it = iter(rows)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+def _read(path):
+    if pq:
+        for record_batch in pq.ParquetFile(path).iter_batches():
+            yield from record_batch.to_pylist()
+    else:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                yield from json.loads(line)
+
+def _write_through(key, batches):
+    """Yields `batches` unchanged while writing them to the cache; the entry is
+    only published if the producer runs to completion (an empty parse is
+    published as an empty entry)."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    final = _path(key)
+    tmp = f"{final}.{os.getpid()}.{threading.get_ident()}.tmp"
+    writer = None
+    completed = False
+    try:
+        if pq:
+            schema = None
+            for batch in batches:
+                table = pa.Table.from_pylist(batch, schema=schema)
+                if writer is None:
+                    schema = table.schema
+                    writer = pq.ParquetWriter(tmp, schema)
+                writer.write_table(table)
+                yield batch
+            if writer is None:
+                pq.write_table(pa.table({}), tmp)
+        else:
+            writer = gzip.open(tmp, "wt", encoding="utf-8")
+            for batch in batches:
+                writer.write(json.dumps(batch) + "\n")
+                yield batch
+        completed = True
+    finally:
+        if writer is not None:
+            writer.close()
+        if completed:
+            os.replace(tmp, final)
+            evict()
+        elif os.path.exists(tmp):
+            # Consumer stopped early or parsing failed
+            os.remove(tmp)
+
+def _lookup(key):
+    """Path of the entry for `key` if there is one (touched, as it is about to be used)."""
+    path = _path(key)
+    with _lock:
+        hit = os.path.exists(path)
+        stats["hits" if hit else "misses"] += 1
+    if not hit:
+        return None
+    try:
+        os.utime(path)  # LRU: mtime is the last use
+    except OSError:
+        pass
+    return path
+
+def cached_batches(key, produce, batch_size):
+    """
+    Batches of products for `key`: read back from disk on a hit, otherwise
+    produced by `produce()` (a callable returning an iterable of batches) and
+    cached on the way through.
+    """
+    path = _lookup(key)
+    if path:
+        return _rebatch(_read(path), batch_size)
+    return _rebatch(chain.from_iterable(_write_through(key, produce())), batch_size)
+
+def cached_head(key, produce, size):
+    """
+    The first `size` products for `key`. On a miss the whole parse still runs
+    and is published, so rerunning a preview (and the import that follows it)
+    reads the cache instead of parsing the file again.
+    """
+    path = _lookup(key)
+    rows = _read(path) if path else chain.from_iterable(_write_through(key, produce()))
+    head = list(islice(rows, size))
+    if not path:
+        for _ in rows:  # finish the parse so the entry is published
+            pass
+    return head
+
+def evict_lru(directory, extension, max_entries, max_bytes):
+    """
+    Removes the least recently used (oldest mtime) `extension` files of
+    `directory` beyond `max_entries` files / `max_bytes` in total. Also used by
+    the quote PDF cache (utils/quote_pdf.py). Returns the removed paths.
+    """
+    try:
+        entries = [e for e in os.scandir(directory) if e.name.endswith(extension)]
+    except FileNotFoundError:
+        return []
+    entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+    total = 0
+    removed = []
+    for i, entry in enumerate(entries):
+        total += entry.stat().st_size
+        if i >= max_entries or total > max_bytes:
+            try:
+                os.remove(entry.path)
+                removed.append(entry.path)
+            except OSError:
+                pass
+    return removed
+
+def evict(max_entries=None, max_bytes=None):
+    """Removes the least recently used entries beyond the count/size limits."""
+    max_entries = MAX_ENTRIES if max_entries is None else max_entries
+    max_bytes = MAX_BYTES if max_bytes is None else max_bytes
+    with _lock:
+        evict_lru(CACHE_DIR, EXTENSION, max_entries, max_bytes)
+
+def clear():
+    """Deletes every cached entry."""
+    evict(max_entries=0)
@@ -1,17 +1,163 @@
 import fitz  # pymupdf
-import pandas as pd
-import re
-
-def clean_price(price_str):
-    """Cleans price string to float."""
-    if not price_str:
-        return 0.0
-    # Remove currency symbols and commas
-    clean = re.sub(r'[^\d.]', '', str(price_str).replace(',', ''))
-    try:
-        return float(clean)
-    except ValueError:
-        return 0.0
+import io
+import multiprocessing
+import os
+import unicodedata
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from collections import defaultdict
+from functools import partial
+from itertools import islice
+from operator import itemgetter
+from xml.etree.ElementTree import ParseError
+from openpyxl import load_workbook
+from utils import parse_cache, xlsx_reader
+from utils.tokens import classify_row, clean_price
+
+# Bump whenever parsing output changes: cached parse results are keyed by it
+PARSER_VERSION = "5"
+
+# What reading a damaged or unexpected upload raises (fitz.FileDataError is a RuntimeError)
+READ_ERRORS = (zipfile.BadZipFile, KeyError, ParseError, ValueError, RuntimeError)
+
+# Parallel mode: documents shorter than this are parsed serially (pool start-up costs more)
+PARALLEL_MIN_PAGES = 150
+
+# Line grouping (see _group_lines). Sizes are relative to the median word height
+# so they work the same for 7pt price lists and 12pt scans.
+LINE_BIN_RATIO = 0.34       # height of a y-histogram bin
+LINE_GAP_RATIO = 0.5        # vertical gap that still belongs to the same line
+LINE_MAX_HEIGHT_RATIO = 1.5 # a merged run taller than this holds several rows
+BLOCK_LINE_MIN_WORDS = 3    # avg words per (block_no, line_no) for it to be a table row
+LINE_OVERLAP_RATIO = 0.25   # y overlap two (block_no, line_no) lines may have and still be separate rows
+
+# Excel: rows searched for the header (titles/logos often sit above the table)
+HEADER_SCAN_ROWS = 25
+
+_x0 = itemgetter(0)
+_bottom = itemgetter(3)
+
+def _word_height(words):
+    """Median word height, from a fixed-size sample (constant time)."""
+    step = max(1, len(words) // 101)
+    heights = sorted(w[3] - w[1] for w in words[::step])
+    return max(heights[len(heights) // 2], 1.0)
+
+def _lines_from_blocks(words, height):
+    """
+    Uses PyMuPDF's own (block_no, line_no) as lines when they are reliable:
+    each one holds a whole table row (not a single cell) and is vertically tight.
+    A line counts as a whole row if no other line shares its y band, or if it
+    already reads as a product (code ... price) on its own.
+    Returns None otherwise.
+    """
+    if len(words) < BLOCK_LINE_MIN_WORDS * len({(w[5], w[6]) for w in words}):
+        return None  # one line per cell: rows have to be rebuilt from coordinates
+    groups = {}
+    for w in words:
+        groups.setdefault((w[5], w[6]), []).append(w)
+    rows = []
+    for group in groups.values():
+        bottoms = [w[3] for w in group]
+        if max(bottoms) - min(bottoms) > height / 2:
+            return None
+        group.sort(key=_x0)
+        rows.append((min(w[1] for w in group), max(bottoms), group))
+    rows.sort(key=itemgetter(0))  # one entry per line, not per word
+
+    # Sweep the y bands in order: a line overlaps an earlier one if it starts
+    # above the lowest bottom seen so far (the line holding it is flagged too).
+    tolerance = height * LINE_OVERLAP_RATIO
+    overlapped = [False] * len(rows)
+    lowest, lowest_i = None, -1
+    for i, (top, bottom, _) in enumerate(rows):
+        if lowest is not None and top < lowest - tolerance:
+            overlapped[i] = overlapped[lowest_i] = True
+        if lowest is None or bottom > lowest:
+            lowest, lowest_i = bottom, i
+    for (_, _, group), shared in zip(rows, overlapped):
+        if shared and classify_row([w[4] for w in group]) is None:
+            return None  # a cell sharing its row with other cells
+    return [group for _, _, group in rows]
+
+def _split_run(words, height):
+    """Splits an over-tall run of bins at the vertical gaps between its words."""
+    words.sort(key=_bottom)
+    rows = [[words[0]]]
+    for w in words[1:]:
+        if w[3] - rows[-1][-1][3] > height * LINE_GAP_RATIO:
+            rows.append([])
+        rows[-1].append(w)
+    return rows
+
+def _group_lines(words):
+    """
+    Groups the words of a page into lines, in reading order.
+
+    Words are bucketed by their bottom edge into a y-histogram (O(n)); runs of
+    adjacent (or nearly adjacent) non-empty bins are merged into one line,
+    which absorbs jitter and the slope of skewed scans, and only the words
+    inside each line are sorted by x. If PyMuPDF's block_no/line_no already describe whole rows, those
+    are used directly.
+    """
+    height = _word_height(words)
+    rows = _lines_from_blocks(words, height)
+    if rows is not None:
+        return rows
+
+    bin_size = height * LINE_BIN_RATIO
+    bins = defaultdict(list)
+    for w in words:
+        bins[int(w[3] // bin_size)].append(w)
+
+    # Merge runs of adjacent bins (the number of bins is bounded by the page height).
+    # Small gaps are bridged: on a skewed row the far columns sit a few bins lower.
+    max_gap = height * LINE_GAP_RATIO
+    max_height = height * LINE_MAX_HEIGHT_RATIO
+    rows = []
+    run, run_top, run_bottom = None, 0.0, None
+    for b in sorted(bins):
+        members = bins[b]
+        top = min(members, key=_bottom)[3]
+        if run_bottom is None or top - run_bottom > max_gap:
+            if run:
+                rows.extend(_split_run(run, height) if run_bottom - run_top > max_height else [run])
+            run, run_top = [], top
+        run.extend(members)
+        run_bottom = max(members, key=_bottom)[3]
+    if run:
+        rows.extend(_split_run(run, height) if run_bottom - run_top > max_height else [run])
+
+    for row in rows:
+        row.sort(key=_x0)
+    return rows
+
+def _parse_row(tokens):
+    """Turns the tokens of one line into a product dict, or None if it isn't a product line."""
+    row = classify_row(tokens)
+    if row is None:
+        return None
+    code, description, price_str = row
+    return {
+        "product_code": code,
+        "description": description,
+        "cost_usd": clean_price(price_str),
+        "category": "General",
+        "brand": "Unknown"
+    }
+
+def _parse_page(page):
+    """Products found on one PyMuPDF page."""
+    # get_text("words") returns: (x0, y0, x1, y1, "word", block_no, line_no, word_no)
+    words = page.get_text("words")
+    if not words:
+        return []
+    products = []
+    for row in _group_lines(words):
+        product = _parse_row([w[4] for w in row])
+        if product:
+            products.append(product)
+    return products
 
 def parse_pdf_inventory(file_stream):
     """
@@ -27,190 +173,264 @@ def parse_pdf_inventory(file_stream):
     4. Handles extra columns after Price by ignoring them.
     5. Filters headers and garbage lines.
     """
-    doc = fitz.open(stream=file_stream.read(), filetype="pdf")
+    return list(iter_pdf_inventory(file_stream))
+
+# Each pool worker opens the document once (see _init_pdf_worker) and then
+# parses the page ranges it is handed.
+_worker_doc = None
+
+def _init_pdf_worker(data):
+    global _worker_doc
+    _worker_doc = fitz.open(stream=data, filetype="pdf")
+
+def _parse_page_range(page_range):
+    start, stop = page_range
     products = []
-    
-    for page in doc:
-        # get_text("words") returns: (x0, y0, x1, y1, "word", block_no, line_no, word_no)
-        words = page.get_text("words")
-        if not words:
-            continue
-            
-        # Group words by Line (using y0, with a small tolerance)
-        rows = []
-        current_row = []
-        last_y = -999
-        
-        # Sort by vertical position (y0), then horizontal (x0)
-        # However, words are usually returned in reading order. 
-        # Standard sort just in case:
-        words.sort(key=lambda w: (w[1], w[0]))
-        
-        for w in words:
-            y = w[1]
-            if abs(y - last_y) > 5: # New line threshold (5 pixels)
-                if current_row:
-                    rows.append(current_row)
-                current_row = []
-                last_y = y
-            current_row.append(w)
-        if current_row:
-            rows.append(current_row)
-            
-        # Process items
-        for row in rows:
-            # row is a list of word tuples.
-            # We filter out empty or very short lines
-            if len(row) < 3:
-                continue
-                
-            # Extract text tokens strings from valid words
-            tokens = [w[4] for w in row]
-            
-            # --- HEURISTIC 1: Header Detection ---
-            # If the line contains "CODIGO" and "DESCRIPCION", it's a header.
-            line_str = " ".join(tokens).upper()
-            if "CODIGO" in line_str or "DESCRIPCION" in line_str or "PRECIO" in line_str or "PAGE" in line_str:
-                continue
-                
-            # --- HEURISTIC 2: Structure Detection ---
-            # Pattern: Code [Desc...] Price [Others...]
-            
-            # Code is the first token.
-            code = tokens[0]
-            
-            # Price is a number. We look for the *first* number that appears after index 1.
-            # Why first? Because user said "Code, Desc, Price" are the first 3 columns.
-            # If there are other price columns later, we want the first one (USD).
-            
-            price_index = -1
-            price_str = ""
-            
-            # Start strict search from index 1.
-            # We want to avoid capturing model numbers (e.g. "15", "S24") as prices.
-            # INVENTORY PRICE ASSUMPTION: Prices usually have decimals (e.g. 10.00, 1,234.50).
-            # Model numbers are usually integers.
-            
-            for i in range(1, len(tokens)):
-                t = tokens[i]
-                t_clean = t.replace('$', '').replace(',', '')
-                
-                # Regex: Must start with digits, have a dot, and end with digits.
-                # Or just be a float larger than 0 if it has a dot.
-                # Not perfect (some prices might be integer "100"), but safer for "iPhone 15".
-                # If User's PDF has "100" without decimals, this might skip it.
-                # Compromise: Look for dot OR ensure it is at the end of the line (if length match).
-                # But we have extra columns. 
-                # Let's enforce the Decimal rule. It's the most robust way to distinguish "15" from "15.00".
-                
-                if re.match(r'^\d+\.\d+$', t_clean):
-                    # It has a dot and numbers. High probability of being a price.
-                    price_index = i
-                    price_str = t
-                    break
-            
-            # Fallback: If no decimal found, but we scanned everything, maybe the price IS an integer?
-            # But we can't distinguish "Samsung S23" (23 is model) from "Price 23".
-            # We'll skip this row or assume strict formatting is required.
-            # BETTER FALLBACK: If we didn't find a decimal-price, try to look for the LAST numeric token 
-            # *before* any obvious non-numeric "Extra Info" begins? Hard to say.
-            # Let's stick to decimal requirement for now as it solves the "Truncated Description" complaint.
-            
-            if price_index != -1 and price_index > 1: # Need at least one word for Desc
-                # Found Code, found Price.
-                # Description is everything in between.
-                
-                desc_tokens = tokens[1:price_index]
-                description = " ".join(desc_tokens)
-                
-                # Validation
-                if len(description) < 2: 
-                    continue # Too short
-                    
-                price_val = clean_price(price_str)
-                
-                products.append({
-                    "product_code": code,
-                    "description": description,
-                    "cost_usd": price_val,
-                    "category": "General",
-                    "brand": "Unknown"
-                })
-            
-            # Fallback: Maybe the price is at the very end (ignoring extra columns logic failure)
-            # If we didn't find a price in the middle, check the last token? 
-            # Risk: Last token might be Lempiras or something else.
-            # Stick to "First numeric after text" logic for now as it matches "Code Desc Price [Other]"
-                
+    for page_no in range(start, stop):
+        products.extend(_parse_page(_worker_doc[page_no]))
     return products
 
+def page_ranges(page_count, chunks):
+    """Splits [0, page_count) into at most `chunks` contiguous (start, stop) ranges."""
+    chunks = max(1, min(chunks, page_count))
+    size, extra = divmod(page_count, chunks)
+    ranges = []
+    start = 0
+    for i in range(chunks):
+        stop = start + size + (1 if i < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+def iter_pdf_inventory(file_stream, workers=1, min_pages=PARALLEL_MIN_PAGES):
+    """
+    Generator version of parse_pdf_inventory(): yields products as each page
+    is parsed, so callers never hold the whole catalogue.
+
+    With workers > 1 (and at least `min_pages` pages) the document is split
+    into contiguous page ranges (a few per worker so a slow range doesn't
+    leave the others idle) parsed in a process pool; products are still
+    yielded in page order.
+    """
+    data = file_stream.read()
+    # Closed however the generator ends (finished, failed or abandoned early)
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        page_count = doc.page_count
+        if workers < 2 or page_count < min_pages:
+            for page in doc:
+                yield from _parse_page(page)
+            return
+
+    # spawn: the app process runs background threads, forking it is not safe
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                             initializer=_init_pdf_worker, initargs=(data,)) as pool:
+        for chunk in pool.map(_parse_page_range, page_ranges(page_count, workers * 4)):
+            yield from chunk
+
+def parse_pdf_inventory_parallel(file_stream, workers=None, min_pages=PARALLEL_MIN_PAGES):
+    """
+    Same output as parse_pdf_inventory(), with the pages parsed in a process pool.
+    Short documents are parsed serially (pool start-up costs more).
+    """
+    return list(iter_pdf_inventory(file_stream, workers or os.cpu_count() or 1, min_pages))
+
+def normalize_str(s):
+    """Lower-cased, stripped, accent-free version of a column header."""
+    if not isinstance(s, str): return str(s)
+    s = s.lower().strip()
+    # Remove accents
+    s = ''.join(c for c in unicodedata.normalize('NFD', s) if unicodedata.category(c) != 'Mn')
+    return s
+
+# Targets we need: 'product_code', 'description', 'cost_usd', 'brand'
+# Candidates for each
+COLUMN_CANDIDATES = {
+    'product_code': ['codigo', 'code', 'sku', 'id', 'item'],
+    'description': ['descripcion', 'description', 'nombre', 'producto', 'desc'],
+    'cost_usd': ['precio', 'price', 'costo', 'cost', 'valor', 'usd'],
+    'brand': ['marca', 'brand', 'fabricante']
+}
+REQUIRED_COLUMNS = ['product_code', 'description', 'cost_usd']
+
+def match_columns(columns):
+    """Maps original column headers -> target field, using COLUMN_CANDIDATES."""
+    # Create a mapping from formatted col -> original col
+    cols_map = {normalize_str(col): col for col in columns}
+    rename_map = {}
+    for target, synonyms in COLUMN_CANDIDATES.items():
+        for syn in synonyms:
+            if syn in cols_map:
+                # Found a match! Map original col -> target
+                rename_map[cols_map[syn]] = target
+                break
+    return rename_map
+
+def find_header(rows, max_rows=None):
+    """
+    Looks for the header among the first `max_rows` (HEADER_SCAN_ROWS) rows:
+    the first one whose cells map every REQUIRED_COLUMNS. Supplier sheets
+    often start with a logo, a title or the date above the table.
+    Returns (row_index, {target field: column index}) or None.
+    """
+    for index, row in enumerate(islice(rows, max_rows or HEADER_SCAN_ROWS)):
+        cells = [c for c in row if c is not None and str(c).strip()]
+        rename_map = match_columns(cells)
+        if all(col in rename_map.values() for col in REQUIRED_COLUMNS):
+            row = list(row)
+            return index, {target: row.index(original) for original, target in rename_map.items()}
+    return None
+
+def _openpyxl_rows(ws):
+    """iter_rows(columns, min_row, max_row) over an openpyxl read-only sheet, like xlsx_reader's."""
+    def iter_rows(columns=None, min_row=1, max_row=None):
+        if columns is None:
+            return ws.iter_rows(min_row=min_row, max_row=max_row, values_only=True)
+        first = min(columns)
+        pick = [c - first for c in columns]
+        rows = ws.iter_rows(min_row=min_row, max_row=max_row, min_col=first + 1, max_col=max(columns) + 1,
+                            values_only=True)
+        return ([row[i] if i < len(row) else None for i in pick] for row in rows)
+    return iter_rows
+
+def _sheet_batches(title, iter_rows, batch_size):
+    found = find_header(iter_rows(max_row=HEADER_SCAN_ROWS))
+    if found is None:
+        print(f"Sheet '{title}': no header with columns {REQUIRED_COLUMNS} in the first {HEADER_SCAN_ROWS} rows, skipped.")
+        return
+    header_index, positions = found
+
+    # Only the mapped columns are read: code, description, cost[, brand]
+    columns = [positions[c] for c in REQUIRED_COLUMNS]
+    has_brand = 'brand' in positions
+    if has_brand:
+        columns.append(positions['brand'])
+
+    batch = []
+    for row in iter_rows(columns=columns, min_row=header_index + 2):
+        code, description = row[0], row[1]
+        code = "" if code is None else str(code).strip()
+        description = "" if description is None else str(description).strip()
+        if not code and not description:
+            continue  # blank line
+        brand = row[3] if has_brand else None
+        batch.append({
+            'product_code': code,
+            'description': description,
+            'cost_usd': clean_price(row[2]),
+            'brand': ("" if brand is None else str(brand).strip()) or 'Unknown',
+        })
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def iter_excel_batches(file_stream, batch_size=2000, sheets=None, engine="xml"):
+    """
+    Streams a supplier workbook as lists of at most `batch_size` products.
+
+    Every sheet (or only those named in `sheets`) is read in two passes: a
+    small read of the first rows finds the header and maps the columns
+    (find_header), then only the mapped columns are read, row by row.
+    Sheets without a recognisable header are skipped.
+
+    engine="xml" reads the sheet XML directly (utils/xlsx_reader.py),
+    converting only the mapped cells; "openpyxl" uses its read-only mode,
+    which is also the fallback for workbooks the XML reader can't open.
+    """
+    if engine == "xml":
+        try:
+            wb = xlsx_reader.Workbook(file_stream)
+        except KeyError as e:
+            print(f"Excel: {e}, reading with openpyxl.")
+            file_stream.seek(0)
+        else:
+            try:
+                for title, path in wb.sheets:
+                    if sheets is None or title in sheets:
+                        yield from _sheet_batches(title, partial(wb.iter_rows, path), batch_size)
+            finally:
+                wb.close()
+            return
+
+    wb = load_workbook(file_stream, read_only=True, data_only=True)
+    try:
+        for ws in wb.worksheets:
+            if sheets is None or ws.title in sheets:
+                yield from _sheet_batches(ws.title, _openpyxl_rows(ws), batch_size)
+    finally:
+        wb.close()
+
+def iter_excel_inventory(file_stream, sheets=None):
+    """Generator version of parse_excel_inventory(): one product dict at a time."""
+    for batch in iter_excel_batches(file_stream, sheets=sheets):
+        yield from batch
+
 def parse_excel_inventory(file_stream):
     """
-    Parses an Excel file with robust column matching.
+    Parses an Excel file with robust column matching (see iter_excel_batches).
     """
     try:
-        df = pd.read_excel(file_stream)
-        
-        # 1. Normalize strict column map
-        # We'll normalize the dataframe columns to: lower, stripped, no-accents
-        
-        def normalize_str(s):
-            import unicodedata
-            if not isinstance(s, str): return str(s)
-            s = s.lower().strip()
-            # Remove accents
-            s = ''.join(c for c in unicodedata.normalize('NFD', s) if unicodedata.category(c) != 'Mn')
-            return s
-            
-        # Create a mapping from formatted col -> original col
-        df_cols_map = {normalize_str(col): col for col in df.columns}
-        
-        # Targets we need: 'product_code', 'description', 'cost_usd', 'brand'
-        # Candidates for each
-        candidates = {
-            'product_code': ['codigo', 'code', 'sku', 'id', 'item'],
-            'description': ['descripcion', 'description', 'nombre', 'producto', 'desc'],
-            'cost_usd': ['precio', 'price', 'costo', 'cost', 'valor', 'usd'],
-            'brand': ['marca', 'brand', 'fabricante']
-        }
-        
-        final_rename_map = {}
-        
-        for target, synonyms in candidates.items():
-            for syn in synonyms:
-                if syn in df_cols_map:
-                    # Found a match! Map original col -> target
-                    original_col = df_cols_map[syn]
-                    final_rename_map[original_col] = target
-                    break
-        
-        # Apply rename
-        if not final_rename_map:
-            print("No matching columns found after normalization.")
-            return []
-            
-        df = df.rename(columns=final_rename_map)
-        
-        # Check required
-        required_cols = ['product_code', 'description', 'cost_usd']
-        missing = [col for col in required_cols if col not in df.columns]
-        
-        if missing:
-            print(f"Missing required columns: {missing}. Found: {df.columns.tolist()}")
-            return []
-            
-        # Optional: Clean data
-        df['cost_usd'] = df['cost_usd'].apply(clean_price)
-        df['product_code'] = df['product_code'].astype(str).str.strip()
-        df['description'] = df['description'].astype(str).str.strip()
-        
-        # Handle Brand if missing
-        if 'brand' not in df.columns:
-            df['brand'] = 'Unknown'
-        else:
-            df['brand'] = df['brand'].fillna('Unknown').astype(str).str.strip()
-            
-        return df.to_dict('records')
+        return list(iter_excel_inventory(file_stream))
     except Exception as e:
         print(f"Error parsing Excel: {e}")
         return []
+
+def batched(items, size):
+    """Groups any iterable of products into lists of at most `size`."""
+    it = iter(items)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+def _inventory_source(uploaded_file, batch_size, workers):
+    """(kind, bytes, produce) for an uploaded PDF/Excel file, or None for other types."""
+    name = uploaded_file.name.lower()
+    if name.endswith('.pdf'):
+        kind = 'pdf'
+    elif name.endswith('.xlsx'):
+        kind = 'xlsx'
+    else:
+        return None
+    data = uploaded_file.getvalue() if hasattr(uploaded_file, 'getvalue') else uploaded_file.read()
+
+    def produce():
+        if kind == 'xlsx':
+            return iter_excel_batches(io.BytesIO(data), batch_size)
+        return batched(iter_pdf_inventory(io.BytesIO(data), workers or os.cpu_count() or 1), batch_size)
+
+    return kind, data, produce
+
+def iter_inventory_batches(uploaded_file, batch_size=2000, workers=None, use_cache=True):
+    """
+    Streams an uploaded PDF/Excel price list as lists of `batch_size` products.
+    Nothing beyond the current batch is kept, so the caller can write each
+    batch while the rest of the file is still being parsed.
+
+    Results are cached on disk by content hash (see utils/parse_cache.py):
+    parsing the same bytes again only costs the hash.
+    """
+    source = _inventory_source(uploaded_file, batch_size, workers)
+    if source is None:
+        return iter(())
+    kind, data, produce = source
+    if not use_cache:
+        return produce()
+    key = parse_cache.cache_key(data, f"{kind}-{PARSER_VERSION}")
+    return parse_cache.cached_batches(key, produce, batch_size)
+
+def preview_inventory(uploaded_file, rows, workers=None, batch_size=2000):
+    """
+    The first `rows` products of an uploaded PDF/Excel price list. The first
+    preview of a file parses (and caches) all of it, so Streamlit reruns and
+    the import itself are cache hits.
+    """
+    source = _inventory_source(uploaded_file, batch_size, workers)
+    if source is None:
+        return []
+    kind, data, produce = source
+    key = parse_cache.cache_key(data, f"{kind}-{PARSER_VERSION}")
+    return parse_cache.cached_head(key, produce, rows)
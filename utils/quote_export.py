@@ -0,0 +1,215 @@
+"""
+Batch export of saved quotes (cotizaciones_historico) to PDF.
+
+Quotes are rendered by utils.quote_pdf in a process pool with at most
+`max_pending` quotes in flight, so memory stays flat however many quotes are
+exported, and the ZIP is written entry by entry as the PDFs come back: the
+archive is never built in memory. Quotes whose PDF is already in the
+quote_pdf cache cost a file read.
+
+Workers only render bytes; the cache writes, LRU eviction and the database
+updates it triggers all happen in the calling process. The pool is started
+once per process and reused; exports of fewer than PARALLEL_MIN_QUOTES quotes
+are rendered serially (feeding a pool costs more than it saves there).
+
+    python -m utils.quote_export cotizaciones.zip [--workers N] [--limit N]
+    python -m utils.quote_export carpeta/ [--workers N]
+"""
+import argparse
+import multiprocessing
+import os
+import threading
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import database
+from utils import quote_pdf
+
+PARALLEL_MIN_QUOTES = 50
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def _render(data):
+    return quote_pdf.render_quote_pdf(data)
+
+def _get_pool(workers):
+    """The process pool for `workers` processes, started on first use and then reused."""
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            # spawn: the app process runs background threads, forking it is not safe
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pools[workers] = pool
+        return pool
+
+def shutdown_pools():
+    """Stops the render pools (used by scripts and checks)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown()
+
+def quote_filename(row):
+    return f"Cotizacion_RD-{row['id']:04d}.pdf"
+
+def _jobs(rows, report):
+    header_info = database.get_config('quote_header')
+    footer_info = database.get_config('quote_footer')
+    for row in rows:
+        try:
+            yield row, quote_pdf.history_quote_data(row, header_info, footer_info)
+        except (ValueError, TypeError) as e:
+            print(f"Error exporting quote {row.get('id')}: {e}")
+            report["errors"] = report.get("errors", 0) + 1
+
+def iter_quote_pdfs(rows, workers=None, max_pending=None, report=None):
+    """
+    Yields (row, pdf_bytes) for cotizaciones_historico rows, in input order.
+    Cached PDFs are read back; the others are rendered (in the shared process
+    pool when workers > 1 and there are at least PARALLEL_MIN_QUOTES rows,
+    submitting a new quote only when fewer than `max_pending`, default 2 per
+    worker, are in flight), cached, and the cache is evicted once at the end.
+    """
+    report = {} if report is None else report
+    jobs = _jobs(rows, report)
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and hasattr(rows, "__len__") and len(rows) < PARALLEL_MIN_QUOTES:
+        workers = 1
+    stored = False
+    try:
+        if workers < 2:
+            for row, data in jobs:
+                pdf = quote_pdf.read_cached_pdf(data)
+                if pdf is None:
+                    pdf = _render(data)
+                    quote_pdf.store_pdf(data, pdf, evict_now=False)
+                    stored = True
+                yield row, pdf
+            return
+
+        max_pending = max_pending or workers * 2
+        pool = _get_pool(workers)
+        pending = deque()
+
+        def finish():
+            nonlocal stored
+            row, data, result = pending.popleft()
+            if isinstance(result, bytes):
+                return row, result
+            pdf = result.result()
+            quote_pdf.store_pdf(data, pdf, evict_now=False)
+            stored = True
+            return row, pdf
+
+        for row, data in jobs:
+            pdf = quote_pdf.read_cached_pdf(data)
+            pending.append((row, data, pdf if pdf is not None else pool.submit(_render, data)))
+            if len(pending) >= max_pending:
+                yield finish()
+        while pending:
+            yield finish()
+    finally:
+        if stored:
+            quote_pdf.evict()
+
+class _ChunkSink:
+    """Write-only file for ZipFile: collects the archive bytes until drained."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+def _finish_report(report, count, size, start):
+    elapsed = time.perf_counter() - start
+    report.update(quotes=count, bytes=size, seconds=elapsed,
+                  quotes_per_sec=count / elapsed if elapsed else 0.0)
+    report.setdefault("errors", 0)
+    return report
+
+def iter_quotes_zip(rows=None, workers=None, max_pending=None, report=None):
+    """
+    Generator of the bytes of a ZIP with one PDF per quote, yielded as each
+    entry is written (send them straight to a file or HTTP response).
+    `rows` defaults to every saved quote; `report` (a dict) is filled with
+    quotes, bytes, seconds, quotes_per_sec and errors when the archive ends.
+    """
+    rows = database.get_all_quotes_history() if rows is None else rows
+    report = {} if report is None else report
+    start, count, size = time.perf_counter(), 0, 0
+    sink = _ChunkSink()
+    # PDFs are already deflated, storing them is as small and much faster
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_STORED) as archive:
+        for row, pdf in iter_quote_pdfs(rows, workers, max_pending, report):
+            archive.writestr(quote_filename(row), pdf)
+            count += 1
+            chunk = sink.drain()
+            size += len(chunk)
+            yield chunk
+    chunk = sink.drain()  # central directory
+    size += len(chunk)
+    _finish_report(report, count, size, start)
+    yield chunk
+
+def export_quotes_zip(path, rows=None, workers=None, max_pending=None):
+    """Writes the ZIP of iter_quotes_zip() to `path`. Returns the report."""
+    report = {}
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            for chunk in iter_quotes_zip(rows, workers, max_pending, report):
+                f.write(chunk)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return report
+
+def export_quotes_pdfs(directory, rows=None, workers=None, max_pending=None):
+    """Writes one PDF per quote into `directory`. Returns the report."""
+    rows = database.get_all_quotes_history() if rows is None else rows
+    os.makedirs(directory, exist_ok=True)
+    report = {}
+    start, count, size = time.perf_counter(), 0, 0
+    for row, pdf in iter_quote_pdfs(rows, workers, max_pending, report):
+        with open(os.path.join(directory, quote_filename(row)), "wb") as f:
+            f.write(pdf)
+        count += 1
+        size += len(pdf)
+    return _finish_report(report, count, size, start)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporta las cotizaciones guardadas a PDF.")
+    parser.add_argument("output", help="archivo .zip, o carpeta para un PDF por cotización")
+    parser.add_argument("--workers", type=int, default=None, help="procesos de render (por defecto: CPUs)")
+    parser.add_argument("--limit", type=int, default=None, help="solo las N cotizaciones más recientes")
+    args = parser.parse_args(argv)
+
+    rows = database.get_all_quotes_history()
+    if args.limit is not None:
+        rows = rows[:args.limit]
+    if args.output.lower().endswith(".zip"):
+        report = export_quotes_zip(args.output, rows, args.workers)
+    else:
+        report = export_quotes_pdfs(args.output, rows, args.workers)
+    shutdown_pools()
+    print(f"{report['quotes']} cotizaciones en {report['seconds']:.1f} s "
+          f"({report['quotes_per_sec']:.1f} cotizaciones/s, {report['bytes'] / 1e6:.1f} MB)"
+          + (f", {report['errors']} con errores" if report['errors'] else ""))
+
+if __name__ == "__main__":
+    main()
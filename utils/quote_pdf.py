@@ -0,0 +1,342 @@
+"""
+Server-side quote PDFs.
+
+Draws the same document as the quote template (utils/templates/quote.html.j2)
+directly with PyMuPDF, so a PDF no longer needs a browser and window.print().
+Files are cached under PDF_DIR, named by a hash of the quote data (client,
+items, meta and the header/footer config), so downloading a quote again is a
+file read; changing the layout bumps LAYOUT_VERSION and never serves stale
+files. The least recently used PDFs are evicted beyond MAX_ENTRIES / MAX_BYTES;
+quotes that recorded an evicted file get their pdf_path cleared.
+"""
+import hashlib
+import json
+import os
+import threading
+
+import fitz  # pymupdf
+
+import database
+from utils.parse_cache import evict_lru
+from utils.renderer import quote_totals
+
+PDF_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".quote_pdfs")
+LAYOUT_VERSION = "1"
+MAX_ENTRIES = 2000
+MAX_BYTES = 256 * 1024 * 1024
+
+PAGE = fitz.paper_rect("a4")
+MARGIN = 40
+ROW_PADDING = 6
+FONT = "helv"
+BOLD = "hebo"
+ITALIC = "heit"
+
+DARK = (0.059, 0.090, 0.165)     # #0f172a
+BLUE = (0.0, 0.4, 1.0)           # #0066ff
+MUTED = (0.392, 0.455, 0.545)    # #64748b
+CAPTION = (0.580, 0.639, 0.722)  # #94a3b8
+LINE = (0.886, 0.910, 0.941)     # #e2e8f0
+WHITE = (1, 1, 1)
+
+# Items table: (title, width, align); the description takes what is left
+COLUMNS = (("DESCRIPCIÓN / CÓDIGO", None, "left"), ("CANT.", 50, "center"),
+           ("P. UNITARIO", 95, "right"), ("TOTAL", 95, "right"))
+
+_lock = threading.Lock()
+stats = {"hits": 0, "misses": 0}
+
+def pdf_key(data):
+    """Cache key of a quote: everything that is printed, plus the layout version."""
+    payload = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(f"{LAYOUT_VERSION}\x1f{payload}".encode("utf-8")).hexdigest()
+
+def pdf_path(data):
+    return os.path.join(PDF_DIR, pdf_key(data) + ".pdf")
+
+def history_quote_data(q, header_info="", footer_info=""):
+    """Quote data (as for renderer.get_quote_html) of a cotizaciones_historico row."""
+    client_details = json.loads(q['client_details'] or "{}")
+    return {
+        "client": {
+            "name": q['client_name'],
+            "rtn": client_details.get('rtn', ''),
+            "phone": client_details.get('phone', ''),
+            "address": client_details.get('address', '')
+        },
+        "items": json.loads(q['products_json'] or "[]"),
+        "meta": {
+            "date": str(q['created_at']).split()[0],
+            "valid_until": "Válida por 15 días",
+            "quote_number": f"RD-{q['id']:04d}"
+        },
+        "config": {"header": header_info, "footer": footer_info}
+    }
+
+def _money(value):
+    return f"L. {float(value or 0):,.2f}"
+
+def _wrap(text, width, fontname=FONT, size=9):
+    """Splits `text` into lines that fit `width` points (keeps explicit newlines)."""
+    lines = []
+    for paragraph in str(text or "").splitlines() or [""]:
+        line = ""
+        for word in paragraph.split():
+            candidate = f"{line} {word}" if line else word
+            if line and fitz.get_text_length(candidate, fontname=fontname, fontsize=size) > width:
+                lines.append(line)
+                line = word
+            else:
+                line = candidate
+        lines.append(line)
+    return lines
+
+class _Writer:
+    """
+    Cursor over the pages of a document being drawn top to bottom. Everything
+    on a page goes through one Shape (text is laid over the drawings), which
+    is committed once per page instead of once per call.
+    """
+
+    def __init__(self, doc):
+        self.doc = doc
+        self.shape = None
+        self.y = 0
+        self.new_page()
+
+    @property
+    def bottom(self):
+        return PAGE.height - MARGIN
+
+    def new_page(self):
+        self.finish()
+        self.shape = self.doc.new_page(width=PAGE.width, height=PAGE.height).new_shape()
+        self.y = MARGIN
+
+    def finish(self):
+        if self.shape is not None:
+            self.shape.commit()
+            self.shape = None
+
+    def text(self, x, y, text, size=9, font=FONT, color=DARK, align="left", width=0):
+        if align != "left":
+            length = fitz.get_text_length(text, fontname=font, fontsize=size)
+            x += width - length if align == "right" else (width - length) / 2
+        self.shape.insert_text((x, y), text, fontname=font, fontsize=size, color=color)
+
+    def rect(self, x0, y0, x1, y1, fill):
+        self.shape.draw_rect(fitz.Rect(x0, y0, x1, y1))
+        self.shape.finish(color=None, fill=fill)
+
+    def line(self, y, width=1, color=DARK, x0=MARGIN, x1=None):
+        x1 = PAGE.width - MARGIN if x1 is None else x1
+        self.shape.draw_line((x0, y), (x1, y))
+        self.shape.finish(color=color, width=width)
+
+def _draw_header(w, data):
+    config, meta = data.get("config") or {}, data.get("meta") or {}
+    right = PAGE.width - MARGIN
+    w.text(MARGIN, w.y + 26, "REDMIL", size=28, font=BOLD)
+    y = w.y + 46
+    for line in _wrap((config.get("header") or "Configura el encabezado en Admin").upper(), 300, size=8):
+        w.text(MARGIN, y, line, size=8, color=MUTED)
+        y += 11
+
+    badge = "COTIZACIÓN"
+    badge_w = fitz.get_text_length(badge, fontname=BOLD, fontsize=10) + 24
+    w.rect(right - badge_w, w.y, right, w.y + 20, DARK)
+    w.text(right - badge_w, w.y + 14, badge, size=10, font=BOLD, color=WHITE, align="center", width=badge_w)
+    w.text(0, w.y + 38, "NÚMERO", size=7, font=BOLD, color=CAPTION, align="right", width=right)
+    w.text(0, w.y + 54, f"#{meta.get('quote_number', '')}", size=13, font=BOLD, align="right", width=right)
+
+    w.y = max(y, w.y + 60) + 12
+    w.line(w.y, width=2)
+    w.y += 24
+
+def _draw_info(w, data):
+    client, meta = data.get("client") or {}, data.get("meta") or {}
+    right = PAGE.width - MARGIN
+    half = (PAGE.width - 2 * MARGIN) / 2
+    w.text(MARGIN, w.y, "PARA:", size=7, font=BOLD, color=CAPTION)
+    w.text(0, w.y, "DETALLES:", size=7, font=BOLD, color=CAPTION, align="right", width=right)
+    w.line(w.y + 5, width=0.5, color=LINE, x1=MARGIN + half - 24)
+    w.line(w.y + 5, width=0.5, color=LINE, x0=MARGIN + half + 24)
+
+    y = w.y + 22
+    name = (client.get("name") or "CLIENTE FINAL").upper()
+    w.text(MARGIN, y, name, size=12, font=BOLD)
+    w.line(y + 3, width=1.5, color=BLUE, x1=MARGIN + fitz.get_text_length(name, fontname=BOLD, fontsize=12))
+    y += 16
+    for value, font, color in ((client.get("rtn") or "RTN: N/A", FONT, MUTED),
+                               (client.get("address") or "", FONT, MUTED),
+                               (client.get("phone") or "", BOLD, DARK)):
+        for line in _wrap(value, half - 24, font, 9):
+            if line:
+                w.text(MARGIN, y, line, size=9, font=font, color=color)
+                y += 12
+
+    dy = w.y + 22
+    for label, value in (("FECHA EMISIÓN", meta.get("date", "")), ("VALIDEZ", meta.get("valid_until", ""))):
+        w.text(right - 190, dy, label, size=7, font=BOLD, color=CAPTION)
+        w.text(0, dy, str(value), size=9, font=BOLD, align="right", width=right)
+        dy += 14
+    w.y = max(y, dy) + 18
+
+def _column_x():
+    fixed = sum(width for _, width, _ in COLUMNS if width)
+    xs, x = [], MARGIN
+    for _, width, align in COLUMNS:
+        width = width or PAGE.width - 2 * MARGIN - fixed
+        xs.append((x, width, align))
+        x += width
+    return xs
+
+def _draw_table_head(w, columns):
+    w.rect(MARGIN, w.y, PAGE.width - MARGIN, w.y + 20, BLUE)
+    for (title, _, _), (x, width, align) in zip(COLUMNS, columns):
+        w.text(x + ROW_PADDING, w.y + 13, title, size=7, font=BOLD, color=WHITE, align=align,
+               width=width - 2 * ROW_PADDING)
+    w.y += 20
+
+def _draw_items(w, items):
+    columns = _column_x()
+    _draw_table_head(w, columns)
+    if not items:
+        w.text(MARGIN, w.y + 36, "SIN ÍTEMS REGISTRADOS", size=9, font=BOLD, color=LINE, align="center",
+               width=PAGE.width - 2 * MARGIN)
+        w.y += 60
+    desc_width = columns[0][1] - 2 * ROW_PADDING
+    for i, item in enumerate(items):
+        lines = _wrap(item.get("description", ""), desc_width, BOLD, 9)
+        height = 2 * ROW_PADDING + 12 * len(lines) + 10
+        if w.y + height > w.bottom:
+            w.new_page()
+            _draw_table_head(w, columns)
+        elif i:
+            w.line(w.y, width=0.5, color=LINE)
+        top = w.y + ROW_PADDING + 9
+        for n, line in enumerate(lines):
+            w.text(columns[0][0] + ROW_PADDING, top + 12 * n, line, size=9, font=BOLD)
+        w.text(columns[0][0] + ROW_PADDING, top + 12 * len(lines) - 1, str(item.get("code", "")).upper(),
+               size=7, font=BOLD, color=BLUE)
+        quantity, price = float(item.get("quantity") or 0), float(item.get("price") or 0)
+        cells = (f"{quantity:g}", _money(price), _money(quantity * price))
+        for text, (x, width, align), font in zip(cells, columns[1:], (ITALIC, FONT, BOLD)):
+            w.text(x + ROW_PADDING, top, text, size=9, font=font, align=align, width=width - 2 * ROW_PADDING)
+        w.y += height
+    w.line(w.y, width=1.5)
+    w.y += 16
+
+def _draw_totals(w, items):
+    subtotal, isv, total = quote_totals(items)
+    if w.y + 90 > w.bottom:
+        w.new_page()
+    right = PAGE.width - MARGIN
+    x0 = right - 240
+    for label, value in (("SUBTOTAL", subtotal), ("IMPUESTO ISV 15%", isv)):
+        w.text(x0 + 12, w.y + 8, label, size=7, font=BOLD, color=CAPTION)
+        w.text(0, w.y + 8, _money(value), size=9, font=BOLD, align="right", width=right - 12)
+        w.y += 16
+    w.y += 6
+    w.rect(x0, w.y, right, w.y + 36, DARK)
+    w.text(x0 + 14, w.y + 22, "TOTAL NETO", size=8, font=BOLD, color=WHITE)
+    w.text(0, w.y + 24, _money(total), size=15, font=BOLD, color=WHITE, align="right", width=right - 14)
+    w.y += 60
+
+def _draw_footer(w, data):
+    config = data.get("config") or {}
+    lines = _wrap(config.get("footer") or "Válida por 15 días.", 340, FONT, 8)
+    if w.y + 40 + 11 * len(lines) > w.bottom:
+        w.new_page()
+    right = PAGE.width - MARGIN
+    w.line(w.y, width=1.5)
+    y = w.y + 18
+    w.text(MARGIN, y, "CONDICIONES Y NOTAS:", size=7, font=BOLD)
+    w.line(y + 3, width=1.5, color=BLUE, x1=MARGIN + fitz.get_text_length("CONDICIONES Y NOTAS:", fontname=BOLD, fontsize=7))
+    y += 16
+    for line in lines:
+        w.text(MARGIN, y, line, size=8, color=MUTED)
+        y += 11
+    sign = "AUTORIZADO POR REDMIL"
+    sign_w = fitz.get_text_length(sign, fontname=BOLD, fontsize=7)
+    w.line(y - 14, width=1.5, x0=right - sign_w)
+    w.text(0, y - 4, sign, size=7, font=BOLD, align="right", width=right)
+    w.y = y
+
+def render_quote_pdf(data):
+    """PDF bytes for a quote. Same data as renderer.get_quote_html()."""
+    items = data.get("items") or []
+    doc = fitz.open()
+    try:
+        w = _Writer(doc)
+        _draw_header(w, data)
+        _draw_info(w, data)
+        _draw_items(w, items)
+        _draw_totals(w, items)
+        _draw_footer(w, data)
+        w.finish()
+        if doc.page_count > 1:
+            for n, page in enumerate(doc, 1):
+                label = f"Página {n} de {doc.page_count}"
+                page.insert_text((PAGE.width - MARGIN - fitz.get_text_length(label, fontsize=7), PAGE.height - 20),
+                                 label, fontname=FONT, fontsize=7, color=CAPTION)
+        meta = data.get("meta") or {}
+        doc.set_metadata({"title": f"Cotización {meta.get('quote_number', '')}".strip(), "creator": "REDMIL CRM"})
+        return doc.tobytes(garbage=3, deflate=True)
+    finally:
+        doc.close()
+
+def read_cached_pdf(data):
+    """Bytes of the quote's cached PDF (touched for LRU), or None if it is not cached."""
+    path = pdf_path(data)
+    try:
+        with open(path, "rb") as f:
+            content = f.read()
+    except FileNotFoundError:
+        with _lock:
+            stats["misses"] += 1
+        return None
+    try:
+        os.utime(path)  # LRU: mtime is the last use
+    except OSError:
+        pass
+    with _lock:
+        stats["hits"] += 1
+    return content
+
+def store_pdf(data, content, evict_now=True):
+    """
+    Caches rendered PDF bytes for `data` and returns the path. The file is
+    written to a temporary name and renamed, so concurrent sessions never read
+    a partial PDF. evict_now=False leaves eviction to the caller (batch exports
+    evict once at the end).
+    """
+    path = pdf_path(data)
+    os.makedirs(PDF_DIR, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(content)
+    os.replace(tmp, path)
+    if evict_now:
+        evict()
+    return path
+
+def get_quote_pdf(data):
+    """Returns (path, bytes) of the quote's PDF, rendering it only if it is not cached yet."""
+    content = read_cached_pdf(data)
+    if content is not None:
+        return pdf_path(data), content
+    content = render_quote_pdf(data)
+    return store_pdf(data, content), content
+
+def evict(max_entries=None, max_bytes=None):
+    """Removes the least recently used PDFs beyond the count/size limits."""
+    max_entries = MAX_ENTRIES if max_entries is None else max_entries
+    max_bytes = MAX_BYTES if max_bytes is None else max_bytes
+    removed = evict_lru(PDF_DIR, ".pdf", max_entries, max_bytes)
+    if removed:
+        database.clear_quote_pdf_paths(removed)
+
+def clear():
+    """Deletes every cached PDF."""
+    evict(max_entries=0)
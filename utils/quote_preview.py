@@ -0,0 +1,110 @@
+"""
+Live quote preview: a bidirectional Streamlit component.
+
+The preview iframe stays mounted across reruns (it has a stable key). The
+first render sends the whole static document (renderer.render_quote_html);
+after that a rerun only sends what changed since the last message, as JSON
+ops rendered from the same template macros:
+
+    {"op": "splice", "start": i, "delete": n, "rows": ["<tr>...</tr>", ...]}
+    {"op": "totals", "subtotal": "L. ...", "isv": "L. ...", "total": "L. ..."}
+    {"op": "client", "html": "..."}
+
+Every message carries its version and the version it applies on; a browser
+that is not there (a message was dropped, the page was remounted) asks for
+a full snapshot. In the other direction the preview sends the edits made on
+it (quantity changes, removals), read with pop_event() before the page
+renders.
+"""
+import copy
+import os
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+from utils import renderer
+
+FRONTEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "components", "quote_preview")
+DEFAULT_KEY = "quote_preview"
+
+_component = components.declare_component("quote_preview", path=FRONTEND_DIR)
+
+def diff_items(old, new):
+    """
+    (start, delete, items) replacing old[start:start + delete] with `items`
+    to get `new`, from the common prefix and suffix; None if they are equal.
+    One edit (add, remove, change a quantity) gives a one-row splice.
+    """
+    if old == new:
+        return None
+    start, limit = 0, min(len(old), len(new))
+    while start < limit and old[start] == new[start]:
+        start += 1
+    end_old, end_new = len(old), len(new)
+    while end_old > start and end_new > start and old[end_old - 1] == new[end_new - 1]:
+        end_old -= 1
+        end_new -= 1
+    return start, end_old - start, new[start:end_new]
+
+def quote_ops(old, new):
+    """
+    Ops turning the preview of `old` into that of `new` ([] if nothing
+    changed), or None when only a full snapshot will do.
+    """
+    if old is None or old.get("meta") != new.get("meta") or old.get("config") != new.get("config"):
+        return None
+    old_items, new_items = old.get("items") or [], new.get("items") or []
+    ops = []
+    splice = diff_items(old_items, new_items)
+    if splice:
+        if not old_items or not new_items:
+            return None  # the "Sin ítems" placeholder comes and goes with the table
+        start, delete, items = splice
+        ops.append({"op": "splice", "start": start, "delete": delete,
+                    "rows": [renderer.render_item_row(item) for item in items]})
+        ops.append(dict(renderer.format_totals(new_items), op="totals"))
+    if (old.get("client") or {}) != (new.get("client") or {}):
+        ops.append({"op": "client", "html": renderer.render_client_block(new.get("client"))})
+    return ops
+
+def _sync(key):
+    """Per-session state of the preview `key`: what the browser was last sent and heard from."""
+    state_key = f"_{key}_sync"
+    if state_key not in st.session_state:
+        st.session_state[state_key] = {"version": 0, "sent": None, "message": None,
+                                       "seen": None, "pending": None}
+    sync = st.session_state[state_key]
+
+    value = st.session_state.get(key)
+    if isinstance(value, dict) and (value.get("session"), value.get("id")) != sync["seen"]:
+        sync["seen"] = (value.get("session"), value.get("id"))
+        if value.get("type") == "resync":
+            sync["sent"] = None
+        else:
+            sync["pending"] = value
+    return sync
+
+def pop_event(key=DEFAULT_KEY):
+    """
+    The edit made on the preview since the last call, or None:
+    {"type": "quantity", "index", "code", "value"} or {"type": "remove", "index", "code"}.
+    """
+    sync = _sync(key)
+    event, sync["pending"] = sync["pending"], None
+    return event
+
+def quote_preview(data, key=DEFAULT_KEY, height=1200):
+    """Renders (or updates) the preview of a quote. Same data as renderer.get_quote_html()."""
+    sync = _sync(key)
+    ops = quote_ops(sync["sent"], data)
+    if ops is None:
+        sync["version"] += 1
+        sync["message"] = {"version": sync["version"], "snapshot": renderer.render_quote_html(data)}
+    elif ops:
+        sync["version"] += 1
+        sync["message"] = {"version": sync["version"], "base": sync["version"] - 1, "ops": ops}
+    if ops is None or ops:
+        # Items are edited in place in session_state: keep a copy to diff against
+        sync["sent"] = copy.deepcopy(data)
+    # Unchanged: the last message again, the browser is already at its version
+    _component(message=sync["message"], height=height, key=key, default=None)
@@ -1,7 +1,87 @@
 import json
 import datetime
+import os
+import re
+from jinja2 import Environment, FileSystemLoader, select_autoescape
 
-def get_quote_html(data):
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+
+# "static": HTML rendered server-side from templates/quote.html.j2 with the CSS
+#           inlined - no CDN, no in-browser Babel/React, works offline.
+# "react":  the original React document transpiled in the browser.
+RENDER_MODE = "static"
+ISV_RATE = 0.15
+
+_env = Environment(
+    loader=FileSystemLoader(TEMPLATE_DIR),
+    autoescape=select_autoescape(["html", "j2"]),
+    auto_reload=False,  # compiled once per process
+)
+_env.filters["money"] = lambda value: f"{float(value or 0):,.2f}"
+_css = None
+
+def _inline_css():
+    """templates/quote.css, minified once per process."""
+    global _css
+    if _css is None:
+        with open(os.path.join(TEMPLATE_DIR, "quote.css"), encoding="utf-8") as f:
+            css = f.read()
+        css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+        css = re.sub(r"\s+", " ", css)
+        _css = re.sub(r"\s*([{};:,>+])\s*", r"\1", css).strip()
+    return _css
+
+def quote_totals(items):
+    """(subtotal, isv, total) of a list of quote items."""
+    subtotal = sum(float(i.get('quantity') or 0) * float(i.get('price') or 0) for i in items)
+    isv = subtotal * ISV_RATE
+    return subtotal, isv, subtotal + isv
+
+def render_quote_html(data, toolbar=True):
+    """
+    Static HTML for a quote. Same data as get_quote_html(); `toolbar` adds the
+    zoom/print controls (a few lines of plain JS) for the on-screen preview.
+    """
+    items = data.get("items") or []
+    subtotal, isv, total = quote_totals(items)
+    return _env.get_template("quote.html.j2").render(
+        css=_inline_css(),
+        toolbar=toolbar,
+        client=data.get("client") or {},
+        items=items,
+        meta=data.get("meta") or {},
+        config=data.get("config") or {},
+        subtotal=subtotal,
+        isv=isv,
+        total=total,
+    )
+
+def _macros():
+    return _env.get_template("quote_macros.j2").module
+
+def render_item_row(item):
+    """One <tr> of the items table, as in render_quote_html()."""
+    return str(_macros().item_row(item))
+
+def render_client_block(client):
+    """Inner HTML of the "Para:" block, as in render_quote_html()."""
+    return str(_macros().client_block(client or {}))
+
+def format_totals(items):
+    """{'subtotal', 'isv', 'total'} of the items, formatted as in render_quote_html()."""
+    money = _env.filters["money"]
+    return {name: f"L. {money(value)}" for name, value in zip(("subtotal", "isv", "total"), quote_totals(items))}
+
+def get_quote_html(data, mode=None):
+    """
+    Generates the HTML for a quote preview/document.
+    Expects data to have: client (dict), items (list), meta (dict), config (dict)
+    """
+    if (mode or RENDER_MODE) == "static":
+        return render_quote_html(data)
+    return get_quote_html_react(data)
+
+def get_quote_html_react(data):
     """
     Generates the React-based HTML for a quote preview/document.
     Expects data to have: client (dict), items (list), meta (dict), config (dict)
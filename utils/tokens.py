@@ -0,0 +1,60 @@
+"""
+Token classification for the inventory parsers.
+
+All patterns are compiled once at import time. PDF rows are classified with a
+couple of C-level regex scans over the joined row instead of a Python loop
+per token.
+"""
+import re
+
+NON_PRICE_CHARS_RE = re.compile(r'[^\d.]')
+
+# A price has decimals (10.00, 1,234.50, $99.90). '$' and thousands commas may
+# appear anywhere, exactly like stripping them and matching ^\d+\.\d+$.
+# Model numbers are usually integers, so "iPhone 15" is not mistaken for a price.
+PRICE_TOKEN_RE = re.compile(r'^[$,]*\d[\d$,]*\.[$,]*\d[\d$,]*$', re.MULTILINE)
+
+# Lines containing any of these are table headers / page footers, not products.
+HEADER_RE = re.compile(r'CODIGO|DESCRIPCION|PRECIO|PAGE', re.IGNORECASE)
+
+def clean_price(price_str):
+    """Cleans price string to float."""
+    if not price_str:
+        return 0.0
+    # Remove currency symbols and commas
+    clean = NON_PRICE_CHARS_RE.sub('', str(price_str).replace(',', ''))
+    try:
+        return float(clean)
+    except ValueError:
+        return 0.0
+
+def is_price(token):
+    return PRICE_TOKEN_RE.match(token) is not None
+
+def classify_row(tokens):
+    """
+    Splits one PDF line into (code, description, price_token), or None if it is
+    not a product line.
+
+    Pattern: Code [Desc...] Price [Others...]. The price is the *first* decimal
+    number after the code: the first price column is the USD one, any later
+    columns are ignored.
+    """
+    # We filter out empty or very short lines
+    if len(tokens) < 3:
+        return None
+    # One token per line, so both patterns run over the whole row in one scan each
+    joined = "\n".join(tokens)
+    if HEADER_RE.search(joined):
+        return None
+    match = PRICE_TOKEN_RE.search(joined, len(tokens[0]) + 1)
+    if not match:
+        return None
+    price_index = joined.count("\n", 0, match.start())
+    if price_index <= 1:  # Need at least one word for Desc
+        return None
+    # Description is everything in between.
+    description = " ".join(tokens[1:price_index])
+    if len(description) < 2:
+        return None  # Too short
+    return tokens[0], description, match.group()
@@ -0,0 +1,153 @@
+"""
+Column-selective streaming reader for .xlsx worksheets.
+
+openpyxl (even in read-only mode) builds and type-converts every cell of
+every row, including the columns the importer throws away. This reads the
+sheet XML incrementally with ElementTree.iterparse and only converts the
+cells of the requested columns; rows are yielded one at a time and their
+elements freed, so memory stays flat whatever the sheet size.
+
+Values follow openpyxl's values_only conventions for what supplier lists
+contain (strings, numbers, booleans, formula results); number formats are
+not applied, so dates come back as their serial number.
+"""
+import posixpath
+import zipfile
+from array import array
+from xml.etree.ElementTree import iterparse, parse
+
+NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+_ROW, _VALUE, _TEXT, _SI = NS + "row", NS + "v", NS + "t", NS + "si"
+_SHEET_DATA = NS + "sheetData"
+
+def column_index(ref):
+    """0-based column of a cell reference ('C12' -> 2)."""
+    n = 0
+    for ch in ref:
+        if "A" <= ch <= "Z":
+            n = n * 26 + ord(ch) - 64
+        else:
+            break
+    return n - 1
+
+def _number(text):
+    if "." in text or "E" in text or "e" in text:
+        return float(text)
+    return int(text)
+
+class SharedStrings:
+    """
+    The workbook's shared-strings table packed into one UTF-8 buffer plus
+    offsets: a big price list has millions of them, most from columns the
+    importer never reads, and a list of str would cost ~60 bytes more each.
+    """
+
+    def __init__(self, part=None):
+        self._data = bytearray()
+        self._offsets = array("Q", [0])
+        if part is not None:
+            for _, el in iterparse(part):
+                if el.tag == _SI:
+                    self._data += "".join(t.text or "" for t in el.iter(_TEXT)).encode("utf-8")
+                    self._offsets.append(len(self._data))
+                    el.clear()
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        return self._data[self._offsets[index]:self._offsets[index + 1]].decode("utf-8")
+
+class Workbook:
+    """An opened .xlsx: sheet names/parts and the shared strings (loaded on first use)."""
+
+    def __init__(self, file_stream):
+        self.zip = zipfile.ZipFile(file_stream)
+        self._shared = None
+        rels = {
+            rel.get("Id"): rel.get("Target")
+            for rel in parse(self.zip.open("xl/_rels/workbook.xml.rels")).getroot().iter(PKG_REL_NS + "Relationship")
+        }
+        self.sheets = []  # [(name, part path)] in workbook order
+        for sheet in parse(self.zip.open("xl/workbook.xml")).getroot().iter(NS + "sheet"):
+            target = rels[sheet.get(REL_NS + "id")]
+            path = target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+            self.sheets.append((sheet.get("name"), path))
+
+    @property
+    def shared_strings(self):
+        if self._shared is None:
+            try:
+                part = self.zip.open("xl/sharedStrings.xml")
+            except KeyError:
+                part = None
+            self._shared = SharedStrings(part)
+        return self._shared
+
+    def close(self):
+        self.zip.close()
+
+    def iter_rows(self, path, columns=None, min_row=1, max_row=None):
+        """
+        Yields the rows of the sheet part `path` from `min_row` (1-based) to
+        `max_row` as lists of values. With `columns` (0-based indexes) a row
+        holds just those cells, in that order; otherwise every cell up to the
+        last non-empty one. Missing rows (blank lines) are yielded as empty.
+        """
+        wanted = {c: n for n, c in enumerate(columns)} if columns is not None else None
+        shared = None
+        sheet_data = None
+        expected = 1
+        for event, el in iterparse(self.zip.open(path), events=("start", "end")):
+            if event == "start":
+                if el.tag == _SHEET_DATA:
+                    sheet_data = el
+                continue
+            if el.tag != _ROW:
+                continue
+            number = int(el.get("r") or expected)
+            if max_row is not None and number > max_row:
+                return
+            if number < min_row:
+                sheet_data.clear()
+                expected = number + 1
+                continue
+            for _ in range(max(expected, min_row), number):
+                yield [None] * len(columns) if wanted is not None else []
+            expected = number + 1
+
+            values = [None] * len(columns) if wanted is not None else []
+            for position, cell in enumerate(el):
+                ref = cell.get("r")
+                index = column_index(ref) if ref else position
+                if wanted is not None:
+                    slot = wanted.get(index)
+                    if slot is None:
+                        continue
+                else:
+                    slot = index
+                    if slot >= len(values):
+                        values.extend([None] * (slot + 1 - len(values)))
+
+                kind = cell.get("t")
+                if kind == "inlineStr":
+                    value = "".join(t.text or "" for t in cell.iter(_TEXT))
+                else:
+                    value = cell.findtext(_VALUE)
+                    if not value:
+                        continue  # empty, or a formula never calculated
+                    if kind == "s":
+                        if shared is None:
+                            shared = self.shared_strings
+                        value = shared[int(value)]
+                    elif kind == "b":
+                        value = value == "1"
+                    elif kind not in ("str", "e"):
+                        value = _number(value)
+                values[slot] = value
+            # Drop the parsed rows, not just their content, or the tree keeps growing
+            sheet_data.clear()
+            yield values
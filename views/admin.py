@@ -106,3 +106,15 @@ def show():
                 st.success("Configuración guardada exitosamente.")
                 st.rerun()
 
+
+    # --- READ CACHE METRICS ---
+    with st.expander("📈 Caché de datos"):
+        stats = database.cache_stats()
+        m1, m2, m3, m4 = st.columns(4)
+        m1.metric("Aciertos", stats["hits"])
+        m2.metric("Fallos", stats["misses"])
+        m3.metric("Tasa de aciertos", f"{stats['hit_rate']:.0%}")
+        m4.metric("Entradas", stats["entries"])
+        if st.button("Vaciar caché"):
+            database.read_cache.invalidate()
+            st.rerun()
@@ -13,24 +13,17 @@ def show():
     
     # --- METRICS SECTION (BENTO GRID) ---
     
-    # Get Data
-    rate_info = database.get_current_exchange_rate_full()
-    products = database.get_all_products()
-    quotes = database.get_all_quotes() 
+    # Get Data (counts, sums, latest quotes and top brands are computed in SQL)
+    summary = database.get_dashboard_summary(recent_limit=5, top_brands_limit=10)
+    rate_info = summary['rate']
     
     # Calculations
     current_rate = rate_info['rate_value']
     rate_date_str = rate_info['rate_date']
     
-    inventory_count = len(products)
-    quotes_count = len(quotes)
-    
-    # Calculate total sum in Lempiras
-    total_lps = 0
-    if quotes:
-        for quote in quotes:
-            if 'total_amount_lps' in quote and quote['total_amount_lps']:
-                total_lps += float(quote['total_amount_lps'])
+    inventory_count = summary['inventory_count']
+    quotes_count = summary['quotes_count']
+    total_lps = float(summary['total_lps'])
     
     # Rate Freshness
     try:
@@ -123,11 +116,8 @@ def show():
     # LEFT COLUMN: Recent Quotes
     with col_left:
         st.markdown("### 📋 Últimas 5 Cotizaciones")
-        if quotes:
-            # Get last 5 quotes sorted by date (descending)
-            sorted_quotes = sorted(quotes, key=lambda x: x.get('quote_date', ''), reverse=True)
-            recent_quotes = sorted_quotes[:5]
-            
+        recent_quotes = summary['recent_quotes']
+        if recent_quotes:
             # Display as interactive table
             for idx, quote in enumerate(recent_quotes):
                 quote_id = quote.get('id', idx)
@@ -159,35 +149,10 @@ def show():
     with col_right:
         st.markdown("### 🏆 Top 10 Marcas Más Cotizadas")
         
-        # Calculate brand counts from quotes
-        if quotes:
-            brand_counts = {}
+        if quotes_count:
+            sorted_brands = [(b['brand'], b['count']) for b in summary['top_brands']]
             
-            # Get all quote items
-            conn = database.get_connection()
-            cursor = conn.cursor()
-            
-            for quote in quotes:
-                quote_id = quote.get('id')
-                if quote_id:
-                    cursor.execute("""
-                        SELECT qi.product_id, p.brand 
-                        FROM quote_items qi
-                        JOIN products p ON qi.product_id = p.id
-                        WHERE qi.quote_id = ?
-                    """, (quote_id,))
-                    
-                    items = cursor.fetchall()
-                    for item in items:
-                        brand = item['brand'] or 'Sin Marca'
-                        brand_counts[brand] = brand_counts.get(brand, 0) + 1
-            
-            conn.close()
-            
-            # Sort by count and get top 10
-            if brand_counts:
-                sorted_brands = sorted(brand_counts.items(), key=lambda x: x[1], reverse=True)[:10]
-                
+            if sorted_brands:
                 # Display as a beautiful list
                 for idx, (brand, count) in enumerate(sorted_brands):
                     # Create a progress bar effect
@@ -3,6 +3,45 @@ import pandas as pd
 from utils import parsers
 import database
 
+# Columns loaded for the grid (the rest stay in SQLite)
+GRID_COLUMNS = ["id", "product_code", "description", "brand", "cost_usd", "cost_lps"]
+EDITABLE_COLUMNS = ["product_code", "description", "brand", "cost_usd"]
+PAGE_SIZES = [50, 100, 250, 500]
+PREVIEW_ROWS = 200
+IMPORT_BATCH_SIZE = 2000
+DELTA_REPORT_ROWS = 1000
+
+def grid_changes(original, edited):
+    """
+    Rows of the edited grid that are new or differ from the page that was
+    loaded, as product dicts for bulk_upsert_products(). Blank rows are
+    ignored; rows without a code, description or numeric cost_usd would fail
+    the whole save, so they are left out and described in `problems`.
+    """
+    loaded = {row['id']: row for row in original.to_dict('records')}
+    items, problems = [], []
+    for n, row in enumerate(edited.to_dict('records'), start=1):
+        row = {k: (None if pd.isna(v) else v) for k, v in row.items()}
+        before = loaded.get(row.get('id'))
+        if before is not None and all(row.get(col) == before.get(col) for col in EDITABLE_COLUMNS):
+            continue
+        if all(row.get(col) in (None, '') for col in EDITABLE_COLUMNS):
+            continue  # blank row added and left empty
+        code = str(row.get('product_code') or '').strip()
+        description = str(row.get('description') or '').strip()
+        missing = [label for label, value in (("código", code), ("descripción", description),
+                                              ("costo USD", row.get('cost_usd'))) if not value and value != 0]
+        if missing:
+            problems.append(f"Fila {n} sin guardar: falta {', '.join(missing)}.")
+            continue
+        try:
+            cost_usd = float(row['cost_usd'])
+        except (TypeError, ValueError):
+            problems.append(f"Fila {n} sin guardar: costo USD no numérico ({row['cost_usd']!r}).")
+            continue
+        items.append(dict(row, product_code=code, description=description, cost_usd=cost_usd))
+    return items, problems
+
 def show():
     st.title("📦 Inventario de Productos")
     
@@ -10,11 +49,8 @@ def show():
     with st.expander("🔍 Busqueda y Filtros", expanded=True):
         col1, col2, col3 = st.columns([2, 1, 1])
         
-        products = database.get_all_products()
-        df_products = pd.DataFrame(products) if products else pd.DataFrame(columns=["product_code", "description", "brand", "cost_usd", "cost_lps", "category", "stock_quantity", "id"])
-        
         # Brand list for filter
-        all_brands = sorted(list(set(df_products['brand'].dropna().unique()))) if not df_products.empty else []
+        all_brands = database.get_all_brands()
         
         with col1:
             search = st.text_input("Buscar (Código, Nombre)", placeholder="Escribe para buscar...")
@@ -24,28 +60,30 @@ def show():
             # Price range
             min_price = 0.0
             max_price = 2000.0 # Default max
-            if not df_products.empty:
-               max_val = df_products['cost_usd'].max()
-               if max_val > 0: max_price = float(max_val)
+            max_val = database.get_max_product_price()
+            if max_val > 0: max_price = float(max_val)
             
             price_range = st.slider("Rango de Precio (USD)", 0.0, max_price + 100, (0.0, max_price + 100))
 
-    # Apply Filters
-    if not df_products.empty:
-        # Text Search
-        if search:
-            mask = df_products.apply(lambda row: search.lower() in str(row).lower(), axis=1)
-            df_products = df_products[mask]
-        
-        # Brand Filter
-        if selected_brands:
-            df_products = df_products[df_products['brand'].isin(selected_brands)]
-            
-        # Price Filter
-        df_products = df_products[
-            (df_products['cost_usd'] >= price_range[0]) & 
-            (df_products['cost_usd'] <= price_range[1])
-        ]
+    # --- PAGINATION ---
+    # inventory_cursors[i] is the (brand, product_code) key that starts page i.
+    # Changing any filter goes back to the first page.
+    filter_key = (search, tuple(selected_brands), price_range)
+    if st.session_state.get("inventory_filter_key") != filter_key:
+        st.session_state.inventory_filter_key = filter_key
+        st.session_state.inventory_cursors = [None]
+    page_size = st.session_state.get("inventory_page_size", PAGE_SIZES[1])
+    page_idx = len(st.session_state.inventory_cursors) - 1
+    
+    total_products = database.count_products(search, brand=selected_brands, price_range=price_range)
+    if search:
+        # Text Search (FTS index, ranked) pages by offset
+        page_rows = database.search_products(search, brand=selected_brands, price_range=price_range,
+                                             limit=page_size, offset=page_idx * page_size)
+    else:
+        page_rows = database.get_products_page(after=st.session_state.inventory_cursors[-1], page_size=page_size,
+                                               columns=GRID_COLUMNS, brand=selected_brands, price_range=price_range)
+    df_products = pd.DataFrame(page_rows, columns=GRID_COLUMNS)
 
     st.markdown("---")
     
@@ -67,22 +105,24 @@ def show():
             uploaded_file = st.file_uploader("Subir archivo", type=['xlsx', 'pdf'])
             
             if uploaded_file:
-                if uploaded_file.name.endswith('.pdf'):
-                    extracted_data = parsers.parse_pdf_inventory(uploaded_file)
-                elif uploaded_file.name.endswith('.xlsx'):
-                    extracted_data = parsers.parse_excel_inventory(uploaded_file)
-                else:
-                    extracted_data = []
+                # Only the first rows are shown; the whole parse is cached on the
+                # first preview, so reruns and the import below read it back.
+                uploaded_file.seek(0)
+                try:
+                    preview = parsers.preview_inventory(uploaded_file, PREVIEW_ROWS)
+                except parsers.READ_ERRORS as e:
+                    print(f"Error parsing {uploaded_file.name}: {e}")
+                    preview = []
 
-                if extracted_data:
+                if preview:
                     current_rate = database.get_current_exchange_rate()
-                    st.info(f"Usando tasa: L. {current_rate:.2f}. Se encontraron {len(extracted_data)} productos.")
+                    st.info(f"Usando tasa: L. {current_rate:.2f}. Vista previa de los primeros {len(preview)} productos.")
                     
                     # Convert to LPS
-                    for item in extracted_data:
+                    for item in preview:
                         item['cost_lps'] = float(item.get('cost_usd', 0)) * float(current_rate)
 
-                    st.dataframe(extracted_data, height=200)
+                    st.dataframe(preview, height=200)
 
                     # Brand Logic
                     existing_brands = database.get_all_brands()
@@ -102,26 +142,82 @@ def show():
                         final_brand_name = selected_brand_option
                         force_brand = True
                     
+                    delta_mode = st.checkbox("Modo delta (solo productos con cambios)", value=True,
+                                             help="A los productos cuyo código, descripción, costo y marca no cambiaron solo les recalcula el costo en Lempiras, y reporta los que faltan en el archivo.")
+                    
                     if st.button("💾 Guardar en Base de Datos"):
-                        count = 0
-                        progress_bar = st.progress(0)
+                        totals = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+                        added, changed, seen_codes, seen_brands = [], [], set(), set()
+                        progress = st.empty()
+                        failed = False
+                        read_error = None
                         
-                        for i, item in enumerate(extracted_data):
-                            if force_brand and final_brand_name:
-                                item['brand'] = final_brand_name
-                            # If not forcing, it uses item['brand'] which comes from parser (default Unknown if missing)
-                            
-                            if database.upsert_product(item, user_name="Importador"):
-                                count += 1
-                            progress_bar.progress((i + 1) / len(extracted_data))
+                        # Each batch is written (one transaction) while the parser keeps reading the file
+                        uploaded_file.seek(0)
+                        with st.spinner("Guardando productos..."):
+                            try:
+                                for batch in parsers.iter_inventory_batches(uploaded_file, IMPORT_BATCH_SIZE):
+                                    for item in batch:
+                                        item['cost_lps'] = float(item.get('cost_usd', 0)) * float(current_rate)
+                                        # If not forcing, it uses item['brand'] which comes from parser (default Unknown if missing)
+                                        if force_brand and final_brand_name:
+                                            item['brand'] = final_brand_name
+                                    result = database.bulk_upsert_products(batch, user_name="Importador", delta=delta_mode)
+                                    if result is None:
+                                        failed = True
+                                        break
+                                    for key in totals:
+                                        totals[key] += result[key]
+                                    if delta_mode:
+                                        added += result['added']
+                                        changed += result['changed']
+                                        seen_codes.update(str(item['product_code']).strip() for item in batch)
+                                        seen_brands.update(item['brand'] for item in batch if item.get('brand'))
+                                    progress.caption(f"Guardados {sum(totals.values())} productos...")
+                            except parsers.READ_ERRORS as e:
+                                # Earlier batches are already committed: say how far it got
+                                print(f"Error parsing {uploaded_file.name}: {e}")
+                                read_error = e
                         
-                        st.success(f"¡Procesado! {count} productos actualizados.")
-                        st.rerun()
+                        if read_error is not None:
+                            st.error(f"Error al leer el archivo ({read_error}). Los {sum(totals.values())} productos anteriores ya se guardaron.")
+                        elif failed:
+                            st.error(f"Error al guardar un lote. Los {sum(totals.values())} productos anteriores ya se guardaron.")
+                        elif delta_mode:
+                            missing = database.find_missing_products(seen_codes, brands=seen_brands)
+                            st.success(f"¡Procesado! {len(added)} nuevos, {len(changed)} modificados, {totals['unchanged']} sin cambios, {len(missing)} faltantes en el archivo.")
+                            for label, codes in (("🆕 Nuevos", added), ("✏️ Modificados", changed), ("❓ Faltantes", missing)):
+                                if codes:
+                                    with st.expander(f"{label} ({len(codes)})"):
+                                        st.dataframe({"Código": codes[:DELTA_REPORT_ROWS]}, height=200)
+                        else:
+                            st.success(f"¡Procesado! {totals['inserted']} nuevos, {totals['updated']} actualizados, {totals['unchanged']} sin cambios.")
+                            st.rerun()
                 else:
                     st.warning("No se encontraron datos válidos.")
 
     # Main Grid
-    st.markdown(f"### Lista de Productos ({len(df_products)})")
+    st.markdown(f"### Lista de Productos ({total_products})")
+    
+    total_pages = max(1, -(-total_products // page_size))
+    nav1, nav2, nav3, nav4 = st.columns([1, 2, 1, 1])
+    with nav1:
+        if st.button("◀ Anterior", disabled=page_idx == 0, use_container_width=True):
+            st.session_state.inventory_cursors.pop()
+            st.rerun()
+    with nav2:
+        st.caption(f"Página {page_idx + 1} de {total_pages}")
+    with nav3:
+        if st.button("Siguiente ▶", disabled=page_idx + 1 >= total_pages, use_container_width=True):
+            last = page_rows[-1]
+            st.session_state.inventory_cursors.append((last['brand'], last['product_code']))
+            st.rerun()
+    with nav4:
+        new_size = st.selectbox("Por página", PAGE_SIZES, index=PAGE_SIZES.index(page_size), label_visibility="collapsed")
+        if new_size != page_size:
+            st.session_state.inventory_page_size = new_size
+            st.session_state.inventory_cursors = [None]
+            st.rerun()
     
     if not df_products.empty:
         # Only show relevant columns
@@ -141,21 +237,29 @@ def show():
             hide_index=True,
             use_container_width=True,
             num_rows="dynamic",
-            key="inventory_editor",
+            key=f"inventory_editor_{abs(hash((filter_key, page_idx, page_size)))}",  # fresh edit state per page
             disabled=["id", "cost_lps"] # Disable LPS editing directly to enforce consistency? Or allow both? Let's allow USD edit.
         )
         
         if st.button("💾 Guardar Cambios en Grid"):
             current_rate = database.get_current_exchange_rate()
-            updates = 0
-            for idx, row in edited_df.iterrows():
+            items, problems = grid_changes(df_products, edited_df)
+            for item in items:
                 # Re-calc LPS
-                row['cost_lps'] = float(row['cost_usd']) * float(current_rate)
-                item = row.to_dict()
-                if database.upsert_product(item, user_name="GridEdit"):
-                    updates += 1
-            st.success(f"{updates} registros actualizados.")
-            st.rerun()
+                item['cost_lps'] = item['cost_usd'] * float(current_rate)
+            for problem in problems:
+                st.warning(problem)
+            if not items:
+                if not problems:
+                    st.info("No hay cambios que guardar.")
+            else:
+                result = database.bulk_upsert_products(items, user_name="GridEdit")
+                if result is None:
+                    st.error("Error al guardar los cambios.")
+                else:
+                    st.success(f"{result['updated'] + result['inserted']} registros actualizados.")
+                    if not problems:  # keep the warnings on screen
+                        st.rerun()
             
     else:
         st.info("No hay productos que coincidan con los filtros.")
@@ -2,8 +2,30 @@ import streamlit as st
 import pandas as pd
 import json
 import datetime
-import streamlit.components.v1 as components
 import database
+from utils import quote_preview
+
+# Products offered in the selector (search results and the unfiltered list alike)
+SEARCH_LIMIT = 200
+SEARCH_COLUMNS = ["id", "product_code", "description", "cost_usd"]
+
+def _reset_qty_inputs():
+    """Drops the per-row quantity widgets' state (their keys follow the row index)."""
+    for key in [k for k in st.session_state if str(k).startswith("qty_")]:
+        del st.session_state[key]
+
+def _apply_preview_event(event):
+    """Applies a quantity change / removal made on the preview itself."""
+    items = st.session_state.quote_items
+    idx = event.get("index")
+    if not isinstance(idx, int) or not 0 <= idx < len(items) or items[idx]['code'] != event.get("code"):
+        return  # the list changed meanwhile
+    if event["type"] == "quantity" and int(event.get("value") or 0) >= 1:
+        items[idx]['quantity'] = int(event["value"])
+        st.session_state.pop(f"qty_{idx}", None)  # re-created from the new quantity
+    elif event["type"] == "remove":
+        items.pop(idx)
+        _reset_qty_inputs()
 
 def show():
     st.title("📄 Generador de Cotizaciones")
@@ -15,6 +37,11 @@ def show():
         st.session_state.client_mode = "Buscar"
     if 'selected_client_data' not in st.session_state:
         st.session_state.selected_client_data = None
+
+    # Edits made on the preview apply before anything is drawn
+    event = quote_preview.pop_event()
+    if event:
+        _apply_preview_event(event)
     
     col_left, col_right = st.columns([1.3, 2.7], gap="medium")
 
@@ -84,26 +111,22 @@ def show():
             search_code = st.text_input("🔢 Buscar por Código", placeholder="Ej: PROD-001")
             search_desc = st.text_input("📝 Buscar por Descripción/Marca", placeholder="Ej: Laptop HP")
             
-            # Get all products
-            products = database.get_all_products()
-            
-            # Filter products based on search
-            filtered_products = products
-            if search_code.strip():
-                filtered_products = [
-                    p for p in filtered_products 
-                    if search_code.lower() in p['product_code'].lower()
-                ]
-            if search_desc.strip():
-                filtered_products = [
-                    p for p in filtered_products 
-                    if search_desc.lower() in p['description'].lower() or 
-                       search_desc.lower() in (p.get('brand', '') or '').lower()
-                ]
+            # Filter products based on search (FTS index; code terms only match the code column).
+            # Both cases are bounded: one extra row tells whether there are more.
+            searching = bool(search_code.strip() or search_desc.strip())
+            if searching:
+                filtered_products = database.search_products(search_desc, code=search_code, limit=SEARCH_LIMIT + 1)
+            else:
+                filtered_products = database.get_products_page(page_size=SEARCH_LIMIT + 1, columns=SEARCH_COLUMNS)
+            more = len(filtered_products) > SEARCH_LIMIT
+            filtered_products = filtered_products[:SEARCH_LIMIT]
             
             # Show results count
-            if search_code.strip() or search_desc.strip():
-                st.caption(f"📊 {len(filtered_products)} productos encontrados")
+            if searching:
+                found = f"{SEARCH_LIMIT}+" if more else len(filtered_products)
+                st.caption(f"📊 {found} productos encontrados" + (f" (mostrando los primeros {SEARCH_LIMIT})" if more else ""))
+            elif more:
+                st.caption(f"📊 Mostrando los primeros {SEARCH_LIMIT} productos; escribe para buscar el resto")
             
             # Product selector with filtered results
             prod_options = {f"{p['product_code']} - {p['description']}": p for p in filtered_products}
@@ -171,8 +194,8 @@ def show():
                             label_visibility="collapsed"
                         )
                         if new_qty != item['quantity']:
+                            # No rerun needed: the totals and the preview are drawn below
                             st.session_state.quote_items[idx]['quantity'] = new_qty
-                            st.rerun()
                     
                     with col_price:
                         subtotal = item['quantity'] * item['price']
@@ -183,6 +206,7 @@ def show():
                         # Delete button
                         if st.button("🗑️", key=f"del_{idx}", help="Eliminar producto"):
                             st.session_state.quote_items.pop(idx)
+                            _reset_qty_inputs()
                             st.success("Producto eliminado")
                             st.rerun()
                     
@@ -238,6 +262,7 @@ def show():
                 if st.button("🆕 Nueva Cotización", use_container_width=True, type="primary"):
                     # FIX 4: Clear everything for new quote
                     st.session_state.quote_items = []
+                    _reset_qty_inputs()
                     st.session_state.selected_client_data = None
                     st.session_state.quote_saved = False
                     st.success("📝 Documento en blanco listo")
@@ -251,8 +276,6 @@ def show():
 
     # --- RIGHT PANEL: ZOOMABLE PREVIEW ---
     with col_right:
-        from utils import renderer
-        
         # Get client data for preview
         if st.session_state.selected_client_data:
             c_name = st.session_state.selected_client_data.get("name", "")
@@ -278,5 +301,5 @@ def show():
             }
         }
         
-        html_code = renderer.get_quote_html(preview_data)
-        components.html(html_code, height=1200, scrolling=True)
+        # Stays mounted across reruns; only the rows/client/totals that changed are sent
+        quote_preview.quote_preview(preview_data, height=1200)
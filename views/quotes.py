@@ -1,8 +1,9 @@
 import streamlit as st
 import pandas as pd
-import json
 import database
-from utils import renderer
+import os
+import tempfile
+from utils import quote_export, quote_pdf, renderer
 import streamlit.components.v1 as components
 
 def show():
@@ -18,6 +19,7 @@ def show():
         
         if st.button("🔙 Volver al Listado", use_container_width=True):
             st.session_state.selected_quote = None
+            st.session_state.quote_pdf = None
             st.rerun()
             
         st.divider()
@@ -31,38 +33,34 @@ def show():
             st.markdown(f"### Total: L. {q['total_lps']:,.2f}")
             
         with col2:
-            st.info("💡 Puedes volver a descargar o imprimir el documento usando el botón en la vista previa a la derecha.")
+            st.info("💡 Prepara y descarga el PDF con el botón de abajo o imprime el documento desde la vista previa.")
 
         # Reconstruct data for renderer
         try:
-            client_details = json.loads(q['client_details'])
-            items = json.loads(q['products_json'])
-            
-            # Get current config (might have changed, but usually we want snapshot or current?)
-            # Usually history wants snapshot, but we didn't save config in history.
-            # Let's fetch current config.
+            # History has no config snapshot: use the current header/footer
             header_info = database.get_config('quote_header')
             footer_info = database.get_config('quote_footer')
-            
-            preview_data = {
-                "client": {
-                    "name": q['client_name'],
-                    "rtn": client_details.get('rtn', ''),
-                    "phone": client_details.get('phone', ''),
-                    "address": client_details.get('address', '')
-                },
-                "items": items,
-                "meta": {
-                    "date": q['created_at'].split()[0], # Just date
-                    "valid_until": "Válida por 15 días", # Hardcoded or calc
-                    "quote_number": f"RD-{q['id']:04d}"
-                },
-                "config": {
-                    "header": header_info,
-                    "footer": footer_info
-                }
-            }
-            
+            preview_data = quote_pdf.history_quote_data(q, header_info, footer_info)
+
+            # Built only when asked for: rendered once per quote/config and cached on disk,
+            # later downloads read the file. An evicted (missing) file is rendered again.
+            pdf_state = st.session_state.get("quote_pdf")
+            if pdf_state is None or pdf_state[0] != q['id']:
+                if st.button("📄 Preparar PDF", use_container_width=True):
+                    pdf_file, pdf_bytes = quote_pdf.get_quote_pdf(preview_data)
+                    if q.get('pdf_path') != pdf_file:
+                        # set_quote_pdf_path invalidates the cached history rows
+                        database.set_quote_pdf_path(q['id'], pdf_file, history=True)
+                    pdf_state = st.session_state.quote_pdf = (q['id'], pdf_bytes)
+            if pdf_state is not None and pdf_state[0] == q['id']:
+                st.download_button(
+                    "📄 Descargar PDF",
+                    data=pdf_state[1],
+                    file_name=f"Cotizacion_RD-{q['id']:04d}.pdf",
+                    mime="application/pdf",
+                    use_container_width=True
+                )
+
             html_code = renderer.get_quote_html(preview_data)
             components.html(html_code, height=1000, scrolling=True)
             
@@ -106,8 +104,35 @@ def show():
                                   format_func=lambda x: f"Cotización #{x} - {next(q['client_name'] for q in quotes_history if q['id'] == x)}")
         
         if st.button("🔎 Ver Detalle Completo", use_container_width=True):
-            st.session_state.selected_quote = next(q for q in quotes_history if q['id'] == selected_id)
+            # A copy: the history rows are shared by the read cache
+            st.session_state.selected_quote = dict(next(q for q in quotes_history if q['id'] == selected_id))
             st.rerun()
+
+        with st.expander("📦 Exportar cotizaciones a PDF"):
+            if st.button("Generar ZIP con todas las cotizaciones", use_container_width=True):
+                # One file per session, replaced on each click: sessions never share an archive
+                previous = st.session_state.get("quotes_zip")
+                if previous and os.path.exists(previous[0]):
+                    os.remove(previous[0])
+                st.session_state.quotes_zip = None
+                fd, zip_path = tempfile.mkstemp(suffix=".zip")
+                os.close(fd)
+                try:
+                    with st.spinner(f"Generando {len(quotes_history)} PDFs..."):
+                        report = quote_export.export_quotes_zip(zip_path, quotes_history)
+                except Exception:
+                    os.remove(zip_path)
+                    raise
+                st.session_state.quotes_zip = (zip_path, report)
+
+            if st.session_state.get("quotes_zip") and os.path.exists(st.session_state.quotes_zip[0]):
+                zip_path, report = st.session_state.quotes_zip
+                st.success(f"✅ {report['quotes']} cotizaciones en {report['seconds']:.1f} s "
+                           f"({report['quotes_per_sec']:.1f} por segundo)")
+                # The archive is handed over as a file, not read into this script
+                with open(zip_path, "rb") as f:
+                    st.download_button("⬇️ Descargar ZIP", data=f, file_name="cotizaciones_redmil.zip",
+                                       mime="application/zip", use_container_width=True)
             
     else:
         st.info("No hay cotizaciones registradas en el historial.")